@@ -0,0 +1,41 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from .models import TokenClaimsUser
+from .utils.token_revocation import is_token_revoked
+
+# user fields copied into the tokens, enough for authentication and permission checks
+USER_TOKEN_CLAIMS = ("username", "is_staff", "is_superuser")
+
+
+def add_user_claims(token, user):
+    for claim in USER_TOKEN_CLAIMS:
+        token[claim] = getattr(user, claim)
+    return token
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    Authenticate from the access token alone. The user is built from the
+    token claims and only queried when a view reads a field the token does
+    not carry; revoked tokens are looked up in redis instead of the
+    token_blacklist tables. A deactivated user keeps access until the
+    token expires or is revoked.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if is_token_revoked(validated_token):
+            raise InvalidToken(_("Token is revoked"))
+        return validated_token
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification"))
+        claims = {claim: validated_token[claim]
+                  for claim in USER_TOKEN_CLAIMS if claim in validated_token}
+        return TokenClaimsUser.from_claims(user_id, claims)
@@ -12,6 +12,30 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return self.username
 
+
+class TokenClaimsUser(CustomUser):
+    """
+    User built from the claims of an access token without a query. The
+    fields missing from the token are deferred and loaded together the
+    first time one of them is read.
+    """
+    class Meta:
+        proxy = True
+
+    @classmethod
+    def from_claims(cls, user_id, claims):
+        known = {"id": user_id, **claims}
+        # from_db expects the values in the order of the model fields
+        field_names = [field.attname for field in cls._meta.concrete_fields
+                       if field.attname in known]
+        return cls.from_db(None, field_names, [known[name] for name in field_names])
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        deferred_fields = self.get_deferred_fields()
+        if fields is not None and deferred_fields and set(fields) <= deferred_fields:
+            fields = deferred_fields
+        super().refresh_from_db(using, fields, from_queryset)
+
 # Store user generated OTPS in the DB
 
 
@@ -1,34 +1,25 @@
 from rest_framework.permissions import BasePermission
-from .models import AssignGroupPermission, GroupModel, PermissonModel
+from .utils.permission_resolver import has_permissions
 import pdb
-from django.core.cache import cache
 
 
 class HasCustomPermission(BasePermission):
     required_permission = None
+    # every permission in required_permissions is needed, checked with one mask test
+    required_permissions = ()
+
+    def get_required_permissions(self):
+        if self.required_permissions:
+            return tuple(self.required_permissions)
+        if self.required_permission is not None:
+            return (self.required_permission,)
+        return ()
 
     def has_permission(self, request, view):
         if not request.user or request.user.is_anonymous:
             return False
 
-        if self.required_permission is None:
+        required_permissions = self.get_required_permissions()
+        if not required_permissions:
             return False
-        user = request.user
-        cache_key = f"user_permissions_{user.id}"
-        user_permissions = cache.get(cache_key)
-        if user_permissions is None:
-            print("Database hit for checking permissions..")
-            all_user_groups = AssignGroupPermission.objects.filter(
-                user=user).prefetch_related("group__permission")
-            user_permissions = set()
-
-            for assign_group in all_user_groups:
-                for group in assign_group.group.all():
-                    for perm in group.permission.all():
-                        user_permissions.add(perm.name)
-
-            print("Caching user permissions...")
-            cache.set(cache_key, list(user_permissions),
-                      timeout=60*5)  # 5 minutes
-
-        return self.required_permission in user_permissions
+        return has_permissions(request, required_permissions)
@@ -9,6 +9,11 @@ from club.models import Club
 from .models import *
 from random import randint
 import pdb
+from .utils.otp_store import get_otp_store, ADMIN_REGISTRATION
+from .utils.functions import set_token_claims
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 
 # user serializes
 
@@ -371,6 +376,29 @@ class DeleteUserFromGroupSerializer(serializers.Serializer):
         return value
 
 
+class BulkGroupAssignmentSerializer(serializers.Serializer):
+    users = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False)
+    groups = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False)
+
+    def _validate_ids(self, ids, queryset, name):
+        # one query for the whole list instead of one per primary key
+        ids = list(dict.fromkeys(ids))
+        missing = set(ids) - set(queryset.filter(
+            id__in=ids).values_list("id", flat=True))
+        if missing:
+            raise serializers.ValidationError(
+                f"Invalid {name} ids: {sorted(missing)}")
+        return ids
+
+    def validate_users(self, value):
+        return self._validate_ids(value, get_user_model().objects.all(), "user")
+
+    def validate_groups(self, value):
+        return self._validate_ids(value, GroupModel.objects.all(), "group")
+
+
 class AssignGroupPermissionSerializerForView(serializers.Serializer):
 
     class Meta:
@@ -387,23 +415,13 @@ class AdminUserEmailSerializer(serializers.Serializer):
         if user:
             raise serializers.ValidationError(
                 "Email already exists.")
-        verified_email = VerifySuccessfulEmail.objects.filter(
-            email=value).exists()
-        if verified_email:
-            VerifySuccessfulEmail.objects.filter(email=value).delete()
+        # a new OTP cancels the previous verification of the email
+        get_otp_store().consume_token(ADMIN_REGISTRATION, value)
         return value
 
     def create(self, validated_data):
-        email = validated_data.get('email')
-        otp = randint(1000, 9999)
-        is_exists = OTP.objects.filter(email=email).exists()
-        if is_exists:
-            otp_instance = OTP.objects.get(email=email)
-            otp_instance.otp = otp
-            otp_instance.save(update_fields=["otp"])
-        else:
-            otp_instance = OTP.objects.create(email=email, otp=otp)
-        return otp_instance
+        """Issue the OTP of the email and return it"""
+        return get_otp_store().create_otp(ADMIN_REGISTRATION, validated_data.get('email'))
 
 
 class AdminUserVerifyOtpSerializer(serializers.Serializer):
@@ -411,18 +429,11 @@ class AdminUserVerifyOtpSerializer(serializers.Serializer):
     email = serializers.EmailField()
 
     def validate(self, attrs):
-        otp = attrs.get("otp")
         email = attrs.get("email")
-        verified_email = VerifySuccessfulEmail.objects.filter(
-            email=email).exists()
-        if verified_email:
+        if get_otp_store().has_token(ADMIN_REGISTRATION, email):
             raise ValidationError(
                 {'email': ["Email already verified."]})
-
-        is_valid = OTP.objects.filter(otp=otp, email=email).exists()
-        if not is_valid:
-            raise ValidationError(
-                {'otp': [f"OTP {otp} and Email {email} do not match previous email and otp"]})
+        # the OTP is checked and consumed by the view
         return super().validate(attrs)
 
 
@@ -460,9 +471,7 @@ class AdminUserRegistrationSerializer(serializers.ModelSerializer):
         if is_exist:
             raise ValidationError({"email": ["email already exist"]})
 
-        is_email_exists = VerifySuccessfulEmail.objects.filter(
-            email=email).exists()
-        if not is_email_exists:
+        if not get_otp_store().has_token(ADMIN_REGISTRATION, email):
             raise serializers.ValidationError({
                 'email': [f"{email} not found in VerifySuccessfulEmail.Please first of all verify user email. "],
             })
@@ -485,3 +494,30 @@ class AdminUserRegistrationSerializer(serializers.ModelSerializer):
 
 class GroupDetailsSerializer(serializers.Serializer):
     name = serializers.CharField()
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh with the claims of the user as it is now. The stock serializer
+    keeps the payload of the login, so a demoted user would keep its old
+    is_staff, is_superuser and permission claims for as long as it refreshes.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user = get_user_model().objects.filter(**{
+            api_settings.USER_ID_FIELD: refresh.payload.get(api_settings.USER_ID_CLAIM)}).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                self.error_messages["no_active_account"], "no_active_account")
+        set_token_claims(refresh, user)
+
+        data = {"access": str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data["refresh"] = str(refresh)
+        return data
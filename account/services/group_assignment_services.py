@@ -0,0 +1,114 @@
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import connection, transaction
+from django.db.models import Min, Q
+from ..models import AssignGroupPermission
+from ..utils.functions import clear_user_permissions_cache
+
+UserGroup = AssignGroupPermission.group.through
+
+
+def get_assignment_ids(user_ids):
+    """Map every user to its AssignGroupPermission, creating the missing ones in one insert."""
+    assignment_ids = dict(AssignGroupPermission.objects.filter(
+        user_id__in=user_ids).values("user_id").annotate(
+            assignment_id=Min("id")).values_list("user_id", "assignment_id"))
+    missing_user_ids = [
+        user_id for user_id in user_ids if user_id not in assignment_ids]
+    if missing_user_ids:
+        AssignGroupPermission.objects.bulk_create(
+            [AssignGroupPermission(user_id=user_id) for user_id in missing_user_ids])
+        assignment_ids.update(AssignGroupPermission.objects.filter(
+            user_id__in=missing_user_ids).values_list("user_id", "id"))
+    return assignment_ids
+
+
+def bulk_assign_groups(user_ids, group_ids):
+    """
+    Add every user to every group with one insert into the through table,
+    rows that already exist are skipped. Returns the number of rows sent.
+    """
+    with transaction.atomic():
+        assignment_ids = get_assignment_ids(user_ids)
+        rows = [
+            UserGroup(assigngrouppermission_id=assignment_id,
+                      groupmodel_id=group_id)
+            for assignment_id in assignment_ids.values()
+            for group_id in group_ids
+        ]
+        UserGroup.objects.bulk_create(rows, ignore_conflicts=True)
+        transaction.on_commit(clear_user_permissions_cache)
+    return len(rows)
+
+
+def bulk_revoke_groups(user_ids, group_ids):
+    """Remove every user from every group with a single delete. Returns the number of rows removed."""
+    with transaction.atomic():
+        deleted, _ = UserGroup.objects.filter(
+            assigngrouppermission__user_id__in=user_ids,
+            groupmodel_id__in=group_ids).delete()
+        transaction.on_commit(clear_user_permissions_cache)
+    return deleted
+
+
+def _matrix_from_rows(rows):
+    """
+    Nest (user id, username, group id, group name, permission ids,
+    permission names) rows ordered by user into the user -> group ->
+    permission matrix.
+    """
+    users_data = []
+    for user_id, username, group_id, group_name, permission_ids, permission_names in rows:
+        if not users_data or users_data[-1]["user_id"] != user_id:
+            users_data.append({
+                "user_id": user_id,
+                "username": username if user_id else "No User",
+                "groups": [],
+            })
+        users_data[-1]["groups"].append({
+            "group_id": group_id,
+            "group_name": group_name,
+            "permissions": [
+                {"permission_id": permission_id,
+                    "permission_name": permission_name}
+                for permission_id, permission_name in zip(permission_ids, permission_names)
+            ]
+        })
+    return users_data
+
+
+def get_permission_matrix(user_ids=None):
+    """
+    Return the groups and permissions of every assigned user from a single
+    query. Postgres aggregates the permissions of each group with ArrayAgg,
+    other databases return one row per permission that is folded here.
+    """
+    queryset = UserGroup.objects.all()
+    if user_ids:
+        queryset = queryset.filter(
+            assigngrouppermission__user_id__in=user_ids)
+    group_fields = ("assigngrouppermission__user_id", "assigngrouppermission__user__username",
+                    "groupmodel_id", "groupmodel__name")
+
+    if connection.vendor == "postgresql":
+        has_permission = Q(groupmodel__permission__isnull=False)
+        rows = queryset.values(*group_fields).annotate(
+            permission_ids=ArrayAgg(
+                "groupmodel__permission__id", filter=has_permission,
+                ordering="groupmodel__permission__id", default=[]),
+            permission_names=ArrayAgg(
+                "groupmodel__permission__name", filter=has_permission,
+                ordering="groupmodel__permission__id", default=[]),
+        ).order_by("assigngrouppermission__user_id", "groupmodel_id").values_list(
+            *group_fields, "permission_ids", "permission_names")
+        return _matrix_from_rows(rows)
+
+    rows = []
+    for *group_row, permission_id, permission_name in queryset.order_by(
+        "assigngrouppermission__user_id", "groupmodel_id", "groupmodel__permission__id"
+    ).values_list(*group_fields, "groupmodel__permission__id", "groupmodel__permission__name"):
+        if not rows or rows[-1][:4] != group_row:
+            rows.append([*group_row, [], []])
+        if permission_id is not None:
+            rows[-1][4].append(permission_id)
+            rows[-1][5].append(permission_name)
+    return _matrix_from_rows(rows)
@@ -4,8 +4,17 @@ from club.models import Club
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from rest_framework.authtoken.models import Token
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import InvalidToken
+from django.core.cache import cache
 from ..models import ForgetPasswordOTP
+from ..authentication import StatelessJWTAuthentication
+from ..utils.functions import get_refresh_token_for_user
+from ..utils.token_revocation import is_token_revoked, revoke_token
+from ..utils import rate_limiter
+from ..utils.otp_store import (RedisOTPStore, FORGET_PASSWORD, OTP_VALID, OTP_INVALID,
+                               OTP_EXPIRED, OTP_LOCKED, OTP_MAX_ATTEMPTS)
 
 
 class AuthenticationAPITest(APITestCase):
@@ -129,6 +138,160 @@ class AuthenticationAPITest(APITestCase):
             self.assertIsNone(refresh_cookie)
 
 
+class StatelessJWTAuthenticationTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.user = get_user_model().objects.create_user(
+            username="statelessuser", password="testpassword", email="stateless@example.com")
+        self.access_token = get_refresh_token_for_user(self.user).access_token
+
+    def authenticate(self):
+        request = self.factory.get(
+            "/", HTTP_AUTHORIZATION=f"Bearer {self.access_token}")
+        return StatelessJWTAuthentication().authenticate(request)
+
+    def test_user_is_built_from_token_claims(self):
+        user, _ = self.authenticate()
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.username, "statelessuser")
+        self.assertFalse(user.is_staff)
+        self.assertIn("email", user.get_deferred_fields())
+        # fields missing from the token are loaded on first access
+        self.assertEqual(user.email, "stateless@example.com")
+        self.assertEqual(user.get_deferred_fields(), set())
+
+    def test_revoked_token_is_rejected(self):
+        _, validated_token = self.authenticate()
+        revoke_token(validated_token)
+        self.assertTrue(is_token_revoked(validated_token))
+        with self.assertRaises(InvalidToken):
+            self.authenticate()
+
+    def test_logout_revokes_access_token(self):
+        self.client.cookies["access_token"] = str(self.access_token)
+        response = self.client.delete("/api/account/v1/logout/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(is_token_revoked(self.access_token))
+
+
+class TokenRefreshClaimsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="staffuser", password="testpassword", is_staff=True)
+
+    def refresh(self, refresh_token):
+        self.client.cookies["refresh_token"] = str(refresh_token)
+        return self.client.post("/api/account/v1/token/refresh/")
+
+    def test_refreshed_tokens_lose_claims_of_demoted_user(self):
+        refresh_token = get_refresh_token_for_user(self.user)
+        self.assertTrue(refresh_token["is_staff"])
+        self.user.is_staff = False
+        self.user.save()
+
+        _response = self.refresh(refresh_token)
+        self.assertEqual(_response.status_code, status.HTTP_200_OK)
+        access_token = AccessToken(_response.cookies["access_token"].value)
+        rotated_refresh_token = RefreshToken(
+            _response.cookies["refresh_token"].value)
+        self.assertFalse(access_token["is_staff"])
+        self.assertFalse(rotated_refresh_token["is_staff"])
+
+    def test_refresh_is_refused_for_inactive_user(self):
+        refresh_token = get_refresh_token_for_user(self.user)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.refresh(refresh_token).status_code,
+                         status.HTTP_401_UNAUTHORIZED)
+
+
+class LoginRateLimiterTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="lockeduser", password="testpassword")
+
+    def login(self, password, ip="127.0.0.1"):
+        return self.client.post("/api/account/v1/login/", data={
+            "username": "lockeduser", "password": password, "remember_me": False},
+            REMOTE_ADDR=ip)
+
+    def test_login_is_blocked_after_ten_failures(self):
+        for _ in range(10):
+            self.assertEqual(self.login("wrongpassword").status_code,
+                             status.HTTP_400_BAD_REQUEST)
+        _response = self.login("testpassword")
+        self.assertEqual(_response.status_code,
+                         status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(_response.json()["message"],
+                         "Try again in 120 seconds.")
+
+    def test_successful_login_resets_only_the_username_failures(self):
+        for _ in range(9):
+            self.login("wrongpassword")
+        self.assertEqual(self.login("testpassword").status_code,
+                         status.HTTP_200_OK)
+        # the username starts over, a tenth failure from another ip is not blocked
+        self.assertEqual(self.login("wrongpassword", ip="10.0.0.2").status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.login("testpassword", ip="10.0.0.2").status_code,
+                         status.HTTP_200_OK)
+        # the ip keeps its window, its tenth failure blocks it
+        self.assertEqual(self.login("wrongpassword").status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.login("testpassword").status_code,
+                         status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_sliding_window_limits_each_identity(self):
+        for _ in range(3):
+            allowed, _, _ = rate_limiter.hit(
+                "test", ["ip:1", "email:a"], window=60, limits=[5, 3])
+            self.assertTrue(allowed)
+        allowed, _, wait = rate_limiter.hit(
+            "test", ["ip:1", "email:a"], window=60, limits=[5, 3])
+        self.assertFalse(allowed)
+        self.assertGreater(wait, 0)
+        # the refused hit was not recorded against the ip
+        allowed, count, _ = rate_limiter.hit(
+            "test", ["ip:1", "email:b"], window=60, limits=[5, 3])
+        self.assertTrue(allowed)
+        self.assertEqual(count, 4)
+
+
+class RedisOTPStoreTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.store = RedisOTPStore()
+        self.email = "otpuser@example.com"
+
+    def test_otp_is_consumed_once(self):
+        otp = self.store.create_otp(FORGET_PASSWORD, self.email)
+        self.assertEqual(self.store.verify_otp(
+            FORGET_PASSWORD, self.email, otp), OTP_VALID)
+        self.assertEqual(self.store.verify_otp(
+            FORGET_PASSWORD, self.email, otp), OTP_EXPIRED)
+
+    def test_otp_is_discarded_after_too_many_attempts(self):
+        otp = self.store.create_otp(FORGET_PASSWORD, self.email)
+        for _ in range(OTP_MAX_ATTEMPTS - 1):
+            self.assertEqual(self.store.verify_otp(
+                FORGET_PASSWORD, self.email, otp + 1), OTP_INVALID)
+        self.assertEqual(self.store.verify_otp(
+            FORGET_PASSWORD, self.email, otp + 1), OTP_LOCKED)
+        self.assertEqual(self.store.verify_otp(
+            FORGET_PASSWORD, self.email, otp), OTP_EXPIRED)
+
+    def test_token_is_consumed_only_when_it_matches(self):
+        self.store.create_token(FORGET_PASSWORD, self.email, "token")
+        self.assertFalse(self.store.consume_token(
+            FORGET_PASSWORD, self.email, "wrong"))
+        self.assertTrue(self.store.consume_token(
+            FORGET_PASSWORD, self.email, "token"))
+        self.assertFalse(self.store.has_token(FORGET_PASSWORD, self.email))
+
+
 class ResetPasswordAPITest(APITestCase):
     def setUp(self):
         self.faker = Faker()
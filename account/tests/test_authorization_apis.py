@@ -16,6 +16,12 @@ from unittest.mock import patch
 from account.utils.permissions_classes import RegisterUserPermission, GroupPermissionManagement
 from random import randint
 from rest_framework_simplejwt.tokens import RefreshToken
+from django.core.cache import cache
+from account.utils.functions import clear_user_permissions_cache
+from account.utils.permission_resolver import get_user_permissions, load_user_permission_mask, has_permissions
+from account.utils.functions import get_refresh_token_for_user
+from types import SimpleNamespace
+from django.test import override_settings
 
 
 class CustomPermissionAPITest(TestCase):
@@ -497,3 +503,114 @@ class GetSpecificUserPermissionsViewTest(TestCase):
     def test_get_permissions_unauthenticated(self):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class UserPermissionResolverTest(TestCase):
+    def setUp(self):
+        """ resolve the permissions of a user through the cache tiers """
+        cache.clear()
+        clear_user_permissions_cache()
+        self.user = get_user_model().objects.create_user(
+            username="resolveruser", password="testpassword")
+        self.permission1 = PermissonModel.objects.create(name="add_member")
+        self.permission2 = PermissonModel.objects.create(name="view_member")
+        self.group = GroupModel.objects.create(name="Test")
+        self.group.permission.add(self.permission1)
+        self.assign_group_permission = AssignGroupPermission.objects.create(
+            user=self.user)
+        self.assign_group_permission.group.add(self.group)
+
+    def test_permissions_are_resolved_once_and_cached(self):
+        with patch("account.utils.permission_resolver.load_user_permission_mask",
+                   wraps=load_user_permission_mask) as mock_load:
+            permissions = get_user_permissions(self.user.id)
+            get_user_permissions(self.user.id)
+        self.assertEqual(permissions, {"add_member"})
+        self.assertEqual(mock_load.call_count, 1)
+
+    def test_group_change_is_visible_after_version_bump(self):
+        get_user_permissions(self.user.id)
+        self.group.permission.add(self.permission2)
+        clear_user_permissions_cache()
+        self.assertEqual(get_user_permissions(self.user.id),
+                         {"add_member", "view_member"})
+
+    def test_all_required_permissions_are_checked_with_one_mask(self):
+        request = SimpleNamespace(user=self.user, auth=None)
+        self.assertTrue(has_permissions(request, ("add_member",)))
+        self.assertFalse(has_permissions(
+            request, ("add_member", "view_member")))
+        self.assertFalse(has_permissions(request, ("unknown_permission",)))
+        self.group.permission.add(self.permission2)
+        clear_user_permissions_cache()
+        self.assertTrue(has_permissions(
+            request, ("add_member", "view_member")))
+
+    @override_settings(PERMISSION_CLAIMS_IN_TOKEN=True)
+    def test_permission_claims_are_trusted_until_version_bump(self):
+        access_token = get_refresh_token_for_user(self.user).access_token
+        request = SimpleNamespace(user=self.user, auth=access_token)
+        with patch("account.utils.permission_resolver.load_user_permission_mask",
+                   wraps=load_user_permission_mask) as mock_load:
+            self.assertTrue(has_permissions(request, ("add_member",)))
+            self.assertEqual(mock_load.call_count, 0)
+            # the claim goes stale once the permissions change
+            self.assign_group_permission.group.remove(self.group)
+            clear_user_permissions_cache()
+            self.assertFalse(has_permissions(request, ("add_member",)))
+            self.assertEqual(mock_load.call_count, 1)
+
+
+class BulkGroupAssignmentAPITest(APITestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            username="bulkadmin", password="testpassword")
+        self.users = [get_user_model().objects.create_user(
+            username=f"staff{i}", password="testpassword") for i in range(3)]
+        self.permission = PermissonModel.objects.create(name="view_member")
+        self.group1 = GroupModel.objects.create(name="Front desk")
+        self.group1.permission.add(self.permission)
+        self.group2 = GroupModel.objects.create(name="Kitchen")
+        # the first user already has a group assignment
+        AssignGroupPermission.objects.create(
+            user=self.users[0]).group.add(self.group1)
+        self.client.force_authenticate(user=self.admin)
+        self.url = "/api/account/v1/authorization/bulk_assign_group_user/"
+
+    @patch.object(GroupPermissionManagement, "has_permission", return_value=True)
+    def test_bulk_assign_and_revoke(self, mock_permission):
+        data = {"users": [user.id for user in self.users],
+                "groups": [self.group1.id, self.group2.id]}
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(AssignGroupPermission.objects.count(), 3)
+        self.assertEqual(
+            AssignGroupPermission.group.through.objects.count(), 6)
+
+        response = self.client.delete(
+            self.url, {"users": [self.users[0].id], "groups": [self.group1.id, self.group2.id]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["removed"], 2)
+        self.assertFalse(self.users[0].custom_user.first().group.exists())
+
+    @patch.object(GroupPermissionManagement, "has_permission", return_value=True)
+    def test_bulk_assign_with_unknown_group(self, mock_permission):
+        response = self.client.post(
+            self.url, {"users": [self.users[1].id], "groups": [0]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("groups", response.data["errors"])
+
+    @patch.object(GroupPermissionManagement, "has_permission", return_value=True)
+    def test_permission_matrix(self, mock_permission):
+        AssignGroupPermission.objects.create(
+            user=self.users[1]).group.add(self.group2)
+        response = self.client.get(
+            "/api/account/v1/authorization/permission_matrix/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"], [
+            {"user_id": self.users[0].id, "username": "staff0", "groups": [
+                {"group_id": self.group1.id, "group_name": "Front desk", "permissions": [
+                    {"permission_id": self.permission.id, "permission_name": "view_member"}]}]},
+            {"user_id": self.users[1].id, "username": "staff1", "groups": [
+                {"group_id": self.group2.id, "group_name": "Kitchen", "permissions": []}]},
+        ])
@@ -30,6 +30,10 @@ urlpatterns = [
          name="assign_group"),
     path('v2/authorization/assign_group_user/', views.AssignGroupPermissionViewV2.as_view(),
          name="assign_group_V2"),
+    path('v1/authorization/bulk_assign_group_user/', views.BulkGroupAssignmentView.as_view(),
+         name="bulk_assign_group"),
+    path('v1/authorization/permission_matrix/', views.PermissionMatrixView.as_view(),
+         name="permission_matrix"),
     path('v1/view_all_users/', views.UserView.as_view(),
          name="user_view"),
     path('v1/authorization/admin_user_email/',
@@ -2,6 +2,12 @@ from django.core.cache import cache
 from django_redis import get_redis_connection
 import secrets
 import string
+from django.conf import settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..authentication import add_user_claims
+from .permission_resolver import (
+    PERMISSION_MASK_CLAIM, PERMISSION_VERSION_CLAIM, add_permission_claims, bump_permissions_version)
+from . import rate_limiter
 
 
 # def clear_user_permissions_cache():
@@ -18,12 +24,22 @@ import string
 #         print("No user permission caches found to clear.")
 
 def clear_user_permissions_cache():
-    
-    try:
-        cache.delete_pattern("*user_permissions_*")
-        print("Deleted all user permission caches using delete_pattern()")
-    except NotImplementedError:
-        print("delete_pattern not supported for this cache backend")
+    """Invalidate the cached permissions of every user"""
+    bump_permissions_version()
+
+def set_token_claims(token, user):
+    """Write the current claims of the user over the ones the token carries"""
+    add_user_claims(token, user)
+    if settings.PERMISSION_CLAIMS_IN_TOKEN:
+        add_permission_claims(token, user)
+    else:
+        for claim in (PERMISSION_MASK_CLAIM, PERMISSION_VERSION_CLAIM):
+            token.payload.pop(claim, None)
+    return token
+
+def get_refresh_token_for_user(user):
+    """Issue a refresh token, the access token derived from it copies its claims"""
+    return set_token_claims(RefreshToken.for_user(user), user)
 
 def add_no_cache_header_in_response(response):
     # Add headers to prevent caching
@@ -39,19 +55,36 @@ def generate_random_token(length=20):
     return ''.join(secrets.choice(characters) for _ in range(length))
 
 
-def set_blocking_system(cache_key, failed_attempts, block_key):
-    cache.set(cache_key, failed_attempts,
-              timeout=1800)  # Store for 30 mins
-    if int(failed_attempts) == 10:
-        cache.set(block_key, 120,
-                  timeout=120)
-    elif int(failed_attempts) >= 11 and int(failed_attempts) <= 15:
-        pass
-    elif int(failed_attempts) == 16:
-        cache.set(block_key, 300,
-                  timeout=300)
-    elif int(failed_attempts) >= 17 and int(failed_attempts) <= 19:
-        pass
-    else:
-        cache.set(block_key, 600,
-                  timeout=600)
+# failed logins are counted per ip and per username over a sliding window
+LOGIN_FAILURE_SCOPE = "login_failures"
+LOGIN_FAILURE_WINDOW = 60*30
+# (failed attempts, block seconds), every failure from the last rung on blocks again
+LOGIN_BLOCK_LADDER = ((10, 120), (16, 300), (20, 600))
+
+
+def _login_idents(ip, username):
+    idents = [f"ip:{ip}"]
+    if isinstance(username, str) and username:
+        idents.append(f"username:{username.lower()}")
+    return idents
+
+
+def login_blocked_for(ip, username):
+    """Seconds until the ip or the username may try to log in again"""
+    return rate_limiter.blocked_for(LOGIN_FAILURE_SCOPE, _login_idents(ip, username))
+
+
+def record_failed_login(ip, username):
+    """Count the failure and block following the ladder, in one atomic redis call"""
+    rate_limiter.hit(LOGIN_FAILURE_SCOPE, _login_idents(ip, username),
+                     window=LOGIN_FAILURE_WINDOW, ladder=LOGIN_BLOCK_LADDER)
+
+
+def reset_failed_logins(username):
+    """
+    Forget the failures of a username that just logged in. The ip keeps its
+    window until it runs out, a correct password must not clear the count of
+    an ip guessing many other accounts.
+    """
+    if isinstance(username, str) and username:
+        rate_limiter.reset(LOGIN_FAILURE_SCOPE, [f"username:{username.lower()}"])
@@ -0,0 +1,199 @@
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from django_redis import get_redis_connection
+from random import randint
+from ..models import ForgetPasswordOTP, OTP, VerifySuccessfulEmail
+
+# otp purposes
+FORGET_PASSWORD = "forget_password"
+ADMIN_REGISTRATION = "admin_registration"
+
+# results of verify_otp
+OTP_VALID = "valid"
+OTP_INVALID = "invalid"
+OTP_EXPIRED = "expired"
+OTP_NOT_FOUND = "not_found"
+OTP_LOCKED = "locked"
+
+OTP_TIMEOUT = 60*5
+# how long a verified email or a password change token stays usable
+VERIFIED_TIMEOUT = 60*30
+# wrong guesses before the otp is discarded
+OTP_MAX_ATTEMPTS = 5
+
+
+def generate_otp():
+    return randint(1000, 9999)
+
+
+class BaseOTPStore:
+    """
+    Stores otps and the proof of a successful verification (a token, or a
+    bare marker when token is None) per purpose and email.
+    """
+
+    def create_otp(self, purpose, email):
+        """Issue a new otp replacing the previous one and return it."""
+        raise NotImplementedError
+
+    def verify_otp(self, purpose, email, otp):
+        """Check an otp, a valid otp is consumed. Returns one of the OTP_* results."""
+        raise NotImplementedError
+
+    def create_token(self, purpose, email, token=None):
+        raise NotImplementedError
+
+    def has_token(self, purpose, email):
+        raise NotImplementedError
+
+    def consume_token(self, purpose, email, token=None):
+        """Remove the token, when token is given only if it matches. Returns True when removed."""
+        raise NotImplementedError
+
+
+class RedisOTPStore(BaseOTPStore):
+    """
+    Otps live in a redis hash expiring with the otp, tokens in a key
+    expiring with the verification. Checking and consuming are atomic. An
+    expired otp can not be told from one never issued, both are reported as
+    expired.
+    """
+
+    # KEYS[1] otp hash, ARGV[1] otp, ARGV[2] max attempts
+    VERIFY_SCRIPT = """
+    local code = redis.call('HGET', KEYS[1], 'code')
+    if not code then
+        return 0
+    end
+    if code == ARGV[1] then
+        redis.call('DEL', KEYS[1])
+        return 1
+    end
+    if redis.call('HINCRBY', KEYS[1], 'attempts', 1) >= tonumber(ARGV[2]) then
+        redis.call('DEL', KEYS[1])
+        return -2
+    end
+    return -1
+    """
+    VERIFY_RESULTS = {1: OTP_VALID, 0: OTP_EXPIRED,
+                      -1: OTP_INVALID, -2: OTP_LOCKED}
+
+    # KEYS[1] token key, ARGV[1] expected token, empty to remove any token
+    CONSUME_SCRIPT = """
+    local token = redis.call('GET', KEYS[1])
+    if not token or (ARGV[1] ~= '' and token ~= ARGV[1]) then
+        return 0
+    end
+    redis.call('DEL', KEYS[1])
+    return 1
+    """
+
+    def __init__(self):
+        self.connection = get_redis_connection("default")
+        self.verify_script = self.connection.register_script(
+            self.VERIFY_SCRIPT)
+        self.consume_script = self.connection.register_script(
+            self.CONSUME_SCRIPT)
+        # load up front so the first calls go straight through EVALSHA
+        for script in (self.verify_script, self.consume_script):
+            self.connection.script_load(script.script)
+
+    def _otp_key(self, purpose, email):
+        return f"otp::{purpose}::{email.lower()}"
+
+    def _token_key(self, purpose, email):
+        return f"otp_token::{purpose}::{email.lower()}"
+
+    def create_otp(self, purpose, email):
+        otp = generate_otp()
+        key = self._otp_key(purpose, email)
+        pipe = self.connection.pipeline()
+        pipe.delete(key)
+        pipe.hset(key, mapping={"code": otp, "attempts": 0})
+        pipe.expire(key, OTP_TIMEOUT)
+        pipe.execute()
+        return otp
+
+    def verify_otp(self, purpose, email, otp):
+        result = self.verify_script(
+            keys=[self._otp_key(purpose, email)], args=[str(otp), OTP_MAX_ATTEMPTS])
+        return self.VERIFY_RESULTS[result]
+
+    def create_token(self, purpose, email, token=None):
+        self.connection.set(self._token_key(purpose, email),
+                            token or "1", ex=VERIFIED_TIMEOUT)
+
+    def has_token(self, purpose, email):
+        return bool(self.connection.exists(self._token_key(purpose, email)))
+
+    def consume_token(self, purpose, email, token=None):
+        return bool(self.consume_script(
+            keys=[self._token_key(purpose, email)], args=[token or ""]))
+
+
+class DatabaseOTPStore(BaseOTPStore):
+    """
+    Keeps the otps in the ForgetPasswordOTP, OTP and VerifySuccessfulEmail
+    tables. Used by the tests, wrong guesses are not counted.
+    """
+
+    def create_otp(self, purpose, email):
+        otp = generate_otp()
+        if purpose == FORGET_PASSWORD:
+            ForgetPasswordOTP.objects.update_or_create(
+                email=email, defaults={"otp": otp, "expire_time": timezone.now()})
+        else:
+            OTP.objects.update_or_create(email=email, defaults={"otp": otp})
+        return otp
+
+    def verify_otp(self, purpose, email, otp):
+        if purpose == FORGET_PASSWORD:
+            forget_password_otp = ForgetPasswordOTP.objects.filter(
+                email=email).first()
+            if forget_password_otp is None:
+                return OTP_NOT_FOUND
+            if forget_password_otp.otp != otp:
+                return OTP_INVALID
+            if forget_password_otp.is_expired():
+                return OTP_EXPIRED
+            # the row carries the password change token, it goes on reset
+            return OTP_VALID
+
+        deleted, _ = OTP.objects.filter(email=email, otp=otp).delete()
+        if deleted:
+            return OTP_VALID
+        if OTP.objects.filter(email=email).exists():
+            return OTP_INVALID
+        return OTP_NOT_FOUND
+
+    def create_token(self, purpose, email, token=None):
+        if purpose == FORGET_PASSWORD:
+            ForgetPasswordOTP.objects.filter(email=email).update(token=token)
+        else:
+            VerifySuccessfulEmail.objects.get_or_create(email=email)
+
+    def has_token(self, purpose, email):
+        if purpose == FORGET_PASSWORD:
+            return ForgetPasswordOTP.objects.filter(email=email).exclude(token="").exists()
+        return VerifySuccessfulEmail.objects.filter(email=email).exists()
+
+    def consume_token(self, purpose, email, token=None):
+        if purpose == FORGET_PASSWORD:
+            queryset = ForgetPasswordOTP.objects.filter(email=email)
+            if token is not None:
+                queryset = queryset.filter(token=token)
+        else:
+            queryset = VerifySuccessfulEmail.objects.filter(email=email)
+        deleted, _ = queryset.delete()
+        return bool(deleted)
+
+
+_stores = {}
+
+
+def get_otp_store():
+    path = settings.OTP_STORE
+    if path not in _stores:
+        _stores[path] = import_string(path)()
+    return _stores[path]
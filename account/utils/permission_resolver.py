@@ -0,0 +1,134 @@
+from django.core.cache import cache
+from core.utils.lru import LRUCache
+from ..models import PermissonModel
+
+# bumped on every permission, group or assignment change, invalidates every cached entry
+PERMISSIONS_VERSION_KEY = "user_permissions::version"
+PERMISSION_REGISTRY_KEY = "user_permissions::registry"
+PERMISSIONS_CACHE_TIMEOUT = 60*5
+# entries trusted in process memory without asking redis
+LOCAL_PERMISSIONS_TTL = 10
+LOCAL_PERMISSIONS_SIZE = 5000
+
+# claims carried by access tokens when SIMPLE_JWT_PERMISSION_CLAIMS is on
+PERMISSION_MASK_CLAIM = "perm_mask"
+PERMISSION_VERSION_CLAIM = "perm_version"
+
+_local_permissions = LRUCache(LOCAL_PERMISSIONS_SIZE, ttl=LOCAL_PERMISSIONS_TTL)
+
+
+def _user_permissions_key(user_id):
+    return f"user_permissions::{user_id}"
+
+
+def get_permissions_version():
+    version = _local_permissions.get("version")
+    if version is None:
+        version = cache.get(PERMISSIONS_VERSION_KEY) or 1
+        _local_permissions.set("version", version)
+    return version
+
+
+def bump_permissions_version():
+    """Invalidate the cached permissions of every user with a single INCR."""
+    _local_permissions.clear()
+    try:
+        return cache.incr(PERMISSIONS_VERSION_KEY)
+    except ValueError:
+        # the counter does not exist yet, readers treat it as version 1
+        cache.add(PERMISSIONS_VERSION_KEY, 2, timeout=None)
+        return 2
+
+
+def _get_versioned(local_key, cache_key, loader):
+    """
+    Serve a value from process memory, then from redis as long as it was
+    stored under the current permissions version, then from the loader.
+    The version and the entry are read from redis in one round trip.
+    """
+    value = _local_permissions.get(local_key)
+    if value is not None:
+        return value
+
+    cached = cache.get_many([PERMISSIONS_VERSION_KEY, cache_key])
+    version = cached.get(PERMISSIONS_VERSION_KEY) or 1
+    entry = cached.get(cache_key)
+    if entry and entry.get("version") == version:
+        value = entry["value"]
+    else:
+        value = loader()
+        cache.set(cache_key, {"version": version, "value": value},
+                  timeout=PERMISSIONS_CACHE_TIMEOUT)
+    _local_permissions.set(local_key, value)
+    return value
+
+
+def load_permission_registry():
+    """Map every permission name to its bit, the bit of a permission is its id."""
+    return dict(PermissonModel.objects.values_list("name", "id"))
+
+
+def load_user_permission_mask(user_id):
+    """Bitmask of the permissions of every group assigned to the user, in one query."""
+    mask = 0
+    for permission_id in PermissonModel.objects.filter(
+        groupmodel__assigngrouppermission__user_id=user_id
+    ).values_list("id", flat=True).distinct():
+        mask |= 1 << permission_id
+    return mask
+
+
+def get_permission_registry():
+    return _get_versioned("registry", PERMISSION_REGISTRY_KEY, load_permission_registry)
+
+
+def get_user_permission_mask(user_id):
+    return _get_versioned(user_id, _user_permissions_key(user_id),
+                          lambda: load_user_permission_mask(user_id))
+
+
+def permission_mask(names):
+    """Bitmask of the given permission names, None if one of them does not exist."""
+    registry = get_permission_registry()
+    mask = 0
+    for name in names:
+        if name not in registry:
+            return None
+        mask |= 1 << registry[name]
+    return mask
+
+
+def get_user_permissions(user_id):
+    """Return the permission names of a user."""
+    mask = get_user_permission_mask(user_id)
+    return frozenset(name for name, bit in get_permission_registry().items() if mask >> bit & 1)
+
+
+def get_request_permission_mask(request):
+    """
+    Permission bitmask of the requesting user. The mask embedded in the
+    access token is used while it was issued under the current permissions
+    version, otherwise it is resolved from the cache.
+    """
+    token = getattr(request, "auth", None)
+    if token is not None and hasattr(token, "get"):
+        token_mask = token.get(PERMISSION_MASK_CLAIM)
+        if token_mask is not None and token.get(PERMISSION_VERSION_CLAIM) == get_permissions_version():
+            return int(token_mask, 16)
+    return get_user_permission_mask(request.user.id)
+
+
+def has_permissions(request, names):
+    """Check that the requesting user holds every one of the permissions with one mask test."""
+    required = permission_mask(names)
+    if not required:
+        return False
+    return get_request_permission_mask(request) & required == required
+
+
+def add_permission_claims(token, user):
+    """Embed the permission bitmask of the user in a token."""
+    token[PERMISSION_MASK_CLAIM] = format(
+        get_user_permission_mask(user.id), "x")
+    token[PERMISSION_VERSION_CLAIM] = get_permissions_version()
+    return token
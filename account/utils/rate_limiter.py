@@ -0,0 +1,121 @@
+import time
+import uuid
+from django_redis import get_redis_connection
+
+# Sliding window log per identity (ip, username, email...). One call prunes
+# the window, refuses the hit when the limit is reached, records it and
+# applies the block ladder, for every identity at once.
+#   KEYS[1..n] window keys, KEYS[n+1..2n] matching block keys
+#   ARGV[1] now, ARGV[2] window seconds, ARGV[3] hit id
+#   ARGV[4..3+n] limit of each identity (0 = none)
+#   ARGV[4+n..] ladder of (failures, block seconds) pairs, the last rung
+#   keeps blocking every hit above it
+# Returns {allowed, highest count in the window, seconds to wait}
+SLIDING_WINDOW_SCRIPT = """
+local n = #KEYS / 2
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+
+local wait = 0
+for i = 1, n do
+    wait = math.max(wait, redis.call('TTL', KEYS[n + i]))
+end
+if wait > 0 then
+    return {0, 0, wait}
+end
+
+local counts = {}
+for i = 1, n do
+    redis.call('ZREMRANGEBYSCORE', KEYS[i], '-inf', now - window)
+    counts[i] = redis.call('ZCARD', KEYS[i])
+    local limit = tonumber(ARGV[3 + i])
+    if limit > 0 and counts[i] >= limit then
+        local oldest = redis.call('ZRANGE', KEYS[i], 0, 0, 'WITHSCORES')
+        wait = math.max(wait, math.ceil(tonumber(oldest[2]) + window - now))
+    end
+end
+if wait > 0 then
+    return {0, 0, wait}
+end
+
+local highest = 0
+for i = 1, n do
+    redis.call('ZADD', KEYS[i], now, ARGV[3])
+    redis.call('EXPIRE', KEYS[i], window)
+    local count = counts[i] + 1
+    highest = math.max(highest, count)
+    local block = 0
+    for j = 4 + n, #ARGV, 2 do
+        local rung = tonumber(ARGV[j])
+        if count == rung or (j + 1 == #ARGV and count > rung) then
+            block = tonumber(ARGV[j + 1])
+        end
+    end
+    if block > 0 then
+        redis.call('SET', KEYS[n + i], block, 'EX', block)
+    end
+end
+return {1, highest, 0}
+"""
+
+_script = None
+
+
+def _get_script():
+    global _script
+    if _script is None:
+        connection = get_redis_connection("default")
+        _script = connection.register_script(SLIDING_WINDOW_SCRIPT)
+        # load up front so the first calls go straight through EVALSHA
+        connection.script_load(SLIDING_WINDOW_SCRIPT)
+    return _script
+
+
+def _window_key(scope, ident):
+    return f"rate_limit::{scope}::{ident}"
+
+
+def _block_key(scope, ident):
+    return f"rate_limit::{scope}::{ident}::block"
+
+
+def hit(scope, idents, window, limits=0, ladder=()):
+    """
+    Record a hit for every identity in one redis call. limits is either one
+    limit for every identity or a limit per identity. Returns (allowed,
+    highest count in the window, seconds to wait); a refused hit is not
+    recorded.
+    """
+    if isinstance(limits, int):
+        limits = [limits] * len(idents)
+    pairs = [(ident, limit) for ident, limit in zip(idents, limits) if ident]
+    if not pairs:
+        return True, 0, 0
+    keys = [_window_key(scope, ident) for ident, _ in pairs]
+    keys += [_block_key(scope, ident) for ident, _ in pairs]
+    args = [time.time(), window, uuid.uuid4().hex]
+    args += [limit for _, limit in pairs]
+    for failures, block_for in ladder:
+        args += [failures, block_for]
+    allowed, count, wait = _get_script()(keys=keys, args=args)
+    return bool(allowed), count, wait
+
+
+def blocked_for(scope, idents):
+    """Seconds left on the longest block of the identities, 0 when none is blocked."""
+    idents = [ident for ident in idents if ident]
+    if not idents:
+        return 0
+    pipe = get_redis_connection("default").pipeline(transaction=False)
+    for ident in idents:
+        pipe.ttl(_block_key(scope, ident))
+    return max(0, *pipe.execute())
+
+
+def reset(scope, idents):
+    idents = [ident for ident in idents if ident]
+    if not idents:
+        return
+    keys = [_window_key(scope, ident) for ident in idents]
+    keys += [_block_key(scope, ident) for ident in idents]
+    get_redis_connection("default").delete(*keys)
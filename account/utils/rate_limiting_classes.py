@@ -1,10 +1,60 @@
 
 from rest_framework.throttling import SimpleRateThrottle
+from . import rate_limiter
 
 
-class LoginRateThrottle(SimpleRateThrottle):
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """
+    Throttle over a sliding window kept in redis, every identity returned
+    by get_idents is checked and recorded in a single atomic call.
+    """
+
+    def get_idents(self, request, view):
+        return [self.get_ident(request)]
+
+    def get_limits(self, idents):
+        return [self.num_requests] * len(idents)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.wait_seconds = None
+        idents = self.get_idents(request, view)
+        allowed, _, wait = rate_limiter.hit(
+            self.scope, idents, window=self.duration, limits=self.get_limits(idents))
+        if not allowed:
+            self.wait_seconds = wait
+        return allowed
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class LoginRateThrottle(SlidingWindowRateThrottle):
     scope = "login"
     rate = "60/min"
 
-    def get_cache_key(self, request, view):
-        return f"throttle_{self.scope}_{self.get_ident(request)}"
+
+class OTPRateThrottle(SlidingWindowRateThrottle):
+    """
+    Keyed on the email the otp is sent to and on the client ip. The ip gets
+    a larger share since a whole office or event venue can share one.
+    """
+    scope = "otp"
+    rate = "5/min"
+    ip_limit_factor = 6
+
+    def get_idents(self, request, view):
+        idents = [f"ip:{self.get_ident(request)}"]
+        email = request.data.get("email")
+        if isinstance(email, str) and email:
+            idents.append(f"email:{email.strip().lower()}")
+        return idents
+
+    def get_limits(self, idents):
+        return [self.num_requests * self.ip_limit_factor] + [self.num_requests] * (len(idents) - 1)
+
+
+class ForgetPasswordRateThrottle(OTPRateThrottle):
+    scope = "forget_password"
+    rate = "5/min"
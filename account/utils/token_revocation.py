@@ -0,0 +1,25 @@
+import time
+from django_redis import get_redis_connection
+
+# sorted set of revoked token ids scored by their expiry, expired ids are trimmed on write
+REVOKED_TOKENS_KEY = "jwt::revoked"
+
+
+def revoke_token(token):
+    """Revoke a token until it expires on its own."""
+    jti = token.get("jti")
+    if not jti:
+        return
+    conn = get_redis_connection("default")
+    pipe = conn.pipeline()
+    pipe.zadd(REVOKED_TOKENS_KEY, {jti: token.get("exp", 0)})
+    pipe.zremrangebyscore(REVOKED_TOKENS_KEY, "-inf", int(time.time()))
+    pipe.execute()
+
+
+def is_token_revoked(token):
+    jti = token.get("jti")
+    if not jti:
+        return False
+    conn = get_redis_connection("default")
+    return conn.zscore(REVOKED_TOKENS_KEY, jti) is not None
@@ -1,4 +1,4 @@
-from activity_log.tasks import log_activity_task
+from activity_log.utils.log_buffer import log_activity
 from rest_framework.exceptions import NotAuthenticated, PermissionDenied
 from .tasks import send_otp_email
 from .serializers import RegistrationSerializer, LoginSerializer, ForgetPasswordSerializer, VerifyOtpSerializer
@@ -18,11 +18,16 @@ from datetime import timedelta
 from .permissions import HasCustomPermission
 from .serializers import *
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
-from account.utils.functions import clear_user_permissions_cache, add_no_cache_header_in_response, generate_random_token, set_blocking_system
+from account.utils.permission_resolver import get_permissions_version
+from account.utils.functions import clear_user_permissions_cache, add_no_cache_header_in_response, generate_random_token, get_refresh_token_for_user, login_blocked_for, record_failed_login, reset_failed_logins
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
 from django.db import transaction
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
+from rest_framework_simplejwt.exceptions import TokenError
+from account.utils.token_revocation import revoke_token
+from account.services.group_assignment_services import bulk_assign_groups, bulk_revoke_groups, get_permission_matrix
+from account.utils.otp_store import get_otp_store, FORGET_PASSWORD, ADMIN_REGISTRATION, OTP_VALID, OTP_INVALID, OTP_EXPIRED, OTP_NOT_FOUND, OTP_LOCKED
 from django.conf import settings
 from rest_framework_simplejwt.views import TokenRefreshView
 from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
@@ -30,7 +35,7 @@ from rest_framework_simplejwt.exceptions import InvalidToken
 from django.utils.datastructures import MultiValueDict
 from .utils.permissions_classes import RegisterUserPermission, GroupPermissionManagement, ViewAllUserPermission
 from activity_log.utils.functions import request_data_activity_log
-from .utils.rate_limiting_classes import LoginRateThrottle
+from .utils.rate_limiting_classes import LoginRateThrottle, OTPRateThrottle, ForgetPasswordRateThrottle
 from django.core.cache import cache
 from core.utils.pagination import CustomPageNumberPagination
 import logging
@@ -54,7 +59,7 @@ class AccountRegistrationView(APIView):
             if serializer.is_valid():
                 remember_me = serializer.validated_data['remember_me']
                 user = serializer.save()
-                refresh = RefreshToken.for_user(user)
+                refresh = get_refresh_token_for_user(user)
                 access_token = refresh.access_token
                 response = Response({
                     "code": 201,
@@ -129,9 +134,8 @@ class AccountLoginLogoutView(APIView):
         """
         try:
             ip = self.get_client_ip(request)
-            cache_key = f"failed_login_attempts_{ip}"
-            block_key = f"block_time_{ip}"
-            block_time = cache.get(block_key)
+            attempted_username = request.data.get("username")
+            block_time = login_blocked_for(ip, attempted_username)
             if block_time:
                 return Response({
                     "code": 429,
@@ -151,7 +155,7 @@ class AccountLoginLogoutView(APIView):
                 user.save()
 
                 # Generate a new token on every login session
-                refresh = RefreshToken.for_user(user)
+                refresh = get_refresh_token_for_user(user)
                 access_token = refresh.access_token
 
                 # Response with no-cache headers
@@ -185,42 +189,24 @@ class AccountLoginLogoutView(APIView):
                     max_age=timedelta(
                         days=time_limit_for_cookie).total_seconds()
                 )
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Logged in",
                     severity_level="info",
                     description="User logged in to the system",
                 )
-                #  Reset counters on successful login
-                cache.delete(cache_key)
-                cache.delete(block_key)
+                #  Reset the username counters on successful login, the ip window expires on its own
+                reset_failed_logins(attempted_username)
                 return response
 
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Logged in failure",
                     severity_level="warning",
                     description="Tried to log in to the system but failed to login",
                 )
-                failed_attempts = cache.get(cache_key, 0) + 1
-                print(failed_attempts)
-                if int(failed_attempts) >= 10:
-                    if int(failed_attempts) == 10:
-                        set_blocking_system(
-                            cache_key, failed_attempts, block_key)
-                    elif int(failed_attempts) >= 11 and int(failed_attempts) <= 15:
-                        cache.set(cache_key, failed_attempts)
-                    elif int(failed_attempts) == 16:
-                        set_blocking_system(
-                            cache_key, failed_attempts, block_key)
-                    elif int(failed_attempts) >= 17 and int(failed_attempts) <= 19:
-                        cache.set(cache_key, failed_attempts)
-                    else:
-                        set_blocking_system(
-                            cache_key, failed_attempts, block_key)
-                else:
-                    cache.set(cache_key, failed_attempts)
+                record_failed_login(ip, attempted_username)
 
                 return Response({
                     'code': status.HTTP_400_BAD_REQUEST,
@@ -230,7 +216,7 @@ class AccountLoginLogoutView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Error Occurred while login",
                 severity_level="critical",
@@ -254,6 +240,13 @@ class AccountLoginLogoutView(APIView):
                 {'code': status.HTTP_200_OK,
                  'status': "success",
                  'message': "Logout successful", 'detail': "Logout successful"}, status=status.HTTP_200_OK)
+            # The access token stays valid until it expires, revoke it
+            access_token = request.COOKIES.get(settings.SIMPLE_JWT["AUTH_COOKIE"])
+            if access_token:
+                try:
+                    revoke_token(AccessToken(access_token))
+                except TokenError:
+                    pass
             # Delete the 'auth_token' cookie
             response.delete_cookie(settings.SIMPLE_JWT["AUTH_COOKIE"])
             response.delete_cookie(settings.SIMPLE_JWT["AUTH_COOKIE_REFRESH"])
@@ -262,7 +255,7 @@ class AccountLoginLogoutView(APIView):
             response["Cache-Control"] = "no-store, no-cache, must-revalidate, max-age=0"
             response["Pragma"] = "no-cache"
             response["Expires"] = "0"
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Logged out from system",
                 severity_level="info",
@@ -272,7 +265,7 @@ class AccountLoginLogoutView(APIView):
 
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Failure while logout",
                 severity_level="info",
@@ -291,6 +284,7 @@ class AccountLoginLogoutView(APIView):
 class ForgetPasswordView(APIView):
     authentication_classes = []
     permission_classes = []
+    throttle_classes = [ForgetPasswordRateThrottle]
 
     def post(self, request):
         """
@@ -301,20 +295,11 @@ class ForgetPasswordView(APIView):
             data=data)  # Validate the data and email
         if serializer.is_valid():
             email = serializer.validated_data['email']
-            otp = randint(1000, 9999)  # Generate OTP
-            # Checking if a user with OTP Exist
-            is_exist = ForgetPasswordOTP.objects.filter(email=email).exists()
-            if is_exist:
-                otp_model = ForgetPasswordOTP.objects.get(email=email)
-                otp_model.expire_time = timezone.now()
-                otp_model.otp = otp  # If exist update the OTP
-                otp_model.save()
-            else:
-                # If new user Create OTP Model
-                ForgetPasswordOTP.objects.create(email=email, otp=otp)
-                # initiate CELERY to send mail
+            # Replaces the previous OTP of the email
+            otp = get_otp_store().create_otp(FORGET_PASSWORD, email)
+            # initiate CELERY to send mail
             send_otp_mail_to_email.delay_on_commit(otp, email)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Forget password request",
                 severity_level="info",
@@ -327,7 +312,7 @@ class ForgetPasswordView(APIView):
                 "details": "OTP send successful"
             }, status=status.HTTP_200_OK)
         else:
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="invalid request",
                 severity_level="warning",
@@ -360,11 +345,9 @@ class ResetPasswordView(APIView):
                 email = serializer.validated_data['email']
                 password = serializer.validated_data['password']
                 pass_change_token = serializer.validated_data['token']
-                forget_password_otp_obj = get_object_or_404(
-                    ForgetPasswordOTP, email=email)
-
-                if pass_change_token != forget_password_otp_obj.token:
-                    log_activity_task.delay_on_commit(
+                # The token is one-shot, it is consumed only when it matches
+                if not get_otp_store().consume_token(FORGET_PASSWORD, email, pass_change_token):
+                    log_activity(
                         request_data_activity_log(request),
                         verb="invalid request",
                         severity_level="warning",
@@ -383,9 +366,8 @@ class ResetPasswordView(APIView):
                             user.set_password(password)  # Change password
                             user.save()
                             # Create new token and return
-                            refresh = RefreshToken.for_user(user)
+                            refresh = get_refresh_token_for_user(user)
                             access_token = refresh.access_token
-                            forget_password_otp_obj.delete()
                             response = Response({
                                 "status": "success",
                                 "code": status.HTTP_200_OK,
@@ -410,7 +392,7 @@ class ResetPasswordView(APIView):
                                 max_age=timedelta(
                                     days=7).total_seconds()
                             )
-                            log_activity_task.delay_on_commit(
+                            log_activity(
                                 request_data_activity_log(request),
                                 verb="Password reset",
                                 severity_level="info",
@@ -419,7 +401,7 @@ class ResetPasswordView(APIView):
                             return response
                     except Exception as e:
                         logger.exception(str(e))
-                        log_activity_task.delay_on_commit(
+                        log_activity(
                             request_data_activity_log(request),
                             verb="Error occurred",
                             severity_level="warning",
@@ -431,7 +413,7 @@ class ResetPasswordView(APIView):
                             'status': 'failed', 'detail': str(e)
                         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Error occurred",
                     severity_level="warning",
@@ -444,7 +426,7 @@ class ResetPasswordView(APIView):
                     'errors': serializer.errors
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Error occurred",
                 severity_level="warning",
@@ -467,7 +449,7 @@ class ResetPasswordView(APIView):
 
         if serializer.is_valid():
             serializer.update(user, serializer.validated_data)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Password change",
                 severity_level="info",
@@ -479,7 +461,7 @@ class ResetPasswordView(APIView):
                 "status": "success"
             }, status=status.HTTP_200_OK)
         else:
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Password change failed",
                 severity_level="warning",
@@ -494,6 +476,8 @@ class ResetPasswordView(APIView):
 
 
 class VerifyOtpView(APIView):
+    throttle_classes = [OTPRateThrottle]
+
     def post(self, request):
         """
             Verify OTP with given email here
@@ -504,10 +488,25 @@ class VerifyOtpView(APIView):
             if serializer.is_valid():
                 email = serializer.validated_data["email"]
                 otp = serializer.validated_data['otp']
-                forget_password_otp_obj = get_object_or_404(
-                    ForgetPasswordOTP, email=email)
-                if forget_password_otp_obj.otp != otp:  # check if OTP matched
-                    log_activity_task.delay_on_commit(
+                otp_store = get_otp_store()
+                otp_result = otp_store.verify_otp(FORGET_PASSWORD, email, otp)
+                if otp_result == OTP_NOT_FOUND:
+                    log_activity(
+                        request_data_activity_log(request),
+                        verb="OTP verify failed",
+                        severity_level="warning",
+                        description="OTP verification failed because no OTP was requested",
+                    )
+                    return Response({
+                        "code": status.HTTP_404_NOT_FOUND,
+                        "message": "Failed while verifying OTP",
+                        "status": "failed",
+                        "can_change_pass": False,
+                        "details": "No OTP found for this email"
+                    }, status=status.HTTP_404_NOT_FOUND)
+
+                if otp_result in (OTP_INVALID, OTP_LOCKED):  # check if OTP matched
+                    log_activity(
                         request_data_activity_log(request),
                         verb="OTP verify failed",
                         severity_level="warning",
@@ -518,11 +517,11 @@ class VerifyOtpView(APIView):
                         "message": "Failed while verifying OTP",
                         "status": "failed",
                         "can_change_pass": False,
-                        "details": "OTP didn't match"
+                        "details": "OTP didn't match" if otp_result == OTP_INVALID else "Too many attempts generate a new OTP"
                     }, status=status.HTTP_400_BAD_REQUEST)
 
-                if forget_password_otp_obj.is_expired():  # check if OTP has expired
-                    log_activity_task.delay_on_commit(
+                if otp_result == OTP_EXPIRED:  # check if OTP has expired
+                    log_activity(
                         request_data_activity_log(request),
                         verb="OTP verify failed",
                         severity_level="warning",
@@ -538,9 +537,8 @@ class VerifyOtpView(APIView):
 
                 try:
                     token = generate_random_token()
-                    forget_password_otp_obj.token = token
-                    forget_password_otp_obj.save(update_fields=['token'])
-                    log_activity_task.delay_on_commit(
+                    otp_store.create_token(FORGET_PASSWORD, email, token)
+                    log_activity(
                         request_data_activity_log(request),
                         verb="OTP verify success",
                         severity_level="info",
@@ -556,7 +554,7 @@ class VerifyOtpView(APIView):
                     }, status=status.HTTP_200_OK)
                 except Exception as e:
                     logger.exception(str(e))
-                    log_activity_task.delay_on_commit(
+                    log_activity(
                         request_data_activity_log(request),
                         verb="OTP verify failed",
                         severity_level="warning",
@@ -571,7 +569,7 @@ class VerifyOtpView(APIView):
                     }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="OTP verify failed",
                     severity_level="warning",
@@ -584,7 +582,7 @@ class VerifyOtpView(APIView):
                     'errors': serializer.errors
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="OTP verify failed",
                 severity_level="warning",
@@ -604,6 +602,7 @@ class CustomTokenRefreshView(TokenRefreshView):
     """
     Custom refresh view to set the new refresh token in cookies
     """
+    serializer_class = ClaimsTokenRefreshSerializer
 
     def post(self, request, *args, **kwargs):
 
@@ -626,7 +625,7 @@ class CustomTokenRefreshView(TokenRefreshView):
 
         # Handle error responses (e.g., invalid or expired token)
         if response.status_code == 400:
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Refresh token generation failed",
                 severity_level="warning",
@@ -667,7 +666,7 @@ class CustomTokenRefreshView(TokenRefreshView):
         # response.data.pop("refresh")
         response.data.update(
             {"code": 200, "status": "success", "message": "new access token given in cookie"})
-        log_activity_task.delay_on_commit(
+        log_activity(
             request_data_activity_log(request),
             verb="Refresh token generation",
             severity_level="info",
@@ -680,7 +679,7 @@ class CustomTokenRefreshView(TokenRefreshView):
         Modify error messages for invalid/blacklisted tokens.
         """
         if isinstance(exc, InvalidToken):
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(self.request),
                 verb="Refresh token generation failed",
                 severity_level="info",
@@ -711,7 +710,7 @@ class UserView(APIView):
             paginated_queryset = paginator.paginate_queryset(
                 data, request, view=self)
             serializer = UserSerializer(paginated_queryset, many=True)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Tried to view all users",
                 severity_level="info",
@@ -725,7 +724,7 @@ class UserView(APIView):
             }, status=200)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Error while viewing all users",
                 severity_level="error",
@@ -752,7 +751,7 @@ class CustomPermissionView(APIView):
             if serializer.is_valid():
                 permission = serializer.save()
                 name = serializer.validated_data["name"]
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Creating a custom permission",
                     severity_level="info",
@@ -767,7 +766,7 @@ class CustomPermissionView(APIView):
                         "permission_name": name
                     }
                 }, status=status.HTTP_201_CREATED)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Error while creating a custom permission",
                 severity_level="warning",
@@ -782,7 +781,7 @@ class CustomPermissionView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Error while creating a custom permission",
                 severity_level="warning",
@@ -803,7 +802,7 @@ class CustomPermissionView(APIView):
 
             serializer = CustomPermissionSerializerForView(
                 all_permission, many=True)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Getting all permissions",
                 severity_level="info",
@@ -819,7 +818,7 @@ class CustomPermissionView(APIView):
 
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="error while getting all permissions",
                 severity_level="warning",
@@ -856,7 +855,7 @@ class GroupPermissionView(APIView):
                 group = serializer.save()
                 permissions = group.permission.all()
                 permission_ids = [perm.id for perm in permissions]
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Creating group",
                     severity_level="Info",
@@ -871,7 +870,7 @@ class GroupPermissionView(APIView):
                     "permission": permission_ids
                 }, status=status.HTTP_201_CREATED)
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Creating group error",
                     severity_level="warning",
@@ -885,7 +884,7 @@ class GroupPermissionView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Creating group error",
                 severity_level="warning",
@@ -905,7 +904,7 @@ class GroupPermissionView(APIView):
 
             data = GroupModel.objects.all()
             serializer = GroupSerializerForViewAllGroups(data, many=True)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View all groups",
                 severity_level="info",
@@ -919,7 +918,7 @@ class GroupPermissionView(APIView):
             }, status=status.HTTP_200_OK)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Error viewing groups",
                 severity_level="warning",
@@ -954,7 +953,7 @@ class GroupPermissionView(APIView):
                             "permission": ["Permission does not exist"]
                         }
                     }, status=status.HTTP_400_BAD_REQUEST)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Deleting group",
                 severity_level="info",
@@ -979,7 +978,7 @@ class GroupPermissionView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Error while deleting group",
                 severity_level="warning",
@@ -1013,7 +1012,7 @@ class GroupPermissionViewV2(APIView):
                 user_count=Count("assigngrouppermission__id", distinct=True)
             )
             serializer = GroupSerializerForViewAllGroupsV2(data, many=True)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View all groups",
                 severity_level="info",
@@ -1027,7 +1026,7 @@ class GroupPermissionViewV2(APIView):
             }, status=status.HTTP_200_OK)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Error viewing groups",
                 severity_level="warning",
@@ -1062,7 +1061,7 @@ class SpecificGroupPermissionView(APIView):
                 # after updating the group delete the permissions cache
                 clear_user_permissions_cache()
 
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Updated a group",
                     severity_level="info",
@@ -1075,7 +1074,7 @@ class SpecificGroupPermissionView(APIView):
                     'data': serializer.data
                 })
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Bad request in update group",
                     severity_level="warning",
@@ -1088,7 +1087,7 @@ class SpecificGroupPermissionView(APIView):
                     'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Error",
                 severity_level="info",
@@ -1112,7 +1111,7 @@ class SpecificGroupPermissionView(APIView):
             group.delete()
             # clear permissions cache for all users after a group deletion
             clear_user_permissions_cache()
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Deleted a group",
                 severity_level="info",
@@ -1126,7 +1125,7 @@ class SpecificGroupPermissionView(APIView):
             }, status=status.HTTP_200_OK)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Error while deleting a group",
                 severity_level="warning",
@@ -1163,7 +1162,7 @@ class SpecificGroupPermissionViewV2(APIView):
                 serializer.save()
                 # after updating the group delete the permissions cache
                 clear_user_permissions_cache()
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Updated a group",
                     severity_level="info",
@@ -1176,7 +1175,7 @@ class SpecificGroupPermissionViewV2(APIView):
                     'data': serializer.data
                 })
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Bad request in update group",
                     severity_level="warning",
@@ -1189,7 +1188,7 @@ class SpecificGroupPermissionViewV2(APIView):
                     'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Error",
                 severity_level="info",
@@ -1223,7 +1222,7 @@ class AssignGroupPermissionView(APIView):
                     groups_data.append(
                         {"group_id": gro.id, "group_name": gro.name})
                 clear_user_permissions_cache()
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Assigned a user to the group",
                     severity_level="info",
@@ -1238,7 +1237,7 @@ class AssignGroupPermissionView(APIView):
                 }, status=status.HTTP_201_CREATED)
 
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Bad request in assign group",
                     severity_level="warning",
@@ -1252,7 +1251,7 @@ class AssignGroupPermissionView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Error occurred assign group",
                 severity_level="error",
@@ -1275,7 +1274,7 @@ class AssignGroupPermissionView(APIView):
                 assign_group.group.remove(group)
                 assign_group.save()
                 clear_user_permissions_cache()
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Deleted an user a group",
                     severity_level="info",
@@ -1288,7 +1287,7 @@ class AssignGroupPermissionView(APIView):
                     "detail": "User removed from group successfully."
                 }, status=status.HTTP_200_OK)
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Error while deleting user from group",
                     severity_level="error",
@@ -1302,7 +1301,7 @@ class AssignGroupPermissionView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Error while deleting user from group",
                 severity_level="error",
@@ -1338,7 +1337,7 @@ class AssignGroupPermissionView(APIView):
                     }
                     user_info["groups"].append(group_info)
                 users_data.append(user_info)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Viewed all user with groups",
                 severity_level="info",
@@ -1352,7 +1351,7 @@ class AssignGroupPermissionView(APIView):
             }, status=status.HTTP_200_OK)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Error while viewing all users and their group",
                 severity_level="error",
@@ -1372,7 +1371,7 @@ class AssignGroupPermissionView(APIView):
             user = data.get("user")
             group = data.get("group")
             if not user:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Bad request while updating permission",
                     severity_level="error",
@@ -1387,7 +1386,7 @@ class AssignGroupPermissionView(APIView):
                     }
                 }, status=status.HTTP_400_BAD_REQUEST)
             if not group:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Bad request while updating permission",
                     severity_level="error",
@@ -1411,7 +1410,7 @@ class AssignGroupPermissionView(APIView):
                 groups_data = [{"group_id": gro.id,
                                 "group_name": gro.name} for gro in groups]
                 clear_user_permissions_cache()
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="request for updating permission",
                     severity_level="info",
@@ -1425,7 +1424,7 @@ class AssignGroupPermissionView(APIView):
                     "updated_groups": groups_data
                 }, status=status.HTTP_200_OK)
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Bad request while updating permission",
                     severity_level="error",
@@ -1438,7 +1437,7 @@ class AssignGroupPermissionView(APIView):
                     "errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
         except AssignGroupPermission.DoesNotExist:
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Bad request while updating permission",
                 severity_level="error",
@@ -1451,7 +1450,7 @@ class AssignGroupPermissionView(APIView):
                 "errors": {"user": ["User not found in AssignGroupPermission"]}}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Bad request while updating permission",
                 severity_level="error",
@@ -1487,7 +1486,7 @@ class AssignGroupPermissionViewV2(APIView):
                     users_data.append(
                         {"user_id": user.id, "username": user.username})
                 clear_user_permissions_cache()
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Assigned a user to the group",
                     severity_level="info",
@@ -1502,7 +1501,7 @@ class AssignGroupPermissionViewV2(APIView):
                 }, status=status.HTTP_201_CREATED)
 
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Bad request in assign group",
                     severity_level="warning",
@@ -1516,7 +1515,7 @@ class AssignGroupPermissionViewV2(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Error occurred assign group",
                 severity_level="error",
@@ -1530,8 +1529,153 @@ class AssignGroupPermissionViewV2(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class BulkGroupAssignmentView(APIView):
+    permission_classes = [IsAuthenticated,
+                          GroupPermissionManagement]
+
+    def post(self, request):
+        """
+        Add many users to many groups at once
+        """
+        try:
+            serializer = BulkGroupAssignmentSerializer(data=request.data)
+            if serializer.is_valid():
+                users = serializer.validated_data["users"]
+                groups = serializer.validated_data["groups"]
+                bulk_assign_groups(users, groups)
+                log_activity(
+                    request_data_activity_log(request),
+                    verb="Assigned users to groups",
+                    severity_level="info",
+                    description="Assigned many users to many groups",
+                )
+                return Response({
+                    "code": status.HTTP_201_CREATED,
+                    "message": "Operation successful",
+                    "status": "success",
+                    "users": users,
+                    "groups": groups
+                }, status=status.HTTP_201_CREATED)
+            log_activity(
+                request_data_activity_log(request),
+                verb="Bad request in assign group",
+                severity_level="warning",
+                description="Bad request for assigning many users to many groups",
+            )
+            return Response({
+                "code": status.HTTP_400_BAD_REQUEST,
+                "message": "Invalid request",
+                "status": "failed",
+                "errors": serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.exception(str(e))
+            log_activity(
+                request_data_activity_log(request),
+                verb="Error occurred assign group",
+                severity_level="error",
+                description="Error occurred while assigning many users to many groups",
+            )
+            return Response({
+                "code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "message": "Error occurred",
+                "status": "failed",
+                'errors': {'server_error': [str(e)]}
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    def delete(self, request):
+        """
+        Remove many users from many groups at once
+        """
+        try:
+            serializer = BulkGroupAssignmentSerializer(data=request.data)
+            if serializer.is_valid():
+                removed = bulk_revoke_groups(
+                    serializer.validated_data["users"], serializer.validated_data["groups"])
+                log_activity(
+                    request_data_activity_log(request),
+                    verb="Removed users from groups",
+                    severity_level="info",
+                    description="Removed many users from many groups",
+                )
+                return Response({
+                    "code": status.HTTP_200_OK,
+                    "message": "Operation successful",
+                    "status": "success",
+                    "removed": removed
+                }, status=status.HTTP_200_OK)
+            log_activity(
+                request_data_activity_log(request),
+                verb="Error while deleting user from group",
+                severity_level="warning",
+                description="Bad request for removing many users from many groups",
+            )
+            return Response({
+                "code": status.HTTP_400_BAD_REQUEST,
+                "message": "Invalid request",
+                "status": "failed",
+                "errors": serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            logger.exception(str(e))
+            log_activity(
+                request_data_activity_log(request),
+                verb="Error while deleting user from group",
+                severity_level="error",
+                description="Error occurred while removing many users from many groups",
+            )
+            return Response({
+                "code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "message": "Error occurred",
+                "status": "failed",
+                'errors': {'server_error': [str(e)]}
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class PermissionMatrixView(APIView):
+    permission_classes = [IsAuthenticated,
+                          GroupPermissionManagement]
+
+    def get(self, request):
+        """
+        Users with their groups and the permissions of every group, ?user=1,2 narrows the users
+        """
+        try:
+            user_ids = [int(user_id) for user_id in request.query_params.get(
+                "user", "").split(",") if user_id.strip().isdigit()]
+            data = get_permission_matrix(user_ids)
+            log_activity(
+                request_data_activity_log(request),
+                verb="Viewed permission matrix",
+                severity_level="info",
+                description="Made a request for viewing the groups and permissions of users",
+            )
+            return Response({
+                "code": status.HTTP_200_OK,
+                "message": "Operation successful",
+                "status": "success",
+                "data": data
+            }, status=status.HTTP_200_OK)
+        except Exception as e:
+            logger.exception(str(e))
+            log_activity(
+                request_data_activity_log(request),
+                verb="Error while viewing permission matrix",
+                severity_level="error",
+                description="Made a request for viewing the groups and permissions of users and an error occurred",
+            )
+            return Response({
+                "code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "message": "Error occurred",
+                "status": "failed",
+                "errors": {
+                    "server_error": [str(e)]
+                }}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 class AdminUserEmailView(APIView):
     permission_classes = [IsAuthenticated, RegisterUserPermission]
+    throttle_classes = [OTPRateThrottle]
 
     def post(self, request):
         try:
@@ -1540,28 +1684,11 @@ class AdminUserEmailView(APIView):
                 data=data)
             if serializer.is_valid():
                 with transaction.atomic():
-                    instance = serializer.save()
+                    # save() issues the OTP and returns it
+                    otp_value = serializer.save()
                     email = serializer.validated_data["email"]
-                    try:
-                        otp = OTP.objects.get(email=email)
-                        otp_value = otp.otp
-                        send_otp_email.delay_on_commit(email, otp_value)
-
-                    except OTP.DoesNotExist:
-                        log_activity_task.delay_on_commit(
-                            request_data_activity_log(request),
-                            verb="Bad request while registering user",
-                            severity_level="warning",
-                            description="Made a request for registering user and the request was invalid",
-                        )
-                        return Response({
-                            "code": status.HTTP_404_NOT_FOUND,
-                            "message": "Invalid request",
-                            "status": "failed",
-                            "errors": {
-                                'otp': ["OTP for the provided email does not exist."]
-                            }}, status=status.HTTP_404_NOT_FOUND)
-                    log_activity_task.delay_on_commit(
+                    send_otp_email.delay_on_commit(email, otp_value)
+                    log_activity(
                         request_data_activity_log(request),
                         verb="Request for OTP sending",
                         severity_level="info",
@@ -1579,7 +1706,7 @@ class AdminUserEmailView(APIView):
                     # Add no cache header in response
                     response = add_no_cache_header_in_response(response)
                     return response
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Bad request while registering user",
                 severity_level="warning",
@@ -1592,7 +1719,7 @@ class AdminUserEmailView(APIView):
                 "errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Bad request while registering user",
                 severity_level="error",
@@ -1609,6 +1736,7 @@ class AdminUserEmailView(APIView):
 
 class AdminUserVerifyOtpView(APIView):
     permission_classes = [IsAuthenticated, RegisterUserPermission]
+    throttle_classes = [OTPRateThrottle]
 
     def post(self, request):
         try:
@@ -1618,13 +1746,26 @@ class AdminUserVerifyOtpView(APIView):
             if serializer.is_valid():
                 email = serializer.validated_data["email"]
                 otp = serializer.validated_data["otp"]
-                otp_object = OTP.objects.get(email=email, otp=otp)
-                otp_object.delete()
+                otp_store = get_otp_store()
+                if otp_store.verify_otp(ADMIN_REGISTRATION, email, otp) != OTP_VALID:
+                    log_activity(
+                        request_data_activity_log(request),
+                        verb="Bad request while verifying user OTP",
+                        severity_level="warning",
+                        description="Made a request for verifying user OTP and request was invalid",
+                    )
+                    return Response({
+                        "code": status.HTTP_400_BAD_REQUEST,
+                        "message": "Invalid request",
+                        "status": "failed",
+                        "errors": {
+                            'otp': [f"OTP {otp} and Email {email} do not match previous email and otp"]
+                        }}, status=status.HTTP_400_BAD_REQUEST)
                 try:
-                    VerifySuccessfulEmail.objects.create(email=email)
+                    otp_store.create_token(ADMIN_REGISTRATION, email)
                 except Exception as e:
                     logger.exception(str(e))
-                    log_activity_task.delay_on_commit(
+                    log_activity(
                         request_data_activity_log(request),
                         verb="Bad request while verifying user OTP",
                         severity_level="warning",
@@ -1646,14 +1787,14 @@ class AdminUserVerifyOtpView(APIView):
                                     }, status=status.HTTP_200_OK)
                 # Add no cache header in response
                 response = add_no_cache_header_in_response(response)
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="OTP verified",
                     severity_level="info",
                     description="Made a request for verifying user OTP",
                 )
                 return response
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Bad request while verifying user OTP",
                 severity_level="warning",
@@ -1666,7 +1807,7 @@ class AdminUserVerifyOtpView(APIView):
                 "errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Bad request while verifying user OTP",
                 severity_level="error",
@@ -1692,7 +1833,7 @@ class AdminUserRegistrationView(APIView):
             if serializer.is_valid():
                 user = serializer.save()
                 username = serializer.validated_data["username"]
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Request for Registering an user",
                     severity_level="info",
@@ -1704,7 +1845,7 @@ class AdminUserRegistrationView(APIView):
                     "status": "success",
                     "username": username
                 }, status=status.HTTP_201_CREATED)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Bad request while Registering an user",
                 severity_level="warning",
@@ -1717,7 +1858,7 @@ class AdminUserRegistrationView(APIView):
                 "errors": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Bad request while Registering an user",
                 severity_level="warning",
@@ -1738,7 +1879,7 @@ class GetUserPermissionsView(APIView):
     def get(self, request):
         try:
             user = request.user
-            cache_key = f"specific_user_permissions::{user.id}"
+            cache_key = f"specific_user_permissions::v{get_permissions_version()}::{user.id}"
             cached_data = cache.get(cache_key)
             if cached_data:
                 response = Response(cached_data, status=status.HTTP_200_OK)
@@ -1770,7 +1911,7 @@ class GetUserPermissionsView(APIView):
 
                     user_info["permissions"].extend(all_permissions)
                 users_data.append(user_info)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="retrieved user permissions",
                 severity_level="info",
@@ -1799,7 +1940,7 @@ class GetUserPermissionsView(APIView):
             return response
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Error Occurred",
                 severity_level="error",
@@ -1842,7 +1983,7 @@ class GroupDetailsView(APIView):
 
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Error Occurred",
                 severity_level="error",
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from activity_log.utils.partitions import (
+    ACTIVITY_LOG_PARTITION_MONTHS_AHEAD, ACTIVITY_LOG_RETENTION_DAYS, is_partitioned,
+    maintain_activity_log_partitions
+)
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming activity log partitions and drop expired ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument("--months-ahead", type=int, default=ACTIVITY_LOG_PARTITION_MONTHS_AHEAD,
+                            help="Number of future monthly partitions to keep ready")
+        parser.add_argument("--retention-days", type=int, default=ACTIVITY_LOG_RETENTION_DAYS,
+                            help="Number of days activity logs are kept")
+
+    def handle(self, *args, **options):
+        if not is_partitioned():
+            self.stdout.write(self.style.WARNING(
+                "Activity log table is not partitioned, only deleting expired rows."))
+        result = maintain_activity_log_partitions(
+            months_ahead=options["months_ahead"], retention_days=options["retention_days"])
+        for name in result["created"]:
+            self.stdout.write(f"Partition ready: {name}")
+        for name in result["dropped"]:
+            self.stdout.write(f"Partition dropped: {name}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['deleted']} expired logs deleted."))
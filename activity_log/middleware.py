@@ -0,0 +1,19 @@
+# activity_log/middleware.py
+from .utils.log_buffer import start_activity_log_buffer, stop_activity_log_buffer
+
+
+class ActivityLogBufferMiddleware:
+    """
+    Collect the activity logs of a request and push them to the redis
+    queue in one round trip once the response is ready.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = start_activity_log_buffer()
+        try:
+            return self.get_response(request)
+        finally:
+            stop_activity_log_buffer(token)
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+def partition_activity_log(apps, schema_editor):
+    from activity_log.utils.partitions import convert_to_partitioned_table
+    # only postgres supports declarative partitioning, other backends keep the plain table
+    convert_to_partitioned_table(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activity_log', '0002_alter_activitylog_timestamp_alter_activitylog_verb'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_activity_log,
+                             migrations.RunPython.noop),
+    ]
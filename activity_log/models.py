@@ -6,7 +6,7 @@ from django.contrib.auth import get_user_model
 class ActivityLog(models.Model):
     user = models.ForeignKey(get_user_model(
     ), on_delete=models.SET_NULL, null=True, related_name='activity_logs')
-    ip_address = models.GenericIPAddressField(default="", blank=False)
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
     location = models.JSONField(default=dict, blank=True)
     user_agent = models.TextField(default="Unknown", blank=True)
     request_method = models.CharField(max_length=10, default="", blank=True)
@@ -24,5 +24,14 @@ class ActivityLog(models.Model):
     description = models.TextField(default="", blank=True)
     timestamp = models.DateTimeField(default="")
 
+    class Meta:
+        # on postgres the table is partitioned by month on timestamp, see utils/partitions.py
+        indexes = [
+            models.Index(fields=["user", "timestamp"],
+                         name="activity_log_user_ts_idx"),
+            models.Index(fields=["timestamp"],
+                         name="activity_log_timestamp_idx"),
+        ]
+
     def __str__(self):
         return f"Activity log for {self.user} at {self.timestamp}"
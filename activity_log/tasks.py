@@ -1,8 +1,12 @@
 
 # from activity_log.utils.functions import get_client_ip, get_location
+import ipaddress
 import requests
+import time
+import uuid
 from celery import shared_task
 from django.utils.timezone import now
+from django.db import DatabaseError, transaction
 from .models import ActivityLog
 import pdb
 from django.contrib.auth import get_user_model
@@ -12,43 +16,66 @@ from django.utils.dateparse import parse_datetime
 from django.utils.timezone import make_aware, is_naive
 from django.utils import timezone
 from datetime import timedelta
+from .utils.geoip import lookup_locations
 import logging
 logger = logging.getLogger("myapp")
 
 
-def enqueue_activity_log(data):
+ACTIVITY_LOG_QUEUE = "activity_log_queue"
+# entries claimed by the running flush, kept until they are stored
+ACTIVITY_LOG_PROCESSING_QUEUE = "activity_log_queue:processing"
+# entries the database refused, kept for inspection instead of blocking the flush
+ACTIVITY_LOG_DEAD_LETTER_QUEUE = "activity_log_queue:dead"
+ACTIVITY_LOG_FLUSH_LOCK = "activity_log_queue:flush_lock"
+ACTIVITY_LOG_FLUSH_LOCK_TIMEOUT = 60*10
+# the drain stops well before the lock could run out, what is left waits for the next run
+ACTIVITY_LOG_FLUSH_MAX_SECONDS = ACTIVITY_LOG_FLUSH_LOCK_TIMEOUT // 2
+# entries moved out of redis per round trip and rows per insert
+ACTIVITY_LOG_FLUSH_BATCH_SIZE = 1000
+ACTIVITY_LOG_BULK_CREATE_BATCH_SIZE = 1000
+
+
+def build_activity_log_entry(data, verb, severity_level, description, timestamp=None):
+    """Build the queue entry flush_activity_logs stores from request_data_activity_log data."""
+    timestamp = timestamp or now()
+    return {
+        'user': data.get("user_id"),
+        'ip_address': data.get("ip"),
+        'location': data.get("location"),
+        'user_agent': data.get("user_agent"),
+        'request_method': data.get("method"),
+        'referrer_url': data.get("referrer_url"),
+        'device': data.get("device"),
+        'path': data.get("path"),
+        'verb': verb,
+        'severity_level': severity_level,
+        'description': description,
+        'timestamp': timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def enqueue_activity_logs(entries):
+    """Append entries to the queue with a single RPUSH."""
+    if not entries:
+        return
     conn = get_redis_connection("default")
-    conn.rpush("activity_log_queue", json.dumps(data))
+    conn.rpush(ACTIVITY_LOG_QUEUE, *[json.dumps(entry) for entry in entries])
+
+
+def enqueue_activity_log(data):
+    enqueue_activity_logs([data])
 
 
 @shared_task
 def log_activity_task(data, verb, severity_level, description):
-    """Celery task to log user activity asynchronously."""
+    """
+    Celery task to log user activity asynchronously. Requests log through
+    activity_log.utils.log_buffer.log_activity, this task only drains
+    messages that were published before that.
+    """
     try:
-        user_id = data.get("user_id")
-        method = data.get("method")
-        path = data.get("path")
-        ip = data.get("ip")
-        location = data.get("location")
-        user_agent = data.get("user_agent")
-        device = data.get("device")
-        referrer_url = data.get("referrer_url")
-        timestamp = now()
-        dict_data = {
-            'user': user_id,
-            'ip_address': ip,
-            'location': location,
-            'user_agent': user_agent,
-            'request_method': method,
-            'referrer_url': referrer_url,
-            'device': device,
-            'path': path,
-            'verb': verb,
-            'severity_level': severity_level,
-            'description': description,
-            'timestamp': timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-        }
-        enqueue_activity_log(dict_data)
+        enqueue_activity_log(build_activity_log_entry(
+            data, verb, severity_level, description))
         return {"status": "success", "details": "Push in queue"}
 
     except Exception as e:
@@ -56,69 +83,217 @@ def log_activity_task(data, verb, severity_level, description):
         return {"status": "error", "error": str(e)}
 
 
-@shared_task
-def flush_activity_logs():
-    conn = get_redis_connection("default")
-    logs = []
+def _claim_activity_log_batch(conn, batch_size):
+    """
+    Move up to batch_size entries from the queue to the processing list in
+    one MULTI/EXEC round trip. The entries stay in the processing list until
+    they are written to the database, so a worker that dies mid flush does
+    not lose them.
+    """
+    pipe = conn.pipeline(transaction=True)
+    for _ in range(batch_size):
+        pipe.lmove(ACTIVITY_LOG_QUEUE,
+                   ACTIVITY_LOG_PROCESSING_QUEUE, "LEFT", "RIGHT")
+    return [raw for raw in pipe.execute() if raw is not None]
 
-    while True:
-        raw = conn.lpop("activity_log_queue")
-        if raw is None:
-            break
-        logs.append(json.loads(raw))
 
-    logs_to_create = []
-    User = get_user_model()
+def _has_location(log):
+    # requests record the string "None" until the flush locates them
+    return isinstance(log.get("location"), dict) and bool(log["location"])
+
+
+def _valid_ip(value):
+    try:
+        return str(ipaddress.ip_address(str(value).strip()))
+    except ValueError:
+        return None
+
+
+def _text_value(field_name, value):
+    """A text column value cut to the column length, the column default when missing."""
+    field = ActivityLog._meta.get_field(field_name)
+    if value is None:
+        value = field.default
+    value = str(value)
+    return value[:field.max_length] if field.max_length else value
 
-    for log in logs:
-        user = None
-        if log.get("user"):
-            try:
-                user = User.objects.get(pk=log["user"])
-            except User.DoesNotExist:
-                pass
 
-        timestamp = parse_datetime(log["timestamp"])
+def _build_activity_logs(raw_logs):
+    """Turn queued entries into (entry, ActivityLog) pairs, fitting every value to its column."""
+    entries = []
+    for raw in raw_logs:
+        try:
+            log = json.loads(raw)
+        except (TypeError, ValueError):
+            log = None
+        if isinstance(log, dict):
+            entries.append((raw, log))
+        else:
+            logger.warning(f"Dropping malformed activity log entry: {raw!r}")
+
+    # addresses come from client headers, anything that is not one is stored as unknown
+    for _, log in entries:
+        log["ip_address"] = _valid_ip(log.get("ip_address"))
+
+    # locate the batch in one go, the request path only records the ip
+    locations = lookup_locations([
+        log["ip_address"] for _, log in entries
+        if log["ip_address"] and not _has_location(log)
+    ])
+
+    # resolve every user of the batch with one query, deleted users are logged as anonymous
+    user_ids = {log["user"] for _, log in entries if isinstance(log.get("user"), int)}
+    existing_user_ids = set(get_user_model().objects.filter(
+        pk__in=user_ids).values_list("pk", flat=True)) if user_ids else set()
+
+    logs_to_create = []
+    for raw, log in entries:
+        timestamp = parse_datetime(str(log.get("timestamp") or ""))
         if timestamp and is_naive(timestamp):
             timestamp = make_aware(timestamp)
 
-        logs_to_create.append(ActivityLog(
-            user=user,
+        logs_to_create.append((raw, ActivityLog(
+            user_id=log.get("user") if log.get(
+                "user") in existing_user_ids else None,
             ip_address=log["ip_address"],
-            location=log["location"],
-            user_agent=log["user_agent"],
-            request_method=log["request_method"],
-            referrer_url=log["referrer_url"],
-            device=log["device"],
-            path=log["path"],
-            verb=log["verb"],
-            severity_level=log["severity_level"],
-            description=log["description"],
-            timestamp=timestamp
-        ))
-
-    if logs_to_create:
-        for i in range(0, len(logs_to_create), 100):
-            ActivityLog.objects.bulk_create(logs_to_create[i:i+100])
-        return f"{len(logs_to_create)} logs flushed"
+            location=log["location"] if _has_location(
+                log) else locations.get(log["ip_address"], {}),
+            user_agent=_text_value("user_agent", log.get("user_agent")),
+            request_method=_text_value(
+                "request_method", log.get("request_method")),
+            referrer_url=_text_value("referrer_url", log.get("referrer_url")),
+            device=_text_value("device", log.get("device")),
+            path=_text_value("path", log.get("path")),
+            verb=_text_value("verb", log.get("verb")),
+            severity_level=_text_value(
+                "severity_level", log.get("severity_level")),
+            description=_text_value("description", log.get("description")),
+            timestamp=timestamp or now()
+        )))
+    return logs_to_create
+
+
+# the lock is only touched by the flusher whose token it holds
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+REFRESH_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_lock_scripts = None
+
+
+def _get_lock_scripts():
+    global _lock_scripts
+    if _lock_scripts is None:
+        connection = get_redis_connection("default")
+        _lock_scripts = (connection.register_script(RELEASE_LOCK_SCRIPT),
+                         connection.register_script(REFRESH_LOCK_SCRIPT))
+        # load up front so the first calls go straight through EVALSHA
+        connection.script_load(RELEASE_LOCK_SCRIPT)
+        connection.script_load(REFRESH_LOCK_SCRIPT)
+    return _lock_scripts
+
+
+def _release_flush_lock(token):
+    release, _ = _get_lock_scripts()
+    return release(keys=[ACTIVITY_LOG_FLUSH_LOCK], args=[token])
+
+
+def _refresh_flush_lock(token):
+    """Extend the lock of the running flush, False when another flusher owns it now."""
+    _, refresh = _get_lock_scripts()
+    return bool(refresh(keys=[ACTIVITY_LOG_FLUSH_LOCK],
+                        args=[token, ACTIVITY_LOG_FLUSH_LOCK_TIMEOUT]))
+
+
+def _write_activity_log_batch(conn, raw_logs):
+    """
+    Store a claimed batch and release it. When the batch insert fails the
+    logs are stored one by one and the ones the database still refuses go
+    to the dead letter list, so a single bad entry never blocks the flush.
+    """
+    pairs = _build_activity_logs(raw_logs)
+    stored = len(pairs)
+    try:
+        if pairs:
+            with transaction.atomic():
+                ActivityLog.objects.bulk_create(
+                    [log for _, log in pairs], batch_size=ACTIVITY_LOG_BULK_CREATE_BATCH_SIZE)
+    except DatabaseError as e:
+        logger.warning(f"Activity log batch insert failed ({e}), storing logs one by one")
+        stored = 0
+        dead = []
+        for raw, log in pairs:
+            log.pk = None
+            try:
+                with transaction.atomic():
+                    log.save(force_insert=True)
+                stored += 1
+            except DatabaseError as error:
+                logger.error(f"Activity log refused by the database: {error}")
+                dead.append(raw)
+        if dead:
+            conn.rpush(ACTIVITY_LOG_DEAD_LETTER_QUEUE, *dead)
+    # the batch is stored, release it
+    conn.delete(ACTIVITY_LOG_PROCESSING_QUEUE)
+    return stored
+
+
+@shared_task
+def flush_activity_logs(batch_size=ACTIVITY_LOG_FLUSH_BATCH_SIZE):
+    conn = get_redis_connection("default")
+    token = uuid.uuid4().hex
+    # only one flusher may own the processing list at a time
+    if not conn.set(ACTIVITY_LOG_FLUSH_LOCK, token, nx=True, ex=ACTIVITY_LOG_FLUSH_LOCK_TIMEOUT):
+        return "Flush already running"
+
+    flushed = 0
+    deadline = time.monotonic() + ACTIVITY_LOG_FLUSH_MAX_SECONDS
+    try:
+        # a batch left behind by a worker that died while flushing goes first
+        left_over = conn.lrange(ACTIVITY_LOG_PROCESSING_QUEUE, 0, -1)
+        if left_over:
+            flushed += _write_activity_log_batch(conn, left_over)
+
+        while time.monotonic() < deadline:
+            # never claim a batch without holding the lock
+            if not _refresh_flush_lock(token):
+                logger.warning("Activity log flush lock lost, stopping the flush")
+                break
+            raw_logs = _claim_activity_log_batch(conn, batch_size)
+            if not raw_logs:
+                break
+            flushed += _write_activity_log_batch(conn, raw_logs)
+            if len(raw_logs) < batch_size:
+                break
+    finally:
+        _release_flush_lock(token)
+
+    if flushed:
+        return f"{flushed} logs flushed"
     return "No logs to flush"
 
 
 @shared_task
 def delete_expired_activity_logs():
+    """
+    Apply the activity log retention. On postgres the upcoming monthly
+    partitions are created and expired months are dropped as a whole, the
+    few expired rows of the oldest kept month are removed by range.
+    """
+    from .utils.partitions import maintain_activity_log_partitions
     try:
-        # today (timezone aware)
-        today = timezone.now().date()
-
-        # one month ago (same day last month)
-        one_month_ago = today - timedelta(days=30)
-
-        # filter records that are exactly that date (ignoring time)
-        records = ActivityLog.objects.filter(
-            timestamp__date__lte=one_month_ago
-        )
-        count, _ = records.delete()
-        return f"{count} logs deleted"
+        result = maintain_activity_log_partitions()
+        return (f"{result['deleted']} logs deleted, "
+                f"{len(result['dropped'])} partitions dropped")
     except Exception as e:
-        print(e)
+        logger.exception(str(e))
         return f"Error: {str(e)}"
@@ -5,7 +5,20 @@ import pdb
 from ..models import ActivityLog
 from django.utils import timezone
 from unittest.mock import patch
+from django.db import DataError
 from ..utils.permission_classes import AllUserActivityLogPermission
+from .. import tasks
+from ..tasks import (
+    ACTIVITY_LOG_QUEUE, ACTIVITY_LOG_PROCESSING_QUEUE, ACTIVITY_LOG_FLUSH_LOCK,
+    ACTIVITY_LOG_DEAD_LETTER_QUEUE, enqueue_activity_log,
+    flush_activity_logs, delete_expired_activity_logs
+)
+from datetime import datetime, time, timedelta
+from ..utils.log_buffer import log_activity, start_activity_log_buffer, stop_activity_log_buffer
+from ..utils import geoip
+from django_redis import get_redis_connection
+import json
+from django.core.cache import cache
 
 
 class TestForActivityLog(APITestCase):
@@ -137,3 +150,272 @@ class TestForActivityLog(APITestCase):
         self.assertEqual(_response.status_code, 403)
         _response = _response.json()
         self.assertIn("errors", _response)
+
+    @patch.object(AllUserActivityLogPermission, "has_permission", return_value=True)
+    def test_all_user_activity_log_api_with_cursor_pagination(self, mock_permission):
+        """
+        Test all user activity with keyset pagination walking forward and back
+        """
+        # arrange
+        admin = get_user_model().objects.create_superuser(
+            username=self.faker.user_name(), password=self.faker.password(length=8))
+        self.client.force_authenticate(user=admin)
+
+        # act
+        _first = self.client.get(
+            "/api/activity_log/v1/activity/all_user_activity/?pagination=cursor&page_size=150").json()
+        _second = self.client.get(_first["pagination"]["next"]).json()
+        _back = self.client.get(_second["pagination"]["previous"]).json()
+
+        # assert
+        self.assertEqual(len(_first["data"]), 150)
+        self.assertEqual(len(_second["data"]), 50)
+        self.assertIsNone(_first["pagination"]["previous"])
+        self.assertIsNone(_second["pagination"]["next"])
+        ids = [log["id"] for log in _first["data"] + _second["data"]]
+        self.assertEqual(ids, sorted(ids, reverse=True))
+        self.assertEqual(len(set(ids)), 200)
+        self.assertEqual([log["id"] for log in _back["data"]],
+                         [log["id"] for log in _first["data"]])
+
+
+class TestFlushActivityLogs(APITestCase):
+    def setUp(self):
+        self.faker = Faker()
+        self.user = get_user_model().objects.create(
+            username=self.faker.user_name(), password=self.faker.password())
+        self.conn = get_redis_connection("default")
+        self.conn.delete(ACTIVITY_LOG_QUEUE, ACTIVITY_LOG_PROCESSING_QUEUE, ACTIVITY_LOG_FLUSH_LOCK,
+                         ACTIVITY_LOG_DEAD_LETTER_QUEUE)
+
+    def tearDown(self):
+        self.conn.delete(ACTIVITY_LOG_QUEUE, ACTIVITY_LOG_PROCESSING_QUEUE, ACTIVITY_LOG_FLUSH_LOCK,
+                         ACTIVITY_LOG_DEAD_LETTER_QUEUE)
+
+    def build_log(self, user_id):
+        return {
+            'user': user_id,
+            'ip_address': self.faker.ipv4(),
+            'location': "None",
+            'user_agent': self.faker.user_agent(),
+            'request_method': "GET",
+            'referrer_url': self.faker.url(),
+            'device': "Unknown Device",
+            'path': self.faker.uri_path(),
+            'verb': "View",
+            'severity_level': "info",
+            'description': self.faker.sentence(),
+            'timestamp': timezone.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+    def test_flush_activity_logs_in_batches(self):
+        """
+        Test that queued logs are stored in batches, including a batch left behind by a crashed flush
+        """
+        # arrange
+        for _ in range(25):
+            enqueue_activity_log(self.build_log(self.user.id))
+        # a user that no longer exists is stored as anonymous
+        enqueue_activity_log(self.build_log(self.user.id + 1000))
+        self.conn.rpush(ACTIVITY_LOG_PROCESSING_QUEUE,
+                        json.dumps(self.build_log(None)))
+
+        # act
+        result = flush_activity_logs(batch_size=10)
+
+        # assert
+        self.assertEqual(result, "27 logs flushed")
+        self.assertEqual(ActivityLog.objects.filter(user=self.user).count(), 25)
+        self.assertEqual(ActivityLog.objects.filter(user=None).count(), 2)
+        self.assertEqual(self.conn.llen(ACTIVITY_LOG_QUEUE), 0)
+        self.assertEqual(self.conn.llen(ACTIVITY_LOG_PROCESSING_QUEUE), 0)
+        self.assertEqual(flush_activity_logs(), "No logs to flush")
+
+    def test_flush_activity_logs_fits_client_values_to_the_columns(self):
+        """
+        Test that entries with a forged address, a long path or no timestamp are stored anyway
+        """
+        # arrange
+        log = self.build_log(self.user.id)
+        log.update(ip_address="x", path="/" + "a" * 600, device=None)
+        del log["timestamp"]
+        enqueue_activity_log(log)
+
+        # act
+        result = flush_activity_logs()
+
+        # assert
+        self.assertEqual(result, "1 logs flushed")
+        stored = ActivityLog.objects.get()
+        self.assertIsNone(stored.ip_address)
+        self.assertEqual(len(stored.path), 255)
+        self.assertEqual(stored.device, "Unknown Device")
+        self.assertIsNotNone(stored.timestamp)
+
+    def test_flush_activity_logs_moves_refused_logs_to_the_dead_letter_list(self):
+        """
+        Test that a log the database refuses does not keep the rest of its batch from being stored
+        """
+        # arrange
+        for _ in range(3):
+            enqueue_activity_log(self.build_log(self.user.id))
+        poisoned = self.build_log(self.user.id)
+        poisoned["description"] = "poisoned"
+        enqueue_activity_log(poisoned)
+        original_save = ActivityLog.save
+
+        def save(log, *args, **kwargs):
+            if log.description == "poisoned":
+                raise DataError("value too long")
+            return original_save(log, *args, **kwargs)
+
+        # act
+        with patch.object(ActivityLog.objects, "bulk_create", side_effect=DataError("value too long")), \
+                patch.object(ActivityLog, "save", autospec=True, side_effect=save):
+            result = flush_activity_logs()
+
+        # assert
+        self.assertEqual(result, "3 logs flushed")
+        self.assertEqual(ActivityLog.objects.count(), 3)
+        self.assertEqual(self.conn.llen(ACTIVITY_LOG_PROCESSING_QUEUE), 0)
+        dead = self.conn.lrange(ACTIVITY_LOG_DEAD_LETTER_QUEUE, 0, -1)
+        self.assertEqual([json.loads(entry)["description"] for entry in dead], ["poisoned"])
+        self.assertEqual(flush_activity_logs(), "No logs to flush")
+
+    def test_flush_activity_logs_respects_the_lock_of_another_flusher(self):
+        """
+        Test that a running flush is left alone and its lock is not released by the skipped run
+        """
+        # arrange
+        enqueue_activity_log(self.build_log(self.user.id))
+        self.conn.set(ACTIVITY_LOG_FLUSH_LOCK, "other-flusher", ex=60)
+
+        # act
+        result = flush_activity_logs()
+
+        # assert
+        self.assertEqual(result, "Flush already running")
+        self.assertEqual(self.conn.get(ACTIVITY_LOG_FLUSH_LOCK), b"other-flusher")
+        self.assertEqual(ActivityLog.objects.count(), 0)
+
+    def test_flush_activity_logs_stops_when_the_lock_is_lost(self):
+        """
+        Test that a flush whose lock was taken over claims no further batch and keeps the new lock
+        """
+        # arrange
+        for _ in range(20):
+            enqueue_activity_log(self.build_log(self.user.id))
+        original_write = tasks._write_activity_log_batch
+
+        def take_over(*args, **kwargs):
+            # the lock ran out mid batch and another flusher took it
+            self.conn.set(ACTIVITY_LOG_FLUSH_LOCK, "other-flusher", ex=60)
+            return original_write(*args, **kwargs)
+
+        # act
+        with patch.object(tasks, "_write_activity_log_batch", side_effect=take_over):
+            result = flush_activity_logs(batch_size=10)
+
+        # assert
+        self.assertEqual(result, "10 logs flushed")
+        self.assertEqual(self.conn.llen(ACTIVITY_LOG_QUEUE), 10)
+        self.assertEqual(self.conn.get(ACTIVITY_LOG_FLUSH_LOCK), b"other-flusher")
+
+    def test_flush_activity_logs_releases_its_lock(self):
+        """
+        Test that the lock is gone once the flush finished
+        """
+        # arrange
+        enqueue_activity_log(self.build_log(self.user.id))
+
+        # act
+        result = flush_activity_logs()
+
+        # assert
+        self.assertEqual(result, "1 logs flushed")
+        self.assertFalse(self.conn.exists(ACTIVITY_LOG_FLUSH_LOCK))
+
+    def test_request_logs_are_buffered_until_the_response(self):
+        """
+        Test that logs of a request are pushed to the queue together, in the shape the flush expects
+        """
+        # arrange
+        data = {"user_id": self.user.id, "method": "GET", "path": "/api/test/",
+                "ip": "127.0.0.1", "location": "None", "user_agent": "Unknown",
+                "device": "Unknown Device", "referrer_url": "None"}
+        token = start_activity_log_buffer()
+
+        # act
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(3):
+                log_activity(data, verb="View", severity_level="info",
+                             description="user viewed something")
+        queued_before_response = self.conn.llen(ACTIVITY_LOG_QUEUE)
+        stop_activity_log_buffer(token)
+
+        # assert
+        self.assertEqual(queued_before_response, 0)
+        self.assertEqual(self.conn.llen(ACTIVITY_LOG_QUEUE), 3)
+        self.assertEqual(flush_activity_logs(), "3 logs flushed")
+        self.assertEqual(ActivityLog.objects.filter(
+            user=self.user, path="/api/test/").count(), 3)
+
+
+    def test_flush_resolves_locations_from_geoip_database(self):
+        """
+        Test that the flush locates public ips once through the local database and skips private ones
+        """
+        # arrange
+        geoip._location_cache.clear()
+        cache.delete_many(["geoip::8.8.8.8", "geoip::127.0.0.1"])
+
+        class FakeReader:
+            calls = 0
+
+            def get(self, ip):
+                FakeReader.calls += 1
+                return {"country": {"iso_code": "US", "names": {"en": "United States"}},
+                        "city": {"names": {"en": "Mountain View"}},
+                        "location": {"latitude": 37.4, "longitude": -122.1, "time_zone": "America/Los_Angeles"}}
+
+        for ip in ("8.8.8.8", "8.8.8.8", "127.0.0.1"):
+            log = self.build_log(self.user.id)
+            log["ip_address"] = ip
+            enqueue_activity_log(log)
+
+        # act
+        with patch.object(geoip, "get_geoip_reader", return_value=FakeReader()):
+            flush_activity_logs()
+
+        # assert
+        self.assertEqual(FakeReader.calls, 1)
+        public_logs = ActivityLog.objects.filter(ip_address="8.8.8.8")
+        self.assertEqual(public_logs.count(), 2)
+        self.assertEqual(public_logs.first().location["countryCode"], "US")
+        self.assertEqual(public_logs.first().location["city"], "Mountain View")
+        self.assertEqual(ActivityLog.objects.get(
+            ip_address="127.0.0.1").location, {})
+        self.assertEqual(cache.get("geoip::8.8.8.8")["country"], "United States")
+
+class TestActivityLogRetention(APITestCase):
+    def test_delete_expired_activity_logs(self):
+        """
+        Test that logs older than the retention period are removed and recent ones are kept
+        """
+        # arrange
+        today = timezone.localdate()
+        for days_ago in (0, 29, 30, 45, 120):
+            ActivityLog.objects.create(
+                ip_address="127.0.0.1",
+                description=str(days_ago),
+                timestamp=timezone.make_aware(datetime.combine(
+                    today - timedelta(days=days_ago), time(12, 0)))
+            )
+
+        # act
+        result = delete_expired_activity_logs()
+
+        # assert
+        self.assertTrue(result.startswith("3 logs deleted"))
+        self.assertEqual(
+            sorted(ActivityLog.objects.values_list("description", flat=True)), ["0", "29"])
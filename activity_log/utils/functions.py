@@ -1,51 +1,24 @@
-from activity_log.tasks import log_activity_task
-import requests
+import ipaddress
+from activity_log.utils.log_buffer import log_activity
+from .geoip import lookup_location
 import logging
 logger = logging.getLogger("myapp")
 
 
 def get_client_ip(request):
-    """Extract real IP address from headers."""
+    """Extract real IP address from headers, the peer address when the header holds no address."""
     x_forwarded_for = request.META.get("HTTP_X_FORWARDED_FOR")
-    return x_forwarded_for.split(",")[0] if x_forwarded_for else request.META.get("REMOTE_ADDR")
+    if x_forwarded_for:
+        try:
+            return str(ipaddress.ip_address(x_forwarded_for.split(",")[0].strip()))
+        except ValueError:
+            pass
+    return request.META.get("REMOTE_ADDR")
 
 
 def get_location(ip):
-    """Fetch location details using an external API."""
-    reserved_ips = [
-        "127.0.0.1",
-        "10.0.0.0",
-        "172.16.0.0",
-        "192.168.0.0",
-    ]
-
-    if any(ip.startswith(reserved) for reserved in reserved_ips):
-        return {}
-
-    try:
-        response = requests.get(f"http://ip-api.com/json/{ip}")
-        data = response.json()
-        if data["status"] == "success":
-            return {
-                "country": data.get("country"),
-                "countryCode": data.get("countryCode"),
-                "region": data.get("regionName"),
-                "regionCode": data.get("region"),
-                "city": data.get("city"),
-                "zip": data.get("zip"),
-                "lat": data.get("lat"),
-                "lon": data.get("lon"),
-                "timezone": data.get("timezone"),
-                "isp": data.get("isp"),
-                "org": data.get("org"),
-                "as": data.get("as"),
-                "query": data.get("query"),
-            }
-        else:
-            return f"Failed to fetch location: {data.get('message')}"
-    except Exception as e:
-        logger.exception(str(e))
-        return f"Location fetch failed: {str(e)}"
+    """Resolve location details from the local GeoIP database."""
+    return lookup_location(ip)
 
 
 def request_data_activity_log(request):
@@ -66,7 +39,7 @@ def request_data_activity_log(request):
 
 
 def log_request(request, message, severity_level, description):
-    log_activity_task.delay_on_commit(
+    log_activity(
         request_data_activity_log(request),
         verb=message,
         severity_level=severity_level,
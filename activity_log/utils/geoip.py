@@ -0,0 +1,120 @@
+import ipaddress
+import os
+from threading import Lock
+from django.conf import settings
+from django.core.cache import cache
+from core.utils.lru import LRUCache
+import logging
+logger = logging.getLogger("myapp")
+
+try:
+    import maxminddb
+except ImportError:  # location enrichment is disabled without the reader
+    maxminddb = None
+
+# resolved locations kept per process and in redis
+GEOIP_LRU_SIZE = 10000
+GEOIP_CACHE_TIMEOUT = 60*60*24
+
+_location_cache = LRUCache(GEOIP_LRU_SIZE)
+_reader = None
+_reader_lock = Lock()
+
+
+def get_geoip_reader():
+    """Open the memory mapped GeoIP database once per process, None when unavailable."""
+    global _reader
+    if _reader is not None or maxminddb is None:
+        return _reader
+    path = settings.GEOIP_DATABASE_PATH
+    if not os.path.exists(path):
+        return None
+    with _reader_lock:
+        if _reader is None:
+            try:
+                _reader = maxminddb.open_database(path, maxminddb.MODE_MMAP)
+            except Exception as e:
+                logger.exception(str(e))
+    return _reader
+
+
+def _cache_key(ip):
+    return f"geoip::{ip}"
+
+
+def _is_public_ip(ip):
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return False
+    return address.is_global
+
+
+def _name(record, key):
+    return (record.get(key) or {}).get("names", {}).get("en")
+
+
+def _location_from_record(record):
+    """Shape a GeoIP City record like the location ip-api.com used to return."""
+    if not record:
+        return {}
+    subdivisions = record.get("subdivisions") or [{}]
+    location = record.get("location") or {}
+    return {
+        "country": _name(record, "country"),
+        "countryCode": (record.get("country") or {}).get("iso_code"),
+        "region": subdivisions[0].get("names", {}).get("en"),
+        "regionCode": subdivisions[0].get("iso_code"),
+        "city": _name(record, "city"),
+        "zip": (record.get("postal") or {}).get("code"),
+        "lat": location.get("latitude"),
+        "lon": location.get("longitude"),
+        "timezone": location.get("time_zone"),
+    }
+
+
+def lookup_locations(ips):
+    """
+    Return {ip: location} for the given ips. Lookups go through the process
+    LRU, then one redis round trip, then the local database file. Private
+    and unknown addresses resolve to an empty location.
+    """
+    locations = {}
+    missing = []
+    for ip in set(ips):
+        if not ip or not _is_public_ip(ip):
+            locations[ip] = {}
+            continue
+        location = _location_cache.get(ip)
+        if location is None:
+            missing.append(ip)
+        else:
+            locations[ip] = location
+    if not missing:
+        return locations
+
+    cached = cache.get_many([_cache_key(ip) for ip in missing])
+    to_cache = {}
+    reader = get_geoip_reader()
+    for ip in missing:
+        location = cached.get(_cache_key(ip))
+        if location is None:
+            if reader is None:
+                # nothing to resolve with, do not remember the miss
+                locations[ip] = {}
+                continue
+            try:
+                location = _location_from_record(reader.get(ip))
+            except Exception as e:
+                logger.exception(str(e))
+                location = {}
+            to_cache[_cache_key(ip)] = location
+        _location_cache.set(ip, location)
+        locations[ip] = location
+    if to_cache:
+        cache.set_many(to_cache, GEOIP_CACHE_TIMEOUT)
+    return locations
+
+
+def lookup_location(ip):
+    return lookup_locations([ip]).get(ip, {})
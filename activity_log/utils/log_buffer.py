@@ -0,0 +1,59 @@
+from contextvars import ContextVar
+from django.db import transaction
+from activity_log.tasks import build_activity_log_entry, enqueue_activity_logs
+import logging
+logger = logging.getLogger("myapp")
+
+# entries pushed at once when a request logs a lot
+ACTIVITY_LOG_BUFFER_SIZE = 50
+
+# entries logged by the current request, None outside a request
+_activity_log_buffer = ContextVar("activity_log_buffer", default=None)
+
+
+def _push_entries(entries):
+    # activity logging must never break the request it describes
+    try:
+        enqueue_activity_logs(entries)
+    except Exception as e:
+        logger.exception(str(e))
+
+
+def _buffer_entry(entry):
+    buffer = _activity_log_buffer.get()
+    if buffer is None:
+        _push_entries([entry])
+        return
+    buffer.append(entry)
+    if len(buffer) >= ACTIVITY_LOG_BUFFER_SIZE:
+        flush_activity_log_buffer()
+
+
+def log_activity(data, verb, severity_level, description):
+    """
+    Record an activity log entry. Like log_activity_task.delay_on_commit the
+    entry is dropped when the surrounding transaction rolls back, but it is
+    written straight to the redis queue instead of going through a celery
+    task. Inside a request the entries are buffered and pushed with one
+    RPUSH by ActivityLogBufferMiddleware when the response is ready.
+    """
+    entry = build_activity_log_entry(
+        data, verb, severity_level, description)
+    transaction.on_commit(lambda: _buffer_entry(entry))
+
+
+def start_activity_log_buffer():
+    return _activity_log_buffer.set([])
+
+
+def flush_activity_log_buffer():
+    buffer = _activity_log_buffer.get()
+    if buffer:
+        entries = buffer[:]
+        buffer.clear()
+        _push_entries(entries)
+
+
+def stop_activity_log_buffer(token):
+    flush_activity_log_buffer()
+    _activity_log_buffer.reset(token)
@@ -0,0 +1,231 @@
+from datetime import date, datetime, time, timedelta
+from django.db import connections, router
+from django.utils import timezone
+from activity_log.models import ActivityLog
+import logging
+logger = logging.getLogger("myapp")
+
+# partitions created ahead of time so inserts never land in the default partition
+ACTIVITY_LOG_PARTITION_MONTHS_AHEAD = 3
+ACTIVITY_LOG_RETENTION_DAYS = 30
+
+
+def _table_name():
+    return ActivityLog._meta.db_table
+
+
+def _get_connection():
+    return connections[router.db_for_write(ActivityLog)]
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def next_month(day):
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def month_boundary(month):
+    """Local midnight of the first day of the month, partitions follow local months."""
+    return timezone.make_aware(datetime.combine(month, time.min))
+
+
+def partition_name(month):
+    return f"{_table_name()}_{month:%Y_%m}"
+
+
+def default_partition_name():
+    return f"{_table_name()}_default"
+
+
+def is_partitioned(connection=None):
+    """Return True when the activity log table is a postgres partitioned table."""
+    connection = connection or _get_connection()
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)",
+            [_table_name()])
+        return cursor.fetchone() is not None
+
+
+def create_month_partition(cursor, month):
+    """Create the partition holding the rows of the given month if it is missing."""
+    quote = cursor.db.ops.quote_name
+    start = month_start(month)
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {quote(partition_name(start))} "
+        f"PARTITION OF {quote(_table_name())} "
+        f"FOR VALUES FROM (%s) TO (%s)",
+        [month_boundary(start), month_boundary(next_month(start))])
+
+
+def list_month_partitions(cursor):
+    """Return (month, partition name) of every monthly partition."""
+    cursor.execute("""
+        SELECT child.relname FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = %s
+    """, [_table_name()])
+    prefix = f"{_table_name()}_"
+    partitions = []
+    for (name,) in cursor.fetchall():
+        try:
+            month = datetime.strptime(
+                name[len(prefix):], "%Y_%m").date()
+        except ValueError:
+            # the default partition
+            continue
+        partitions.append((month, name))
+    return sorted(partitions)
+
+
+def ensure_partitions(months_ahead=ACTIVITY_LOG_PARTITION_MONTHS_AHEAD, today=None):
+    """Create the partitions of the current month and the next months_ahead months."""
+    connection = _get_connection()
+    if not is_partitioned(connection):
+        return []
+    month = month_start(today or timezone.localdate())
+    created = []
+    with connection.cursor() as cursor:
+        for _ in range(months_ahead + 1):
+            create_month_partition(cursor, month)
+            created.append(partition_name(month))
+            month = next_month(month)
+    return created
+
+
+def retention_cutoff(retention_days=ACTIVITY_LOG_RETENTION_DAYS, today=None):
+    """Logs of the day retention_days ago and older are expired."""
+    today = today or timezone.localdate()
+    first_kept_day = today - timedelta(days=retention_days - 1)
+    return timezone.make_aware(datetime.combine(first_kept_day, time.min))
+
+
+def drop_expired_partitions(cutoff):
+    """Drop every monthly partition that ends before the cutoff."""
+    connection = _get_connection()
+    if not is_partitioned(connection):
+        return []
+    quote = connection.ops.quote_name
+    dropped = []
+    with connection.cursor() as cursor:
+        for month, name in list_month_partitions(cursor):
+            if month_boundary(next_month(month)) <= cutoff:
+                cursor.execute(f"DROP TABLE IF EXISTS {quote(name)}")
+                dropped.append(name)
+    return dropped
+
+
+def delete_expired_rows(cutoff):
+    """
+    Delete the expired rows left in partitions that are still kept. The
+    range condition uses the timestamp index and, unlike queryset.delete(),
+    does not load the rows to collect signals.
+    """
+    connection = _get_connection()
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote(_table_name())} WHERE {quote('timestamp')} < %s",
+            [cutoff])
+        return cursor.rowcount
+
+
+def maintain_activity_log_partitions(months_ahead=ACTIVITY_LOG_PARTITION_MONTHS_AHEAD,
+                                     retention_days=ACTIVITY_LOG_RETENTION_DAYS):
+    """Create upcoming partitions and apply the retention period."""
+    cutoff = retention_cutoff(retention_days)
+    created = ensure_partitions(months_ahead)
+    dropped = drop_expired_partitions(cutoff)
+    deleted = delete_expired_rows(cutoff)
+    return {
+        "created": created,
+        "dropped": dropped,
+        "deleted": deleted,
+    }
+
+
+def convert_to_partitioned_table(schema_editor, months_ahead=ACTIVITY_LOG_PARTITION_MONTHS_AHEAD):
+    """
+    Rebuild the activity log table as a table partitioned by month on
+    timestamp. Postgres needs the partition key in the primary key, so the
+    primary key becomes (id, timestamp); ids keep coming from a sequence.
+    Existing rows, indexes and foreign keys are carried over.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql" or is_partitioned(connection):
+        return
+    quote = connection.ops.quote_name
+    table = _table_name()
+    old_table = f"{table}_unpartitioned"
+    sequence = f"{table}_id_partitioned_seq"
+
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT indexname, indexdef FROM pg_indexes
+            WHERE tablename = %s AND indexname NOT IN (
+                SELECT conname FROM pg_constraint
+                WHERE conrelid = to_regclass(%s) AND contype IN ('p', 'u')
+            )
+        """, [table, table])
+        indexes = cursor.fetchall()
+        cursor.execute("""
+            SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+            WHERE conrelid = to_regclass(%s) AND contype = 'f'
+        """, [table])
+        foreign_keys = cursor.fetchall()
+        cursor.execute(
+            f"SELECT min({quote('timestamp')}), max({quote('timestamp')}) FROM {quote(table)}")
+        first_timestamp, last_timestamp = cursor.fetchone()
+
+        cursor.execute(
+            f"ALTER TABLE {quote(table)} RENAME TO {quote(old_table)}")
+        for index_name, _ in indexes:
+            cursor.execute(
+                f"ALTER INDEX {quote(index_name)} RENAME TO {quote(index_name + '_old')}")
+        cursor.execute(
+            f"ALTER TABLE {quote(old_table)} RENAME CONSTRAINT {quote(table + '_pkey')} TO {quote(table + '_pkey_old')}")
+
+        cursor.execute(
+            f"CREATE TABLE {quote(table)} (LIKE {quote(old_table)} INCLUDING DEFAULTS) "
+            f"PARTITION BY RANGE ({quote('timestamp')})")
+        cursor.execute(
+            f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(table + '_pkey')} "
+            f"PRIMARY KEY (id, {quote('timestamp')})")
+        cursor.execute(f"CREATE SEQUENCE {quote(sequence)} AS bigint")
+        cursor.execute(
+            f"ALTER TABLE {quote(table)} ALTER COLUMN id SET DEFAULT nextval('{sequence}')")
+
+        today = timezone.localdate()
+        month = month_start(timezone.localtime(first_timestamp).date()
+                            if first_timestamp else today)
+        last_month = month_start(today)
+        if last_timestamp:
+            last_month = max(last_month, month_start(
+                timezone.localtime(last_timestamp).date()))
+        for _ in range(months_ahead):
+            last_month = next_month(last_month)
+        while month <= last_month:
+            create_month_partition(cursor, month)
+            month = next_month(month)
+        # catches rows outside the created months instead of failing the insert
+        cursor.execute(
+            f"CREATE TABLE {quote(default_partition_name())} PARTITION OF {quote(table)} DEFAULT")
+
+        cursor.execute(
+            f"INSERT INTO {quote(table)} SELECT * FROM {quote(old_table)}")
+        cursor.execute(
+            f"SELECT setval('{sequence}', COALESCE((SELECT max(id) FROM {quote(table)}), 0) + 1, false)")
+        cursor.execute(f"DROP TABLE {quote(old_table)}")
+        cursor.execute(
+            f"ALTER SEQUENCE {quote(sequence)} OWNED BY {quote(table)}.id")
+
+        for index_name, index_definition in indexes:
+            cursor.execute(index_definition)
+        for constraint_name, constraint_definition in foreign_keys:
+            cursor.execute(
+                f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(constraint_name)} {constraint_definition}")
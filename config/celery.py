@@ -2,6 +2,7 @@ from __future__ import absolute_import, unicode_literals
 import os
 
 from celery import Celery
+from celery.signals import worker_process_init
 from django.conf import settings
 
 DJANGO_ENV = os.getenv('DJANGO_ENV', 'development')
@@ -19,6 +20,12 @@ app.config_from_object(settings, namespace='CELERY')
 app.autodiscover_tasks()
 
 
+@worker_process_init.connect
+def reset_database_pools(**kwargs):
+    from core.utils.db_pool import reset_pools_after_fork
+    reset_pools_after_fork()
+
+
 @app.task(bind=True)
 def debug_task(self):
     print(f"Request: {self.request!r}")
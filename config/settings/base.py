@@ -66,6 +66,9 @@ MIDDLEWARE = [
     # Custom
     'account.middleware.JWTMiddleware',
     'core.middleware.MaxUploadSizeMiddleware',
+    'activity_log.middleware.ActivityLogBufferMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
+    'dashboard.middleware.ActiveUserMiddleware',
 ]
 
 # URL & WSGI
@@ -91,6 +94,10 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# GeoIP (MaxMind GeoLite2/GeoIP2 City database used to locate activity logs)
+GEOIP_DATABASE_PATH = env(
+    "GEOIP_DATABASE_PATH", default=os.path.join(BASE_DIR, 'geoip', 'GeoLite2-City.mmdb'))
+
 # Default auto field
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -129,6 +136,12 @@ SIMPLE_JWT = {
     # Send cookies only over HTTPS (for production)
     "AUTH_COOKIE_SECURE": env.bool("COOKIE_SECURE", default=False),
 }
+# Authenticate from the token claims without loading the user, see account.authentication
+if env.bool("STATELESS_JWT_AUTHENTICATION", default=False):
+    REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES'] = [
+        'account.authentication.StatelessJWTAuthentication']
+# Embed the permission bitmask of the user in the tokens issued on login
+PERMISSION_CLAIMS_IN_TOKEN = env.bool("PERMISSION_CLAIMS_IN_TOKEN", default=False)
 
 # Celery settings
 result_backend = 'django-db'
@@ -240,10 +253,14 @@ EMAIL_HOST_USER = env("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = env("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = env("EMAIL_HOST_USER")
 
+# Where otps and email verifications are kept, see account.utils.otp_store
+OTP_STORE = env("OTP_STORE", default="account.utils.otp_store.RedisOTPStore")
+
 if 'test' in sys.argv:
     # Disable throttling in tests
     REST_FRAMEWORK['DEFAULT_THROTTLE_CLASSES'] = []
     REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] = {}
+    OTP_STORE = "account.utils.otp_store.DatabaseOTPStore"
 
 DATABASES = {
     'default': {
@@ -257,6 +274,13 @@ DATABASES = {
 }
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')  # Collected files
 
+# Read replicas, routed by core.db_router.ReplicaRouter
+DATABASE_REPLICAS = []
+DATABASE_ANALYTICS_REPLICA = None
+# Clients read from the primary for this long after a write
+REPLICA_PIN_COOKIE = "db_pin"
+REPLICA_PIN_SECONDS = 5
+
 
 CELERY_BEAT_SCHEDULE = {
     "flush-activity-logs-every-10-min": {
@@ -265,7 +289,28 @@ CELERY_BEAT_SCHEDULE = {
     },
     "delete-expired-activity-logs-daily": {
         "task": "activity_log.tasks.delete_expired_activity_logs",
-        "schedule": crontab(minute=0, hour=0),  # Runs every day at 00:00
+        # Runs every day at 00:00, also creates the upcoming activity log partitions
+        "schedule": crontab(minute=0, hour=0),
 
     },
+    "refresh-dashboard-snapshot-every-5-min": {
+        "task": "dashboard.tasks.refresh_dashboard_snapshot_task",
+        "schedule": crontab(minute="*/5"),
+    },
+    "rollup-daily-active-users-daily": {
+        "task": "dashboard.tasks.rollup_daily_active_users",
+        "schedule": crontab(minute=5, hour=0),
+    },
+    "schedule-email-retries-every-minute": {
+        "task": "mails.tasks.schedule_email_retries",
+        "schedule": crontab(minute="*"),
+    },
+    "requeue-stale-email-chunks-every-5-min": {
+        "task": "mails.tasks.requeue_stale_email_chunks",
+        "schedule": crontab(minute="*/5"),
+    },
+    "resume-stale-excel-import-jobs-every-10-min": {
+        "task": "member_financial_management.tasks.resume_stale_excel_import_jobs",
+        "schedule": crontab(minute="*/10"),
+    },
 }
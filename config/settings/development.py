@@ -25,6 +25,13 @@ DATABASES = {
 
 # DATABASE_ROUTERS = ['core.db_router.SecondaryRouter']
 
+# A second connection to the same file to try the replica routing locally
+if env.bool("DB_LOCAL_REPLICA", default=False):
+    DATABASES["replica"] = {
+        **DATABASES["default"], "TEST": {"MIRROR": "default"}}
+    DATABASE_REPLICAS = ["replica"]
+    DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+
 
 
 # Email settings (use console backend for development)
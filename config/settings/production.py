@@ -26,6 +26,35 @@ DATABASES = {
         'PORT': env("DB_PORT"),
     }
 }
+# Every gunicorn worker and celery process keeps its own pool, size it to
+# the threads of the process: DB_POOL_SIZE=2 for a gunicorn worker running
+# 2 threads, DB_POOL_SIZE=1 for the celery prefork children
+if env.bool("DB_POOL", default=True):
+    DATABASES["default"]["ENGINE"] = "dj_db_conn_pool.backends.postgresql"
+    DATABASES["default"]["POOL_OPTIONS"] = {
+        "POOL_SIZE": env.int("DB_POOL_SIZE", default=5),
+        "MAX_OVERFLOW": env.int("DB_POOL_MAX_OVERFLOW", default=5),
+        # close connections older than this instead of handing them out
+        "RECYCLE": env.int("DB_POOL_RECYCLE", default=60*15),
+        # seconds to wait for a free connection
+        "TIMEOUT": env.int("DB_POOL_TIMEOUT", default=30),
+        # test every connection on checkout, a dead one is replaced
+        "PRE_PING": True,
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = env.int("DB_CONN_MAX_AGE", default=60)
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+# Read replicas share the credentials of the primary
+for number, host in enumerate(env.list("DB_REPLICA_HOSTS", default=[]), start=1):
+    DATABASES[f"replica_{number}"] = {
+        **DATABASES["default"], "HOST": host, "TEST": {"MIRROR": "default"}}
+    DATABASE_REPLICAS.append(f"replica_{number}")
+if env("DB_ANALYTICS_HOST", default=""):
+    DATABASES["analytics"] = {
+        **DATABASES["default"], "HOST": env("DB_ANALYTICS_HOST"), "TEST": {"MIRROR": "default"}}
+    DATABASE_ANALYTICS_REPLICA = "analytics"
+if DATABASE_REPLICAS or DATABASE_ANALYTICS_REPLICA:
+    DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
 # local database for testing
 # DATABASES = {
 #     'default': {
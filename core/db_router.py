@@ -1,5 +1,10 @@
 
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
 from django.apps import apps
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
 
 SYSTEM_APPS = [
     'admin', 'auth', 'contenttypes', 'sessions', 'messages', 'staticfiles'
@@ -31,3 +36,102 @@ class SecondaryRouter:
         if app_label in self.SECONDARY_APPS:
             return db == 'secondary'
         return None
+
+
+# Read replica routing
+
+READ_REPLICA = "replica"
+READ_ANALYTICS = "analytics"
+
+
+class RoutingState:
+    """Where the reads of the current request or block may go."""
+    __slots__ = ("reads", "wrote")
+
+    def __init__(self, reads=None):
+        self.reads = reads
+        self.wrote = False
+
+
+_routing_state = ContextVar("db_routing_state", default=None)
+
+
+def start_routing(reads=None):
+    return _routing_state.set(RoutingState(reads))
+
+
+def stop_routing(token):
+    state = _routing_state.get()
+    _routing_state.reset(token)
+    return state
+
+
+@contextmanager
+def reads_from(reads):
+    token = start_routing(reads)
+    try:
+        yield
+    finally:
+        state = stop_routing(token)
+        # a write inside the block pins the enclosing request too
+        outer = _routing_state.get()
+        if outer is not None and state.wrote:
+            outer.wrote = True
+            outer.reads = None
+
+
+def analytics_reads():
+    """Send the reads of the block to the analytics replica, for dashboards and reports."""
+    return reads_from(READ_ANALYTICS)
+
+
+def replica_aliases():
+    return list(getattr(settings, "DATABASE_REPLICAS", []))
+
+
+def analytics_alias():
+    return getattr(settings, "DATABASE_ANALYTICS_REPLICA", None)
+
+
+class ReplicaRouter:
+    """
+    Primary plus N replicas holding the same data. Reads only leave the
+    primary when the request or block allows it (safe methods, see
+    core.middleware.ReplicaRoutingMiddleware, or analytics_reads), and
+    never inside a transaction or after a write in the same request.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _routing_state.get()
+        if state is None or state.reads is None:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if state.reads == READ_ANALYTICS and analytics_alias():
+            return analytics_alias()
+        replicas = replica_aliases()
+        if replicas:
+            return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _routing_state.get()
+        if state is not None:
+            # read your writes for the rest of the request
+            state.wrote = True
+            state.reads = None
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        if analytics_alias():
+            databases.add(analytics_alias())
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replicas receive the schema from the primary
+        if db in replica_aliases() or db == analytics_alias():
+            return False
+        return None
@@ -2,6 +2,7 @@
 import json
 from django.conf import settings
 from django.http import JsonResponse
+from .db_router import READ_REPLICA, start_routing, stop_routing
 
 class MaxUploadSizeMiddleware:
     """
@@ -26,3 +27,30 @@ class MaxUploadSizeMiddleware:
 
         response = self.get_response(request)
         return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Let the reads of GET and HEAD requests go to the read replicas. A
+    request that writes sets a short-lived cookie, the next requests of the
+    same client read from the primary until it expires so they see their
+    own writes.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.pin_cookie = settings.REPLICA_PIN_COOKIE
+        self.pin_seconds = settings.REPLICA_PIN_SECONDS
+
+    def __call__(self, request):
+        reads = None
+        if request.method in ("GET", "HEAD") and not request.COOKIES.get(self.pin_cookie):
+            reads = READ_REPLICA
+        token = start_routing(reads)
+        try:
+            response = self.get_response(request)
+        finally:
+            state = stop_routing(token)
+        if state.wrote:
+            response.set_cookie(self.pin_cookie, "1", max_age=self.pin_seconds,
+                                httponly=True, samesite="Lax")
+        return response
@@ -0,0 +1,64 @@
+import base64
+import json
+from datetime import date, timedelta
+from urllib.parse import parse_qs, urlparse
+from django.test import TestCase
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from activity_log.models import ActivityLog
+from dashboard.models import DailyActiveUsers
+from ..utils.pagination import CustomPageNumberPagination
+
+
+class TestCursorPagination(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def paginate(self, queryset, query=""):
+        request = Request(self.factory.get(f"/?pagination=cursor&page_size=2{query}"))
+        paginator = CustomPageNumberPagination()
+        return paginator, paginator.paginate_queryset(queryset, request)
+
+    def test_cursor_pagination_falls_back_to_the_model_ordering(self):
+        """
+        Test that a queryset without order_by is walked in the default ordering of its model
+        """
+        # arrange
+        today = date.today()
+        for days in range(5):
+            DailyActiveUsers.objects.create(date=today - timedelta(days=days))
+
+        # act
+        paginator, first = self.paginate(DailyActiveUsers.objects.all())
+        cursor = parse_qs(urlparse(paginator.next_cursor).query)["cursor"][0]
+        _, second = self.paginate(DailyActiveUsers.objects.all(), f"&cursor={cursor}")
+
+        # assert
+        self.assertEqual([row.date for row in first + second],
+                         [today - timedelta(days=days) for days in range(4)])
+
+    def test_cursor_pagination_rejects_related_field_ordering(self):
+        """
+        Test that ordering by a related field is refused with a 400 instead of failing on the page
+        """
+        # act
+        with self.assertRaises(ValidationError) as error:
+            self.paginate(ActivityLog.objects.order_by("user__username"))
+
+        # assert
+        self.assertEqual(error.exception.status_code, 400)
+        self.assertIn("user__username", str(error.exception.detail["pagination"][0]))
+
+    def test_cursor_pagination_rejects_malformed_cursors(self):
+        """
+        Test that a well formed cursor carrying something else than a position is refused
+        """
+        # arrange
+        cursors = [base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+                   for payload in ({"p": 5, "r": False}, {"p": None, "r": False}, [1, 2])]
+
+        # act, assert
+        for cursor in cursors:
+            with self.assertRaises(NotFound):
+                self.paginate(DailyActiveUsers.objects.all(), f"&cursor={cursor}")
@@ -24,6 +24,8 @@ urlpatterns = [
     path('v1/descendant_relation_type_choice/',
          DescendantRelationChoiceView.as_view(), name="descendant_relation"),
     path('v1/all_choices/', AllChoicesView.as_view(), name="all_choices"),
+    path('v1/database_pool_stats/', DatabasePoolStatsView.as_view(),
+         name="database_pool_stats"),
 
 
 ]
@@ -0,0 +1,47 @@
+from django.conf import settings
+
+try:
+    from dj_db_conn_pool.core import pool_container
+except ImportError:
+    pool_container = {}
+
+# pools inherited from the parent of a forked process, kept referenced so
+# the child never closes the sockets the parent is still using
+_inherited_pools = []
+
+
+def pooled_aliases():
+    return [alias for alias, database in settings.DATABASES.items()
+            if "POOL_OPTIONS" in database]
+
+
+def get_pool_stats():
+    """Checked in, checked out and overflow connections of every pooled database of this process."""
+    stats = []
+    for alias in pooled_aliases():
+        options = settings.DATABASES[alias]["POOL_OPTIONS"]
+        pool = pool_container.get(alias) if alias in pool_container else None
+        stats.append({
+            "alias": alias,
+            "created": pool is not None,
+            "pool_size": options.get("POOL_SIZE"),
+            "max_overflow": options.get("MAX_OVERFLOW"),
+            "checked_in": pool.checkedin() if pool else 0,
+            "checked_out": pool.checkedout() if pool else 0,
+            "overflow": max(pool.overflow(), 0) if pool else 0,
+        })
+    return stats
+
+
+def reset_pools_after_fork():
+    """
+    Give a forked process (a celery pool worker) fresh pools. The inherited
+    ones are left untouched instead of disposed, their connections belong
+    to the parent.
+    """
+    if not pool_container:
+        return
+    with pool_container.lock:
+        for alias, pool in list(pool_container.items()):
+            _inherited_pools.append(pool)
+            pool_container[alias] = pool.recreate()
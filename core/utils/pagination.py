@@ -1,12 +1,75 @@
+import base64
+import json
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def estimate_table_count(queryset):
+    """
+    Return the planner estimate of the table row count from pg_class.reltuples.
+    Returns None when no usable estimate exists (filtered queryset, not postgres,
+    or a table that has never been analyzed).
+    """
+    if queryset.query.where:
+        return None
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [queryset.model._meta.db_table]
+        )
+        row = cursor.fetchone()
+    if not row or row[0] < 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that reads the row count from the planner statistics when possible."""
+
+    @cached_property
+    def count(self):
+        estimated = estimate_table_count(self.object_list)
+        if estimated is not None:
+            return estimated
+        return super().count
+
 
 class CustomPageNumberPagination(PageNumberPagination):
-    page_size = 100    
-    page_size_query_param = 'page_size' 
+    page_size = 100
+    page_size_query_param = 'page_size'
     max_page_size = 200
+    # ?pagination=cursor switches to keyset pagination
+    pagination_mode_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+    # ?count=estimated reads the count from pg_class instead of COUNT(*)
+    count_mode_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.use_cursor = request.query_params.get(
+            self.pagination_mode_query_param) == "cursor"
+        self.use_estimated_count = request.query_params.get(
+            self.count_mode_query_param) == "estimated"
+        if self.use_cursor:
+            return self.paginate_queryset_by_cursor(queryset, request)
+        if self.use_estimated_count:
+            self.django_paginator_class = EstimatedCountPaginator
+        return super().paginate_queryset(queryset, request, view=view)
 
     def get_paginated_response(self, data,status=200):
+        if getattr(self, "use_cursor", False):
+            return self.get_cursor_paginated_response(data, status)
         return Response({
             **({"data": data} if isinstance(data, list) else data),
             "pagination": {
@@ -17,6 +80,133 @@ class CustomPageNumberPagination(PageNumberPagination):
                     "previous": self.get_previous_link(),
                     "page_size": self.page_size,
                 }
-            
-            
-        },status=status)
\ No newline at end of file
+
+
+        },status=status)
+
+    # keyset pagination
+
+    def get_ordering(self, queryset):
+        """
+        Return the ordering of the queryset, the default ordering of its model
+        when it has none, as (field, descending) pairs, always ending with the
+        primary key so that every position is unique. Only fields of the model
+        itself can be compared against a cursor.
+        """
+        model_meta = queryset.model._meta
+        ordering = []
+        for field in queryset.query.order_by or model_meta.ordering or ("pk",):
+            if not isinstance(field, str) or field == "?":
+                raise ValueError("Keyset pagination needs field based ordering")
+            descending = field.startswith("-")
+            name = field.lstrip("-")
+            if name == "pk":
+                name = model_meta.pk.name
+            if "__" in name:
+                raise ValueError(
+                    f"Keyset pagination can not order by the related field {name}")
+            try:
+                # foreign keys are compared by their column
+                name = model_meta.get_field(name).attname
+            except FieldDoesNotExist:
+                raise ValueError(
+                    f"Keyset pagination can not order by {name}")
+            ordering.append((name, descending))
+        pk_name = model_meta.pk.attname
+        if ordering[-1][0] != pk_name:
+            ordering.append((pk_name, ordering[-1][1]))
+        return ordering
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({"p": position, "r": reverse}, default=str)
+        cursor = base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            if not isinstance(payload["p"], list):
+                raise ValueError("Cursor position must be a list")
+            return payload["p"], bool(payload["r"])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def build_keyset_filter(self, queryset, ordering, position, reverse):
+        """
+        Build (f1 > v1) OR (f1 = v1 AND f2 > v2) ... for the given ordering,
+        comparing in the opposite direction when paging backwards.
+        """
+        model_meta = queryset.model._meta
+        values = []
+        for (name, _), raw in zip(ordering, position):
+            values.append(model_meta.get_field(name).to_python(raw))
+
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(ordering, values):
+            lookup = "lt" if descending != reverse else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def paginate_queryset_by_cursor(self, queryset, request):
+        page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.base_url = remove_query_param(self.base_url, self.page_query_param)
+        self.page_size = page_size
+        try:
+            ordering = self.get_ordering(queryset)
+        except ValueError as e:
+            raise ValidationError({self.pagination_mode_query_param: [str(e)]})
+        position, reverse = self.decode_cursor(request)
+        self.estimated_count = None
+        if self.use_estimated_count:
+            self.estimated_count = estimate_table_count(queryset)
+
+        if position is not None:
+            if len(position) != len(ordering):
+                raise NotFound(self.invalid_cursor_message)
+            try:
+                queryset = queryset.filter(self.build_keyset_filter(
+                    queryset, ordering, position, reverse))
+            except Exception:
+                raise NotFound(self.invalid_cursor_message)
+        if reverse:
+            queryset = queryset.order_by(*[
+                name if descending else f"-{name}" for name, descending in ordering
+            ])
+        else:
+            queryset = queryset.order_by(*[
+                f"-{name}" if descending else name for name, descending in ordering
+            ])
+
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+
+        self.next_cursor = None
+        self.previous_cursor = None
+        if results:
+            first = [getattr(results[0], name) for name, _ in ordering]
+            last = [getattr(results[-1], name) for name, _ in ordering]
+            if has_more or reverse:
+                self.next_cursor = self.encode_cursor(last, False)
+            if position is not None and (has_more or not reverse):
+                self.previous_cursor = self.encode_cursor(first, True)
+        return results
+
+    def get_cursor_paginated_response(self, data, status=200):
+        return Response({
+            **({"data": data} if isinstance(data, list) else data),
+            "pagination": {
+                "count": self.estimated_count,
+                "next": self.next_cursor,
+                "previous": self.previous_cursor,
+                "page_size": self.page_size,
+            }
+        }, status=status)
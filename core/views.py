@@ -2,7 +2,7 @@ from rest_framework.views import APIView
 from .serializers import *
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.viewsets import ModelViewSet
 from .models import *
 from member.utils.utility_functions import generate_member_id
@@ -10,6 +10,7 @@ import pdb
 from member.utils.permission_classes import MemberManagementPermission
 from rest_framework.exceptions import ValidationError, PermissionDenied
 from django.core.cache import cache
+from .utils.db_pool import get_pool_stats
 
 
 class MembershipTypeView(APIView):
@@ -764,3 +765,25 @@ class AllChoicesView(APIView):
                 'errors': {
                     'server_error': [str(e)]
                 }}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class DatabasePoolStatsView(APIView):
+    """Connection pool usage of the process serving the request, for monitoring."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        try:
+            return Response({
+                "code": status.HTTP_200_OK,
+                "message": "Database pool stats fetched successfully",
+                "status": "success",
+                "data": get_pool_stats()
+            }, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({
+                "code": status.HTTP_500_INTERNAL_SERVER_ERROR,
+                "message": "Error occurred",
+                "status": "failed",
+                'errors': {
+                    'server_error': [str(e)]
+                }}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,19 @@
+# dashboard/middleware.py
+from .utils.active_users import record_active_user
+
+
+class ActiveUserMiddleware:
+    """
+    Count the user of every authenticated request as active today. Read
+    after the response since DRF authenticates inside the view.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            record_active_user(user.pk)
+        return response
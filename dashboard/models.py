@@ -1,3 +1,38 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_save, post_delete
+from member.models import Member, MembershipType, MembershipStatusChoice
+from restaurant.models import Restaurant
+from product.models import Product
+from event.models import Event
+from .utils.metrics import invalidate_dashboard_snapshot
 
-# Create your models here.
+# models counted by the dashboard snapshot (see dashboard.utils.metrics)
+DASHBOARD_COUNTED_MODELS = (
+    Member, MembershipType, MembershipStatusChoice, Restaurant, Product, Event)
+
+
+def dashboard_snapshot_invalidation_signal(sender, **kwargs):
+    transaction.on_commit(invalidate_dashboard_snapshot)
+
+
+for model in DASHBOARD_COUNTED_MODELS:
+    post_save.connect(dashboard_snapshot_invalidation_signal, sender=model,
+                      dispatch_uid=f"dashboard_snapshot_{model.__name__}_save")
+    post_delete.connect(dashboard_snapshot_invalidation_signal, sender=model,
+                        dispatch_uid=f"dashboard_snapshot_{model.__name__}_delete")
+
+
+class DailyActiveUsers(models.Model):
+    """Active user counts of a past day rolled up from the redis HyperLogLogs."""
+    date = models.DateField(unique=True)
+    daily_active_users = models.PositiveIntegerField(default=0)
+    weekly_active_users = models.PositiveIntegerField(default=0)
+    monthly_active_users = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-date"]
+
+    def __str__(self):
+        return f"{self.date}: {self.daily_active_users}"
@@ -0,0 +1,22 @@
+from celery import shared_task
+from datetime import date, timedelta
+from django.utils import timezone
+from .models import DailyActiveUsers
+from .utils.active_users import get_active_user_counts
+from .utils.metrics import refresh_dashboard_snapshot
+
+
+@shared_task
+def refresh_dashboard_snapshot_task():
+    refresh_dashboard_snapshot()
+
+
+@shared_task
+def rollup_daily_active_users(day=None):
+    """Store the active user counts of a day, yesterday by default, before its HyperLogLog expires."""
+    if day is None:
+        day = timezone.localdate() - timedelta(days=1)
+    else:
+        day = date.fromisoformat(day)
+    DailyActiveUsers.objects.update_or_create(
+        date=day, defaults=get_active_user_counts(day))
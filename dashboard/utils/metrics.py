@@ -0,0 +1,120 @@
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils.timezone import now
+from member.models import Member
+from restaurant.models import Restaurant
+from product.models import Product
+from event.models import Event
+from core.db_router import analytics_reads
+from .filters import MemberFilter
+
+DASHBOARD_SNAPSHOT_KEY = "dashboard::snapshot"
+# changes made with queryset.update() send no signal, the periodic refresh
+# (dashboard.tasks.refresh_dashboard_snapshot_task) catches them well before
+# the snapshot expires
+DASHBOARD_SNAPSHOT_TIMEOUT = 60*30
+
+# query params that ask for a live count over a created_at range, see MemberFilter
+DATE_FILTER_PARAMS = ("created_at", "created_at_after", "created_at_before")
+
+
+def has_date_filter(params):
+    return any(params.get(param) for param in DATE_FILTER_PARAMS)
+
+
+def count_members(queryset):
+    """Total, active and pending members of the queryset in a single query."""
+    return queryset.aggregate(
+        total=Count("id"),
+        active=Count("id", filter=Q(membership_status__name__iexact="active")),
+        pending=Count("id", filter=Q(
+            membership_status__name__iexact="pending")),
+    )
+
+
+def build_cards(members, restaurants, products, events):
+    return {
+        "total_member_count": members["total"],
+        "total_active_member_count": members["active"],
+        "total_pending_member_count": members["pending"],
+        "total_restaurants_count": restaurants,
+        "total_products_count": products,
+        "total_events_count": events,
+    }
+
+
+def compute_dashboard_snapshot():
+    """
+    Count everything the dashboard shows: one pass over the members grouped
+    by type and status feeds the cards and both charts, plus one count for
+    restaurants, products and events each.
+    """
+    with analytics_reads():
+        rows = list(Member.objects.values(
+            "membership_type__name", "membership_status__name").annotate(
+                count=Count("id")).order_by("membership_type__name"))
+        restaurants = Restaurant.active_objects.count()
+        products = Product.objects.filter(is_active=True).count()
+        events = Event.objects.filter(is_active=True).count()
+
+    members = {"total": 0, "active": 0, "pending": 0}
+    by_type = {}
+    for row in rows:
+        status_name = (row["membership_status__name"] or "").lower()
+        membership_type = by_type.setdefault(row["membership_type__name"], {
+            "membership_type": row["membership_type__name"],
+            "active": 0,
+            "pending": 0,
+            "total": 0,
+        })
+        membership_type["total"] += row["count"]
+        members["total"] += row["count"]
+        if status_name in ("active", "pending"):
+            membership_type[status_name] += row["count"]
+            members[status_name] += row["count"]
+
+    return {
+        "computed_at": now().isoformat(),
+        "cards": build_cards(members, restaurants, products, events),
+        "membership_chart": [
+            {"membership_type": row["membership_type"],
+                "active": row["active"], "pending": row["pending"]}
+            for row in by_type.values()
+        ],
+        "membership_pie_chart": [
+            {"name": row["membership_type"], "value": row["total"]}
+            for row in by_type.values()
+        ],
+    }
+
+
+def refresh_dashboard_snapshot():
+    snapshot = compute_dashboard_snapshot()
+    cache.set(DASHBOARD_SNAPSHOT_KEY, snapshot, DASHBOARD_SNAPSHOT_TIMEOUT)
+    return snapshot
+
+
+def get_dashboard_snapshot():
+    """The cached counters of the dashboard, recounted when missing."""
+    snapshot = cache.get(DASHBOARD_SNAPSHOT_KEY)
+    if snapshot is None:
+        snapshot = refresh_dashboard_snapshot()
+    return snapshot
+
+
+def invalidate_dashboard_snapshot():
+    cache.delete(DASHBOARD_SNAPSHOT_KEY)
+
+
+def get_filtered_cards(filter_data):
+    """Live counts for a created_at range, the snapshot only covers all time."""
+    def filtered(queryset):
+        return MemberFilter(filter_data, queryset=queryset).qs
+
+    with analytics_reads():
+        return build_cards(
+            count_members(filtered(Member.objects.all())),
+            filtered(Restaurant.active_objects.all()).count(),
+            filtered(Product.objects.filter(is_active=True)).count(),
+            filtered(Event.objects.filter(is_active=True)).count(),
+        )
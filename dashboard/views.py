@@ -2,19 +2,14 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from activity_log.tasks import log_activity_task
+from activity_log.utils.log_buffer import log_activity
 from activity_log.utils.functions import request_data_activity_log
-from member.models import Member, MembershipType
-from .utils.filters import MemberFilter
-from restaurant.models import Restaurant
-from product.models import Product
-from event.models import Event
-from django.db.models import Count, Q
+from .utils.metrics import get_dashboard_snapshot, get_filtered_cards, has_date_filter
+from .utils.active_users import get_active_user_counts
 from account.models import GroupModel
 from django.contrib.auth import get_user_model
 import logging
-from django.utils.timezone import now
-from activity_log.models import ActivityLog
+from core.db_router import analytics_reads
 logger = logging.getLogger("myapp")
 
 
@@ -23,59 +18,23 @@ class DashboardCardView(APIView):
 
     def get(self, request):
         try:
-            total_member = Member.objects.all()
-            total_active_member = Member.objects.filter(
-                membership_status__name__iexact="active")
-            total_pending_member = Member.objects.filter(
-                membership_status__name__iexact="pending")
-            total_restaurants = Restaurant.active_objects.all()
-            total_products = Product.objects.filter(is_active=True)
-            total_events = Event.objects.filter(is_active=True)
-
-            total_member_filterset = MemberFilter(
-                request.GET, queryset=total_member)
-            total_active_member_filterset = MemberFilter(
-                request.GET, queryset=total_active_member)
-            total_pending_member_filterset = MemberFilter(
-                request.GET, queryset=total_pending_member)
-            total_restaurants_filterset = MemberFilter(
-                request.GET, queryset=total_restaurants)
-            total_products_filterset = MemberFilter(
-                request.GET, queryset=total_products)
-            total_events_filterset = MemberFilter(
-                request.GET, queryset=total_events)
-
-            total_member = total_member_filterset.qs
-            total_active_member = total_active_member_filterset.qs
-            total_pending_member = total_pending_member_filterset.qs
-            total_restaurants = total_restaurants_filterset.qs
-            total_products = total_products_filterset.qs
-            total_events = total_events_filterset.qs
-
-            total_member_count = total_member.count()
-            total_active_member_count = total_active_member.count()
-            total_pending_member_count = total_pending_member.count()
-            total_restaurants_count = total_restaurants.count()
-            total_products_count = total_products.count()
-            total_events_count = total_events.count()
+            # a created_at range is counted live, everything else comes
+            # from the snapshot
+            if has_date_filter(request.GET):
+                cards = get_filtered_cards(request.GET)
+            else:
+                cards = get_dashboard_snapshot()["cards"]
 
             return Response({
                 "code": 200,
                 "status": "success",
                 "message": "All dashboard card data",
-                "data": {
-                    "total_member_count": total_member_count,
-                    "total_active_member_count": total_active_member_count,
-                    "total_pending_member_count": total_pending_member_count,
-                    "total_restaurants_count": total_restaurants_count,
-                    "total_products_count": total_products_count,
-                    "total_events_count": total_events_count,
-                }
+                "data": cards
             }, status=200)
 
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Error while viewing all users",
                 severity_level="error",
@@ -96,25 +55,7 @@ class DashboardChartView(APIView):
 
     def get(self, request):
         try:
-            qs = (
-                Member.objects.values("membership_type__name")
-                .annotate(
-                    active=Count("id", filter=Q(
-                        membership_status__name__iexact="active")),
-                    pending=Count("id", filter=Q(
-                        membership_status__name__iexact="pending")),
-                )
-                .order_by("membership_type__name")
-            )
-
-            data = [
-                {
-                    "membership_type": row["membership_type__name"],
-                    "active": row["active"],
-                    "pending": row["pending"],
-                }
-                for row in qs
-            ]
+            data = get_dashboard_snapshot()["membership_chart"]
 
             return Response({
                 "code": 200,
@@ -124,7 +65,7 @@ class DashboardChartView(APIView):
             }, status=200)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Error while viewing all users",
                 severity_level="error",
@@ -145,14 +86,7 @@ class DashboardPieChartView(APIView):
 
     def get(self, request):
         try:
-            qs = Member.objects.values("membership_type__name").annotate(
-                count=Count("id")).order_by("membership_type__name")
-            data = [
-                {
-                    "name": row["membership_type__name"],
-                    "value": row["count"],
-                } for row in qs
-            ]
+            data = get_dashboard_snapshot()["membership_pie_chart"]
             return Response({
                 "code": 200,
                 "status": "success",
@@ -162,7 +96,7 @@ class DashboardPieChartView(APIView):
 
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Error while viewing all users",
                 severity_level="error",
@@ -181,20 +115,13 @@ class DashboardPieChartView(APIView):
 class DashBoardKPICard(APIView):
     permission_classes = [IsAuthenticated]
 
+    @analytics_reads()
     def get(self, request):
         try:
             User = get_user_model()
-            today = now().date()
             group_count = GroupModel.objects.all().count()
             user_count = User.objects.all().count()
-            unique_users_today = (
-                ActivityLog.objects
-                .filter(timestamp__date=today)  # filter by today's date
-                .values("user")                 # group by user
-                .exclude(user=None)             # ignore null users if needed
-                .distinct()                     # ensure uniqueness
-                .count()                        # count distinct users
-            )
+            active_users = get_active_user_counts()
             return Response({
                 "code": 200,
                 "status": "success",
@@ -202,13 +129,14 @@ class DashBoardKPICard(APIView):
                 "data": {
                     "group_count": group_count,
                     "user_count": user_count,
-                    "active_user_today": unique_users_today
+                    "active_user_today": active_users["daily_active_users"],
+                    **active_users,
                 }
             }, status=200)
 
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Error while viewing all users",
                 severity_level="error",
@@ -11,7 +11,7 @@ from rest_framework.response import Response
 from rest_framework import status
 from .models import Venue, Event, EventTicket, EventMedia, EventFee
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
-from activity_log.tasks import log_activity_task
+from activity_log.utils.log_buffer import log_activity
 from activity_log.utils.functions import request_data_activity_log
 from member_financial_management.utils.functions import generate_unique_invoice_number
 from member.models import Member
@@ -46,7 +46,7 @@ class EventVenueView(APIView):
             
                 street_address = serializer.validated_data["street_address"]
                 city = serializer.validated_data["city"]
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Venue created successfully",
                     severity_level="info",
@@ -66,7 +66,7 @@ class EventVenueView(APIView):
                     }
                 }, status=status.HTTP_201_CREATED)
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Venue creation failed",
                     severity_level="error",
@@ -81,7 +81,7 @@ class EventVenueView(APIView):
 
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Venue creation failed",
                 severity_level="error",
@@ -113,7 +113,7 @@ class EventVenueView(APIView):
             data = serializer.data
 
             # Log the activity
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Retrieve all venues",
                 severity_level="info",
@@ -132,7 +132,7 @@ class EventVenueView(APIView):
 
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Venues retrieve failed",
                 severity_level="error",
@@ -164,7 +164,7 @@ class EventView(APIView):
             if serializer.is_valid():
                 event_instance = serializer.save()
                 event_title = serializer.validated_data["title"]
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Event created successfully",
                     severity_level="info",
@@ -182,7 +182,7 @@ class EventView(APIView):
                     }
                 }, status=status.HTTP_201_CREATED)
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Event creation failed",
                     severity_level="error",
@@ -196,7 +196,7 @@ class EventView(APIView):
 
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Event creation failed",
                 severity_level="error",
@@ -231,7 +231,7 @@ class EventView(APIView):
             data = serializer.data
 
             # Log the activity
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Retrieve all events",
                 severity_level="info",
@@ -246,7 +246,7 @@ class EventView(APIView):
             return final_response
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Events retrieve failed",
                 severity_level="error",
@@ -279,7 +279,7 @@ class EventDetailView(APIView):
                                  .prefetch_related("event_media")\
                                  .get(pk=event_id)
             serializer = serializers.EventViewSerializer(event)
-            log_activity_task.delay_on_commit(
+            log_activity(
 
                 request_data_activity_log(request),
                 verb="Retrieve event details",
@@ -295,7 +295,7 @@ class EventDetailView(APIView):
             # cache.set(cache_key, final_response.data, timeout=60 * 30)
             return final_response
         except Event.DoesNotExist:
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Event details retrieve failed",
                 severity_level="error",
@@ -310,7 +310,7 @@ class EventDetailView(APIView):
 
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Event details retrieve failed",
                 severity_level="error",
@@ -342,7 +342,7 @@ class EventTicketView(APIView):
                 # delete the cache for event tickets
                 cache.delete_pattern("event_tickets::*")
                 ticket_name = serializer.validated_data["ticket_name"]
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Event ticket created successfully",
                     severity_level="info",
@@ -356,7 +356,7 @@ class EventTicketView(APIView):
                         "ticket_name": ticket_name
                     }})
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Event ticket creation failed",
                     severity_level="error",
@@ -369,7 +369,7 @@ class EventTicketView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Event ticket creation failed",
                 severity_level="error",
@@ -407,7 +407,7 @@ class EventTicketView(APIView):
             data = serializer.data
 
             # Log the activity
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Retrieve all event tickets",
                 severity_level="info",
@@ -422,7 +422,7 @@ class EventTicketView(APIView):
             return final_response
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Event tickets retrieve failed",
                 severity_level="error",
@@ -452,7 +452,7 @@ class EventMediaView(APIView):
             if serializer.is_valid():
                 media_instance = serializer.save()
                 event_instance = serializer.validated_data["event"]
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Event media created successfully",
                     severity_level="info",
@@ -468,7 +468,7 @@ class EventMediaView(APIView):
                     }
                 })
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Event media creation failed",
                     severity_level="error",
@@ -481,7 +481,7 @@ class EventMediaView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Event media creation failed",
                 severity_level="error",
@@ -512,7 +512,7 @@ class EventFeeView(APIView):
                 # delete the cache for event fees
                 # cache.delete_pattern("event_fees::*")
                 event_fee = serializer.validated_data["fee"]
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Event fee created successfully",
                     severity_level="info",
@@ -528,7 +528,7 @@ class EventFeeView(APIView):
                     }
                 })
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Event fee creation failed",
                     severity_level="error",
@@ -541,7 +541,7 @@ class EventFeeView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Event fee creation failed",
                 severity_level="error",
@@ -572,7 +572,7 @@ class EventFeeView(APIView):
                 all_event_fees, many=True)
             data = serializer.data
             # Log the activity
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Retrieve all event fees",
                 severity_level="info",
@@ -588,7 +588,7 @@ class EventFeeView(APIView):
             return final_response
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Event fees retrieve failed",
                 severity_level="error",
@@ -619,7 +619,7 @@ class EventTicketDetailView(APIView):
             event_ticket = EventTicket.objects.select_related(
                 'event').get(pk=ticket_id)
             serializer = serializers.EventTicketViewSerializer(event_ticket)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View event ticket details",
                 severity_level="info",
@@ -635,7 +635,7 @@ class EventTicketDetailView(APIView):
             # cache.set(cache_key, final_response.data, timeout=60 * 30)
             return final_response
         except EventTicket.DoesNotExist:
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Event ticket details retrieve failed",
                 severity_level="info",
@@ -651,7 +651,7 @@ class EventTicketDetailView(APIView):
             }, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Event ticket details retrieve failed",
                 severity_level="info",
@@ -731,7 +731,7 @@ class EventTicketBuyView(APIView):
                     )
                     invoice_item.event_tickets.set([event_ticket.id])
 
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Invoice created successfully",
                     severity_level="info",
@@ -744,7 +744,7 @@ class EventTicketBuyView(APIView):
                     "data": InvoiceSerializer(invoice).data
                 }, status=status.HTTP_200_OK)
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Invoice creation failed",
                     severity_level="error",
@@ -757,7 +757,7 @@ class EventTicketBuyView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Invoice creation failed",
                 severity_level="error",
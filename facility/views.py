@@ -7,7 +7,7 @@ from rest_framework.response import Response
 from rest_framework import status
 from .models import Facility, FacilityUseFee
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
-from activity_log.tasks import log_activity_task
+from activity_log.utils.log_buffer import log_activity
 from activity_log.utils.functions import request_data_activity_log
 from member_financial_management.utils.functions import generate_unique_invoice_number
 from member.models import Member
@@ -55,7 +55,7 @@ class FacilityView(APIView):
                 # delete the cache for the facility list
                 cache.delete_pattern("facilities::*")
                 facility_name = serializer.validated_data["name"]
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Facility created successfully",
                     severity_level="info",
@@ -70,7 +70,7 @@ class FacilityView(APIView):
                     }
                 })
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Facility creation failed",
                     severity_level="error",
@@ -83,7 +83,7 @@ class FacilityView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Facility creation failed",
                 severity_level="error",
@@ -135,7 +135,7 @@ class FacilityView(APIView):
                       timeout=60 * 30)  # 30 minutes
 
             # Log the activity
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Retrieve all facilities",
                 severity_level="info",
@@ -145,7 +145,7 @@ class FacilityView(APIView):
             return final_response
 
         except Exception as e:
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Retrieve facilities failed",
                 severity_level="error",
@@ -183,7 +183,7 @@ class FacilityUseFeeView(APIView):
                     cache.delete_pattern("facility_use_fees::*")
                     facility_use_fee_id = facility_use_fee_instance.id
                     facility_use_fee = facility_use_fee_instance.fee
-                    log_activity_task.delay_on_commit(
+                    log_activity(
                         request_data_activity_log(request),
                         verb="Facility use fee created successfully",
                         severity_level="info",
@@ -198,7 +198,7 @@ class FacilityUseFeeView(APIView):
                         }
                     })
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Facility use fee creation failed",
                     severity_level="error",
@@ -211,7 +211,7 @@ class FacilityUseFeeView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Facility use fee creation failed",
                 severity_level="error",
@@ -247,7 +247,7 @@ class FacilityUseFeeView(APIView):
                 facility_use_fees, request, view=self)
             serializer = serializers.FacilityUseFeeViewSerializer(
                 paginated_queryset, many=True)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Retrieve all facility use fees",
                 severity_level="info",
@@ -265,7 +265,7 @@ class FacilityUseFeeView(APIView):
 
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Facility use fees retrieve failed",
                 severity_level="error",
@@ -352,7 +352,7 @@ class FacilityBuyView(APIView):
                         invoice=invoice
                     )
                     invoice_item.facility.set([facility.id])
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Invoice created successfully",
                     severity_level="info",
@@ -365,7 +365,7 @@ class FacilityBuyView(APIView):
                     "data": InvoiceSerializer(invoice).data
                 }, status=status.HTTP_200_OK)
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Invoice creation failed",
                     severity_level="error",
@@ -378,7 +378,7 @@ class FacilityBuyView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Invoice creation failed",
                 severity_level="error",
@@ -419,7 +419,7 @@ class FacilityDetailView(APIView):
                 facility)
 
             # Log the activity
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Retrieve a facility",
                 severity_level="info",
@@ -438,7 +438,7 @@ class FacilityDetailView(APIView):
             return final_response
 
         except Facility.DoesNotExist:
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Facility details retrieval failed",
                 severity_level="error",
@@ -455,7 +455,7 @@ class FacilityDetailView(APIView):
 
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Facility retrieve failed",
                 severity_level="error",
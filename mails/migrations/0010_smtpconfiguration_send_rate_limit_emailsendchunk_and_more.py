@@ -0,0 +1,44 @@
+# Generated by Django 5.1.5 on 2026-10-18 09:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mails', '0009_alter_emaillist_email_alter_outbox_status_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='smtpconfiguration',
+            name='send_rate_limit',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='EmailSendChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('pending', 'pending'), ('running', 'running'), ('completed', 'completed')], default='pending', max_length=50)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('sent', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('send_record', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='send_record_chunks', to='mails.emailsendrecord')),
+            ],
+            options={
+                'ordering': ['send_record', 'number'],
+                'unique_together': {('send_record', 'number')},
+            },
+        ),
+        migrations.AddField(
+            model_name='outbox',
+            name='send_chunk',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='chunk_outboxes', to='mails.emailsendchunk'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.1.5 on 2026-10-18 09:18
+
+from django.db import migrations, models
+
+
+def retire_failed_mails(apps, schema_editor):
+    # failed mails from before automatic retries are not resent on deploy,
+    # EmailRetryView still brings them back
+    Outbox = apps.get_model("mails", "Outbox")
+    Outbox.objects.filter(status="failed").update(status="dead")
+
+
+def restore_failed_mails(apps, schema_editor):
+    Outbox = apps.get_model("mails", "Outbox")
+    Outbox.objects.filter(status__in=("dead", "retrying")).update(status="failed")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mails', '0010_smtpconfiguration_send_rate_limit_emailsendchunk_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outbox',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='outbox',
+            name='next_attempt_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='outbox',
+            name='status',
+            field=models.CharField(choices=[('success', 'success'), ('failed', 'failed'), ('pending', 'pending'), ('retrying', 'retrying'), ('dead', 'dead')], max_length=50),
+        ),
+        migrations.AddIndex(
+            model_name='outbox',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_next_attempt'),
+        ),
+        migrations.RunPython(retire_failed_mails, restore_failed_mails),
+    ]
@@ -37,6 +37,8 @@ class SMTPConfiguration(MailBaseModel):
         max_length=255, null=True, blank=True)
     iam_role_arn = models.CharField(max_length=255, null=True, blank=True)
     enable_tracking = models.BooleanField(default=False)
+    # emails per minute over every send using this configuration, empty for no limit
+    send_rate_limit = models.PositiveIntegerField(null=True, blank=True)
 
     # relations
     user = models.ForeignKey(User, related_name="user_smtp_configs",
@@ -73,6 +75,10 @@ STATUS_CHOICES = [
     ('success', 'success'),
     ('failed', 'failed'),
     ('pending', 'pending'),
+    # claimed by a retry task
+    ('retrying', 'retrying'),
+    # gave up after the last automatic retry
+    ('dead', 'dead'),
 ]
 
 
@@ -84,6 +90,17 @@ class Outbox(MailBaseModel):
     failed_reason = models.CharField(
         max_length=255, blank=True, null=True, default=None)
     is_from_template = models.BooleanField(default=False)
+    send_chunk = models.ForeignKey(
+        "EmailSendChunk", on_delete=models.SET_NULL, null=True, blank=True, related_name="chunk_outboxes")
+    # retries of a failed mail, see mails.services.email_retry_services
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"],
+                         name="outbox_status_next_attempt"),
+        ]
 
     def __str__(self):
         return self.email_address
@@ -141,3 +158,34 @@ class EmailSendRecord(models.Model):
 
     def __str__(self):
         return f"EmailSend object {self.pk}"
+
+
+CHUNK_STATUS_CHOICES = [
+    ('pending', 'pending'),
+    ('running', 'running'),
+    ('completed', 'completed'),
+]
+
+
+class EmailSendChunk(models.Model):
+    """A slice of the recipients of a send, delivered by its own celery task."""
+    number = models.PositiveIntegerField()
+    status = models.CharField(
+        max_length=50, choices=CHUNK_STATUS_CHOICES, default="pending")
+    total = models.PositiveIntegerField(default=0)
+    sent = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # relations
+    send_record = models.ForeignKey(
+        EmailSendRecord, on_delete=models.CASCADE, related_name="send_record_chunks")
+
+    class Meta:
+        unique_together = ('send_record', 'number')
+        ordering = ['send_record', 'number']
+
+    def __str__(self):
+        return f"EmailSend {self.send_record_id} chunk {self.number}"
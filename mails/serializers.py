@@ -20,6 +20,8 @@ class SMTPConfigurationSerializer(serializers.Serializer):
         max_length=255, required=False)
     iam_role_arn = serializers.CharField(max_length=255, required=False)
     enable_tracking = serializers.BooleanField(required=False)
+    send_rate_limit = serializers.IntegerField(
+        min_value=1, required=False, allow_null=True)
 
     def validate(self, attrs):
         provider = attrs.get('provider')
@@ -40,7 +42,8 @@ class SMTPConfigurationSerializer(serializers.Serializer):
         user = validated_data.pop('user')
 
         obj = SMTPConfiguration.objects.create(
-            provider=provider, username=username, password=password, user=user)
+            provider=provider, username=username, password=password, user=user,
+            send_rate_limit=validated_data.get("send_rate_limit"))
         return obj
 
     def update(self, instance, validated_data):
@@ -50,7 +53,10 @@ class SMTPConfigurationSerializer(serializers.Serializer):
         instance.provider = provider
         instance.username = username
         instance.password = password
-        instance.save(update_fields=["provider", "username", "password"])
+        instance.send_rate_limit = validated_data.get(
+            "send_rate_limit", instance.send_rate_limit)
+        instance.save(update_fields=[
+                      "provider", "username", "password", "send_rate_limit"])
 
         return instance
 
@@ -346,6 +352,7 @@ class OutboxViewSerializer(serializers.ModelSerializer):
     class Meta:
         model = Outbox
         fields = ['id', 'email_address', 'status', 'failed_reason',
-                  'email_compose', 'created_at', 'updated_at', "is_from_template"]
+                  'email_compose', 'created_at', 'updated_at', "is_from_template",
+                  "attempts", "next_attempt_at"]
         read_only_fields = ['id', 'created_at',
-                            'updated_at', "is_from_template"]
+                            'updated_at', "is_from_template", "attempts", "next_attempt_at"]
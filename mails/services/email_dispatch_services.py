@@ -0,0 +1,136 @@
+from django.db import transaction
+from datetime import timedelta
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from account.utils import rate_limiter
+from ..models import EmailSendChunk, EmailSendRecord, Outbox
+
+# recipients per chunk, every chunk is sent by its own celery task
+EMAIL_SEND_CHUNK_SIZE = 200
+OUTBOX_BATCH_SIZE = 1000
+# outbox rows updated at once while a chunk is sent, rows sent but not yet
+# recorded by a worker that died are sent again when the sweep requeues the chunk
+CHUNK_PROGRESS_BATCH = 25
+# a chunk without progress for this long lost its task, see requeue_stale_chunks
+CHUNK_LEASE = 60*30
+SMTP_RATE_SCOPE = "smtp_send"
+SMTP_RATE_WINDOW = 60
+
+
+def get_send_recipients(send_record):
+    if send_record.group_id:
+        return list(send_record.group.group_email_lists.filter(
+            is_subscribed=True).order_by("id").values_list("email", flat=True))
+    return [send_record.single_email.email]
+
+
+def create_send_chunks(send_record, chunk_size=EMAIL_SEND_CHUNK_SIZE):
+    """
+    Store the recipients of a send as pending outbox rows split in chunks and
+    return the ids of the chunks left to send. Calling it again for the same
+    send only returns the unfinished chunks.
+    """
+    with transaction.atomic():
+        # lock the send so two dispatches never split it twice
+        EmailSendRecord.objects.select_for_update().filter(
+            id=send_record.id).first()
+        if not send_record.send_record_chunks.exists():
+            emails = get_send_recipients(send_record)
+            batches = [emails[i:i+chunk_size]
+                       for i in range(0, len(emails), chunk_size)]
+            EmailSendChunk.objects.bulk_create([
+                EmailSendChunk(send_record=send_record,
+                               number=number, total=len(batch))
+                for number, batch in enumerate(batches, start=1)
+            ])
+            chunks = send_record.send_record_chunks.order_by("number")
+            Outbox.objects.bulk_create([
+                Outbox(email_compose_id=send_record.email_compose_id,
+                       email_address=email, status="pending", send_chunk=chunk)
+                for chunk, batch in zip(chunks, batches)
+                for email in batch
+            ], batch_size=OUTBOX_BATCH_SIZE)
+        return list(send_record.send_record_chunks.exclude(
+            status="completed").order_by("number").values_list("id", flat=True))
+
+
+def start_chunk(chunk):
+    now = timezone.now()
+    EmailSendChunk.objects.filter(id=chunk.id).update(
+        status="running", started_at=Coalesce("started_at", now), updated_at=now)
+
+
+def record_chunk_progress(chunk, outboxes):
+    """
+    Store the results of sent outbox rows and add them to the chunk counters.
+    Every call counts as a sign of life of the chunk, even without rows.
+    """
+    sent = sum(1 for outbox in outboxes if outbox.status == "success")
+    with transaction.atomic():
+        if outboxes:
+            Outbox.objects.bulk_update(outboxes, ["status", "failed_reason"])
+        EmailSendChunk.objects.filter(id=chunk.id).update(
+            sent=F("sent") + sent, failed=F("failed") + len(outboxes) - sent,
+            updated_at=timezone.now())
+
+
+def finish_chunk(chunk):
+    now = timezone.now()
+    EmailSendChunk.objects.filter(id=chunk.id).update(
+        status="completed", finished_at=now, updated_at=now)
+
+
+def fail_chunk(chunk, error):
+    """Mark the rows of the chunk still pending as failed and finish it. Returns the number of rows."""
+    with transaction.atomic():
+        failed = chunk.chunk_outboxes.filter(status="pending").update(
+            status="failed", failed_reason=str(error)[:255])
+        EmailSendChunk.objects.filter(id=chunk.id).update(
+            failed=F("failed") + failed)
+        finish_chunk(chunk)
+    return failed
+
+
+def requeue_stale_chunks(now=None):
+    """
+    Return the ids of the unfinished chunks that made no progress for a
+    whole lease, their task was lost with its worker. They count as alive
+    again from now, so the next sweep does not queue them twice.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        ids = list(EmailSendChunk.objects.select_for_update(skip_locked=True).filter(
+            status__in=("pending", "running"),
+            updated_at__lt=now - timedelta(seconds=CHUNK_LEASE)).values_list("id", flat=True))
+        if ids:
+            EmailSendChunk.objects.filter(id__in=ids).update(updated_at=now)
+    return ids
+
+
+def reserve_send_slot(configuration):
+    """
+    Take one message out of the per minute budget of the smtp configuration,
+    shared by every worker. Returns 0 when the message may go now, otherwise
+    the seconds to wait.
+    """
+    if not configuration.send_rate_limit:
+        return 0
+    allowed, _, wait = rate_limiter.hit(
+        SMTP_RATE_SCOPE, [str(configuration.id)], window=SMTP_RATE_WINDOW,
+        limits=configuration.send_rate_limit)
+    return 0 if allowed else max(wait, 1)
+
+
+def get_send_progress(send_record):
+    chunks = list(send_record.send_record_chunks.order_by("number").values(
+        "number", "status", "total", "sent", "failed", "started_at", "finished_at"))
+    return {
+        "id": send_record.id,
+        "total": sum(chunk["total"] for chunk in chunks),
+        "sent": sum(chunk["sent"] for chunk in chunks),
+        "failed": sum(chunk["failed"] for chunk in chunks),
+        "completed": bool(chunks) and all(
+            chunk["status"] == "completed" for chunk in chunks),
+        "chunks": chunks,
+    }
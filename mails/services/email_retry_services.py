@@ -0,0 +1,92 @@
+import random
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from ..models import Outbox
+
+# automatic retries before a mail is moved to the dead state
+RETRY_MAX_ATTEMPTS = 6
+RETRY_BASE_DELAY = 60
+RETRY_MAX_DELAY = 60*60*6
+# mails claimed per transaction and sent by one task
+RETRY_BATCH_SIZE = 100
+RETRY_MAX_BATCHES = 20
+# a claimed mail is due again after this long, when its task never finished
+RETRY_LEASE = 60*15
+
+
+def retry_delay(attempts):
+    """Seconds before the next retry of a mail that failed attempts times, doubling with up to 10% jitter."""
+    delay = min(RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0), RETRY_MAX_DELAY)
+    return delay + random.uniform(0, delay / 10)
+
+
+def due_retries(now=None):
+    """Failed mails whose retry is due, and claimed ones whose lease ran out."""
+    now = now or timezone.now()
+    due = Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now)
+    # template mails keep no content to send again
+    return Outbox.objects.filter(
+        Q(status="failed", email_compose__isnull=False) & due
+        | Q(status="retrying", next_attempt_at__lte=now))
+
+
+def claim_due_retries(batch_size=RETRY_BATCH_SIZE):
+    """
+    Lease a batch of due mails to the caller and return their ids. Rows
+    locked by a concurrent claim are skipped and claimed rows stay out of
+    reach until the lease runs out, so overlapping schedulers never hand the
+    same mail to two workers.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(due_retries(now).select_for_update(skip_locked=True).order_by(
+            "next_attempt_at", "id").values_list("id", flat=True)[:batch_size])
+        if ids:
+            Outbox.objects.filter(id__in=ids).update(
+                status="retrying", next_attempt_at=now + timedelta(seconds=RETRY_LEASE))
+    return ids
+
+
+def record_retry_success(outbox):
+    outbox.status = "success"
+    outbox.failed_reason = None
+    outbox.attempts += 1
+    outbox.next_attempt_at = None
+
+
+def record_retry_failure(outbox, reason):
+    outbox.attempts += 1
+    outbox.failed_reason = str(reason)[:255]
+    if outbox.attempts >= RETRY_MAX_ATTEMPTS:
+        outbox.status = "dead"
+        outbox.next_attempt_at = None
+    else:
+        outbox.status = "failed"
+        outbox.next_attempt_at = timezone.now() + timedelta(
+            seconds=retry_delay(outbox.attempts))
+
+
+def postpone_retry(outbox, seconds):
+    """Give a claimed mail back without counting an attempt."""
+    outbox.status = "failed"
+    outbox.next_attempt_at = timezone.now() + timedelta(seconds=seconds)
+
+
+def save_retry_results(outboxes):
+    Outbox.objects.bulk_update(
+        outboxes, ["status", "failed_reason", "attempts", "next_attempt_at"], batch_size=100)
+
+
+def make_failed_mails_due():
+    """
+    Retry every failed mail on the next run of the scheduler, dead ones
+    included with a fresh attempt budget. Mails claimed by a running retry
+    are left alone. Returns the number of mails.
+    """
+    with transaction.atomic():
+        Outbox.objects.filter(status="dead", email_compose__isnull=False).update(
+            status="failed", attempts=0)
+        return Outbox.objects.filter(status="failed", email_compose__isnull=False).update(
+            next_attempt_at=timezone.now())
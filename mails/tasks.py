@@ -4,263 +4,255 @@ from django.template import Context, Template
 from django.core.mail import get_connection, EmailMultiAlternatives
 import pdb
 from celery import shared_task
-from django.core.cache import cache
-from mails.models import EmailCompose, Outbox
+from mails.models import EmailCompose, EmailSendChunk, EmailSendRecord, Outbox
+from mails.utils.prepared_message import PreparedMessage
+from mails.utils.smtp_pool import smtp_pool
+from mails.services.email_dispatch_services import (
+    CHUNK_PROGRESS_BATCH, create_send_chunks, fail_chunk, finish_chunk, record_chunk_progress,
+    requeue_stale_chunks, reserve_send_slot, start_chunk)
+from mails.services.email_retry_services import (
+    RETRY_MAX_BATCHES, claim_due_retries, make_failed_mails_due, postpone_retry,
+    record_retry_failure, record_retry_success, save_retry_results)
 from django.db import transaction
 from django.template import Template, Context
 from django.core.mail import EmailMultiAlternatives
 from member.models import Member, Email
-from django.template.loader import render_to_string
+from django.template.loader import get_template
+from django.db.models import OuterRef, Subquery
 from django.conf import settings
 import logging
 logger = logging.getLogger("myapp")
 
+MEMBER_MAIL_TEMPLATE = 'mails/member_mail_template.html'
+# member fields the monthly update template shows
+MEMBER_MAIL_FIELDS = (
+    "member_ID", "first_name", "last_name", "date_of_birth", "batch_number",
+    "anniversary_date", "blood_group", "nationality",
+)
+MONTHLY_EMAIL_CHUNK_SIZE = 200
+
 
 @shared_task
-def bulk_email_send_task(email_compose_id, email_addresses):
-    """
-    Sends bulk emails with optional attachments using a composed template.
-    Efficient database operations and attachment existence check added.
-    """
-    try:
-        if not email_addresses or not isinstance(email_addresses, list):
-            raise ValueError("Email addresses must be a non-empty list.")
+def dispatch_email_send_task(send_record_id):
+    """Split the recipients of a send in chunks and queue a task per chunk."""
+    send_record = EmailSendRecord.objects.select_related(
+        "group", "single_email").get(id=send_record_id)
+    chunk_ids = create_send_chunks(send_record)
+    for chunk_id in chunk_ids:
+        send_email_chunk_task.delay(chunk_id)
+    return {"chunks": len(chunk_ids)}
 
-        email_compose_obj = EmailCompose.objects.select_related('configurations')\
-            .prefetch_related('email_compose_attachments').get(id=email_compose_id)
 
-        attachments = email_compose_obj.email_compose_attachments.all()
-        email_host_user = email_compose_obj.configurations.username
-        email_host_password = email_compose_obj.configurations.password
+@shared_task
+def send_email_chunk_task(chunk_id):
+    """
+    Send the pending outbox rows of a chunk over one pooled smtp connection. When
+    the configuration is out of its send rate the chunk queues itself again
+    and carries on with the rows still pending.
+    """
+    chunk = EmailSendChunk.objects.select_related(
+        "send_record__email_compose__configurations").get(id=chunk_id)
+    email_compose_obj = chunk.send_record.email_compose
+    configuration = email_compose_obj.configurations
+    outboxes = list(chunk.chunk_outboxes.filter(
+        status="pending").order_by("id"))
+    start_chunk(chunk)
 
-        if not email_host_user or not email_host_password:
+    try:
+        if not configuration or not configuration.username or not configuration.password:
             raise ValueError(
                 "Email username or password is missing in configuration.")
-
-        connection = get_connection(
-            host='smtp.gmail.com',
-            port=587,
-            username=email_host_user,
-            password=email_host_password,
-            use_tls=True
-        )
-
-        # Prepare the rendered HTML body
-        context = Context({"test": "test12345", "member": "arifin"})
-        template = Template(email_compose_obj.body)
-        rendered_html = template.render(context)
-
-        success_emails = []
-        failed_emails = []
-        outbox_list = []
-
-        for user_email in email_addresses:
+        prepared = PreparedMessage.from_compose(email_compose_obj)
+        connection = smtp_pool.borrow(configuration)
+    except Exception as error:
+        logger.critical(f"Email chunk {chunk_id} failed: {error}")
+        fail_chunk(chunk, error)
+        return {"error": str(error)}
+
+    done = []
+    try:
+        for outbox in outboxes:
+            wait = reserve_send_slot(configuration)
+            if wait:
+                record_chunk_progress(chunk, done)
+                send_email_chunk_task.apply_async(
+                    args=[chunk_id], countdown=wait)
+                return {"throttled": wait}
             try:
-                email = EmailMultiAlternatives(
-                    subject=email_compose_obj.subject,
-                    body=rendered_html,
-                    from_email=email_host_user,
-                    to=[user_email],
-                    connection=connection
-                )
-                email.attach_alternative(rendered_html, "text/html")
-
-                for attachment in attachments:
-                    file_path = attachment.file.path
-                    file_name = attachment.file.name
-                    if os.path.exists(file_path):
-                        with open(file_path, 'rb') as f:
-                            email.attach(os.path.basename(file_name), f.read())
-                    else:
-                        logger.warning(
-                            f"Attachment file not found: {file_path}")
-
-                email.send()
-                success_emails.append(user_email)
-
-                outbox_list.append(Outbox(
-                    email_compose=email_compose_obj,
-                    status="success",
-                    email_address=user_email
-                ))
-
+                connection.send(prepared.email_for(outbox.email_address))
+                outbox.status = "success"
             except Exception as send_error:
                 logger.error(
-                    f"Email send failed for {user_email}: {send_error}")
-                failed_emails.append((user_email, str(send_error)))
-                outbox_list.append(Outbox(
-                    email_compose=email_compose_obj,
-                    status="failed",
-                    email_address=user_email,
-                    failed_reason=str(send_error)
-                ))
+                    f"Email send failed for {outbox.email_address}: {send_error}")
+                outbox.status = "failed"
+                outbox.failed_reason = str(send_error)[:255]
+            done.append(outbox)
+            if len(done) >= CHUNK_PROGRESS_BATCH:
+                record_chunk_progress(chunk, done)
+                done = []
+        record_chunk_progress(chunk, done)
+    except Exception as error:
+        logger.exception(f"Email chunk {chunk_id} stopped: {error}")
+        # keep what was sent, the rest of the chunk is given up. When the
+        # database itself is gone this raises and the sweep requeues the chunk
+        record_chunk_progress(chunk, done)
+        fail_chunk(chunk, error)
+        return {"error": str(error)}
+    finally:
+        connection.release()
+
+    finish_chunk(chunk)
+    return {"chunk": chunk_id, "messages": len(outboxes)}
+
 
-        #  Bulk insert outbox records in batches
-        try:
-            with transaction.atomic():
-                for i in range(0, len(outbox_list), 100):
-                    Outbox.objects.bulk_create(outbox_list[i:i+100])
-        except Exception as db_err:
-            logger.critical(f"Bulk create failed: {db_err}")
-            return {"error": str(db_err)}
+@shared_task
+def requeue_stale_email_chunks():
+    """Queue the chunks whose task was lost with its worker again, run by beat."""
+    chunk_ids = requeue_stale_chunks()
+    for chunk_id in chunk_ids:
+        logger.warning(f"Email chunk {chunk_id} made no progress, queued again")
+        send_email_chunk_task.delay(chunk_id)
+    return {"chunks": len(chunk_ids)}
 
-        return {
-            "success": success_emails,
-            "failed": failed_emails
-        }
 
-    except Exception as general_error:
-        logger.critical(f"Bulk email task failed: {general_error}")
-        return {"error": str(general_error)}
+def members_with_primary_email():
+    """Active members annotated with their primary email, their first email when none is primary."""
+    primary_email = Email.objects.filter(member=OuterRef("pk")).order_by(
+        "-is_primary", "id").values("email")[:1]
+    return Member.objects.filter(is_active=True).annotate(
+        to_email=Subquery(primary_email)).filter(to_email__isnull=False)
 
 
 @shared_task
 def send_monthly_member_emails():
-    members = Member.objects.filter(is_active=True)
+    """Queue the monthly update of every active member with an email, in chunks sent in parallel."""
     try:
-        outbox_list = []
-        for member in members:
-            try:
-                email_list = Email.objects.filter(
-                    member=member).order_by("-is_primary").first()
-                to_email = email_list.email if email_list else None
-                if to_email:
-                    html_message = render_to_string('mails/member_mail_template.html', {
-                        'member_ID': member.member_ID,
-                        'first_name': member.first_name,
-                        'last_name': member.last_name,
-                        'date_of_birth': member.date_of_birth,
-                        'batch_number': member.batch_number,
-                        'anniversary_date': member.anniversary_date,
-                        'blood_group': member.blood_group,
-                        'nationality': member.nationality,
-                    })
-                    msg = EmailMultiAlternatives(
-                        subject="Your Monthly Member Update",
-                        body="This is your monthly profile update.",
-                        from_email=settings.DEFAULT_FROM_EMAIL,
-                        to=[to_email]
-                    )
-                    msg.attach_alternative(html_message, "text/html")
-                    msg.send()
-                    outbox_list.append(Outbox(email_address=to_email,
-                                              status="success",
-                                              is_from_template=True))
-            except Exception as e:
-                outbox_list.append(Outbox(email_address=to_email,
-                                          status="failed",
-                                          failed_reason=str(e),
-                                          is_from_template=True))
-
-        for i in range(0, len(outbox_list), 100):
-            Outbox.objects.bulk_create(outbox_list[i:i+100])
-        return {"status": True, "description": "All mail has been sent"}
+        member_ids = members_with_primary_email().order_by(
+            "id").values_list("id", flat=True)
+        chunk = []
+        chunks = 0
+        for member_id in member_ids.iterator(chunk_size=MONTHLY_EMAIL_CHUNK_SIZE*10):
+            chunk.append(member_id)
+            if len(chunk) == MONTHLY_EMAIL_CHUNK_SIZE:
+                send_monthly_member_email_chunk.delay(chunk)
+                chunks += 1
+                chunk = []
+        if chunk:
+            send_monthly_member_email_chunk.delay(chunk)
+            chunks += 1
+        return {"status": True, "description": f"Monthly mails queued in {chunks} chunks"}
     except Exception as e:
-        print(e)
-        print("Something went wrong!! ", str(e))
+        logger.exception(str(e))
         return {"status": False, "description": "Something went wrong while sending mail", "error": str(e)}
 
 
-
 @shared_task
-def retry_failed_emails():
-    try:
-        cache.set("mails::retry", True)
-        failed_mails = Outbox.objects.select_related("email_compose").filter(status="failed")
-        
-        if not failed_mails.exists():
-            return {"status": "failed", "description": "No failed emails found to retry"}
-        
-        outbox_list = []
-        success_count = 0
-        fail_count = 0
-
-        for mail in failed_mails:
+def send_monthly_member_email_chunk(member_ids):
+    """Send the monthly update to a chunk of members over one pooled smtp connection."""
+    template = get_template(MEMBER_MAIL_TEMPLATE)
+    members = members_with_primary_email().filter(
+        id__in=member_ids).values("to_email", *MEMBER_MAIL_FIELDS)
+    outbox_list = []
+    with smtp_pool.connection() as smtp_connection:
+        for member in members.iterator():
+            to_email = member.pop("to_email")
             try:
-                compose = mail.email_compose
-                attachments = compose.email_compose_attachments.all()
-                if not compose:
-                    continue
-
-                subject = compose.subject
-                body = compose.body
-                email_address = mail.email_address
-                config = compose.configurations
-
-                if not config:
-                    continue
-
-                username = config.username
-                password = config.password
-               
-
-                # Setup email connection
-                connection = get_connection(
-                    host='smtp.gmail.com',
-                    port=587,
-                    username=username,
-                    password=password,
-                    use_tls=True
+                html_message = template.render(member)
+                msg = EmailMultiAlternatives(
+                    subject="Your Monthly Member Update",
+                    body="This is your monthly profile update.",
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    to=[to_email]
                 )
+                msg.attach_alternative(html_message, "text/html")
+                smtp_connection.send(msg)
+                outbox_list.append(Outbox(email_address=to_email,
+                                          status="success",
+                                          is_from_template=True))
+            except Exception as e:
+                outbox_list.append(Outbox(email_address=to_email,
+                                          status="failed",
+                                          failed_reason=str(e)[:255],
+                                          is_from_template=True))
 
-                # Render template
-                context = Context({})
-                template = Template(body)
-                rendered_html = template.render(context)
-                
-                # Prepare email
-                email = EmailMultiAlternatives(
-                    subject=subject,
-                    body=rendered_html,
-                    from_email=username,
-                    to=[email_address],
-                    connection=connection
-                )
+    Outbox.objects.bulk_create(outbox_list, batch_size=100)
+    return {"sent": sum(1 for outbox in outbox_list if outbox.status == "success"),
+            "failed": sum(1 for outbox in outbox_list if outbox.status == "failed")}
 
-                for attachment in attachments:
-                    file_path = attachment.file.path
-                    file_name = attachment.file.name
-                    if os.path.exists(file_path):
-                        with open(file_path, 'rb') as f:
-                            email.attach(os.path.basename(file_name), f.read())
-                    else:
-                        logger.warning(
-                            f"Attachment file not found: {file_path}")
 
-                email.attach_alternative(rendered_html, "text/html")
-                
-                # Send email
-                email.send()
+@shared_task
+def schedule_email_retries():
+    """Claim the due failed mails in batches and spread them over the workers, run by beat."""
+    batches = 0
+    for _ in range(RETRY_MAX_BATCHES):
+        outbox_ids = claim_due_retries()
+        if not outbox_ids:
+            break
+        retry_email_batch_task.delay(outbox_ids)
+        batches += 1
+    return {"batches": batches}
 
-                # Success
-                mail.status = "success"
-                mail.failed_reason = None
-                success_count += 1
-                outbox_list.append(mail)
 
+@shared_task
+def retry_email_batch_task(outbox_ids):
+    """
+    Send a batch of claimed mails again. A failure schedules the next try
+    with exponential backoff until the mail runs out of attempts and is
+    moved to the dead state.
+    """
+    outboxes = list(Outbox.objects.select_related("email_compose__configurations").filter(
+        id__in=outbox_ids, status="retrying").order_by("email_compose_id", "id"))
+
+    # built once per compose, shared by all its failed mails
+    prepared_messages = {}
+    connections = {}
+    throttled = {}
+    try:
+        for mail in outboxes:
+            compose = mail.email_compose
+            config = compose.configurations
+            if not config:
+                record_retry_failure(
+                    mail, "This email compose has no email_configuration")
+                continue
+            if config.id in throttled:
+                postpone_retry(mail, throttled[config.id])
+                continue
+            wait = reserve_send_slot(config)
+            if wait:
+                throttled[config.id] = wait
+                postpone_retry(mail, wait)
+                continue
+            try:
+                if compose.id not in prepared_messages:
+                    prepared_messages[compose.id] = PreparedMessage.from_compose(
+                        compose)
+                if config.id not in connections:
+                    connections[config.id] = smtp_pool.borrow(config)
+                connections[config.id].send(
+                    prepared_messages[compose.id].email_for(mail.email_address))
+                record_retry_success(mail)
             except Exception as e:
-                # Failure
-                mail.status = "failed"
-                mail.failed_reason = str(e)
-                fail_count += 1
-                outbox_list.append(mail)
+                logger.error(
+                    f"Email retry failed for {mail.email_address}: {e}")
+                record_retry_failure(mail, e)
+    finally:
+        for connection in connections.values():
+            connection.release()
+        save_retry_results(outboxes)
 
-        # Bulk update database
-        for i in range(0, len(outbox_list), 100):
-            Outbox.objects.bulk_update(outbox_list[i:i+100], ["status", "failed_reason"])
+    return {
+        "success": sum(1 for mail in outboxes if mail.status == "success"),
+        "failed": sum(1 for mail in outboxes if mail.status == "failed"),
+        "dead": sum(1 for mail in outboxes if mail.status == "dead"),
+    }
 
-        # Final result
-        if success_count == 0:
-            return {"status":"failed", "description": "No mail was sent", "failed": fail_count}
-        elif fail_count > 0:
-            return {
-                "status": "partial",
-                "description": f"{success_count} succeeded, {fail_count} failed",
-            }
-        else:
-            return {"status": "success", "description": "All mails sent successfully"}
 
-    except Exception as e:
-        return {"status": "failed", "description": "Something went wrong", "error": str(e)}
-    finally:
-        cache.delete("mails::retry")
+@shared_task
+def retry_failed_emails():
+    """Retry every failed mail now, started from EmailRetryView."""
+    due = make_failed_mails_due()
+    if not due:
+        return {"status": "failed", "description": "No failed emails found to retry"}
+    schedule_email_retries()
+    return {"status": "success", "description": f"{due} failed emails scheduled for retry"}
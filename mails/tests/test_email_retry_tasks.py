@@ -0,0 +1,156 @@
+import threading
+from datetime import timedelta
+from importlib import import_module
+from unittest.mock import patch
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.utils import timezone
+from faker import Faker
+from ..models import EmailCompose, Outbox, SMTPConfiguration
+from ..services.email_retry_services import RETRY_MAX_ATTEMPTS, claim_due_retries
+from ..tasks import retry_email_batch_task
+from ..utils.smtp_pool import PooledSMTPConnection
+
+
+def create_compose():
+    faker = Faker()
+    configuration = SMTPConfiguration.objects.create(
+        name="test", username=faker.email(), password=faker.password())
+    return EmailCompose.objects.create(
+        subject=faker.sentence(), body="<p>retry</p>", configurations=configuration)
+
+
+def create_failed_mail(compose, **kwargs):
+    kwargs.setdefault("next_attempt_at", timezone.now() - timedelta(seconds=1))
+    return Outbox.objects.create(
+        email_compose=compose, email_address=Faker().email(), status="failed", **kwargs)
+
+
+class TestEmailRetries(TestCase):
+    def setUp(self):
+        self.compose = create_compose()
+
+    def test_claim_due_retries_leases_each_mail_once(self):
+        """
+        Test that claimed mails are out of reach of the next claim until their lease runs out
+        """
+        # arrange
+        due = create_failed_mail(self.compose)
+        later = create_failed_mail(
+            self.compose, next_attempt_at=timezone.now() + timedelta(minutes=5))
+        # template mails keep no content to send again
+        Outbox.objects.create(email_address=Faker().email(), status="failed",
+                              is_from_template=True, next_attempt_at=timezone.now())
+
+        # act
+        claimed = claim_due_retries()
+
+        # assert
+        self.assertEqual(claimed, [due.id])
+        due.refresh_from_db()
+        self.assertEqual(due.status, "retrying")
+        self.assertGreater(due.next_attempt_at, timezone.now())
+        self.assertEqual(claim_due_retries(), [])
+        # a worker lost with the batch hands it back once the lease ran out
+        Outbox.objects.filter(id=due.id).update(
+            next_attempt_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(claim_due_retries(), [due.id])
+        later.refresh_from_db()
+        self.assertEqual(later.status, "failed")
+
+    def test_retry_email_batch_task_backs_off_and_gives_up(self):
+        """
+        Test that a failed retry is scheduled again and the last attempt moves the mail to dead
+        """
+        # arrange
+        backing_off = create_failed_mail(self.compose, attempts=1)
+        giving_up = create_failed_mail(
+            self.compose, attempts=RETRY_MAX_ATTEMPTS - 1)
+        claimed = claim_due_retries()
+
+        # act
+        with patch.object(PooledSMTPConnection, "send", side_effect=OSError("connection refused")):
+            result = retry_email_batch_task(claimed)
+
+        # assert
+        self.assertEqual(result, {"success": 0, "failed": 1, "dead": 1})
+        backing_off.refresh_from_db()
+        self.assertEqual((backing_off.status, backing_off.attempts), ("failed", 2))
+        self.assertGreater(backing_off.next_attempt_at, timezone.now())
+        giving_up.refresh_from_db()
+        self.assertEqual((giving_up.status, giving_up.attempts),
+                         ("dead", RETRY_MAX_ATTEMPTS))
+        self.assertIsNone(giving_up.next_attempt_at)
+        self.assertEqual(claim_due_retries(), [])
+
+    def test_retry_email_batch_task_sends_claimed_mails(self):
+        """
+        Test that a successful retry is stored as success and counts the attempt
+        """
+        # arrange
+        failed = create_failed_mail(self.compose)
+
+        # act
+        result = retry_email_batch_task(claim_due_retries())
+
+        # assert
+        self.assertEqual(result, {"success": 1, "failed": 0, "dead": 0})
+        self.assertEqual(mail.outbox[0].to, [failed.email_address])
+        failed.refresh_from_db()
+        self.assertEqual((failed.status, failed.attempts), ("success", 1))
+
+    def test_failed_mails_from_before_the_retries_are_not_resent(self):
+        """
+        Test that the migration adding the retries retires the failed mails it finds
+        """
+        # arrange
+        old = create_failed_mail(self.compose, next_attempt_at=None)
+        migration = import_module("mails.migrations.0011_outbox_retry_schedule")
+
+        # act
+        migration.retire_failed_mails(apps, None)
+
+        # assert
+        old.refresh_from_db()
+        self.assertEqual(old.status, "dead")
+        self.assertEqual(claim_due_retries(), [])
+
+
+@skipUnlessDBFeature("has_select_for_update_skip_locked")
+class TestClaimDueRetriesSkipLocked(TransactionTestCase):
+    def test_claim_skips_mails_locked_by_another_claim(self):
+        """
+        Test that a claim running next to another one skips the rows that one holds
+        """
+        # arrange
+        compose = create_compose()
+        locked = create_failed_mail(compose)
+        free = create_failed_mail(compose)
+        held = threading.Event()
+        done = threading.Event()
+
+        def hold_lock():
+            try:
+                with transaction.atomic():
+                    list(Outbox.objects.select_for_update().filter(id=locked.id))
+                    held.set()
+                    done.wait(5)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=hold_lock)
+        thread.start()
+        held.wait(5)
+
+        # act
+        try:
+            claimed = claim_due_retries()
+        finally:
+            done.set()
+            thread.join()
+
+        # assert
+        self.assertEqual(claimed, [free.id])
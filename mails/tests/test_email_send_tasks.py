@@ -0,0 +1,148 @@
+from datetime import timedelta
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase
+from django.utils import timezone
+from faker import Faker
+from ..models import (
+    EmailCompose, EmailGroup, EmailList, EmailSendChunk, EmailSendRecord, Outbox, SMTPConfiguration)
+from ..services.email_dispatch_services import (
+    CHUNK_LEASE, create_send_chunks, get_send_progress, requeue_stale_chunks)
+from ..tasks import send_email_chunk_task
+from ..utils.smtp_pool import PooledSMTPConnection
+
+
+class TestEmailSendChunks(TestCase):
+    def setUp(self):
+        self.faker = Faker()
+        self.user = get_user_model().objects.create(
+            username=self.faker.user_name(), password=self.faker.password())
+        self.configuration = SMTPConfiguration.objects.create(
+            name="test", username=self.faker.email(), password=self.faker.password())
+        self.compose = EmailCompose.objects.create(
+            subject=self.faker.sentence(), body="<p>{{ 'hello' }}</p>",
+            configurations=self.configuration, user=self.user)
+        self.group = EmailGroup.objects.create(
+            name=self.faker.word(), user=self.user)
+        EmailList.objects.bulk_create([
+            EmailList(email=f"member{number}@example.com", group=self.group)
+            for number in range(5)
+        ])
+        # unsubscribed addresses never get a row
+        EmailList.objects.create(
+            email="gone@example.com", group=self.group, is_subscribed=False)
+        self.send_record = EmailSendRecord.objects.create(
+            email_compose=self.compose, group=self.group)
+
+    def test_create_send_chunks_splits_the_recipients(self):
+        """
+        Test that the recipients are stored as pending rows split in chunks, once per send
+        """
+        # act
+        chunk_ids = create_send_chunks(self.send_record, chunk_size=2)
+
+        # assert
+        chunks = list(EmailSendChunk.objects.filter(id__in=chunk_ids))
+        self.assertEqual([chunk.total for chunk in chunks], [2, 2, 1])
+        self.assertEqual(Outbox.objects.filter(
+            status="pending", send_chunk__in=chunks).count(), 5)
+        self.assertFalse(Outbox.objects.filter(
+            email_address="gone@example.com").exists())
+        self.assertEqual(create_send_chunks(
+            self.send_record, chunk_size=2), chunk_ids)
+
+    def test_send_email_chunk_task_counts_sent_and_failed_mails(self):
+        """
+        Test that a chunk records every sent and failed mail and is completed
+        """
+        # arrange
+        chunk_id = create_send_chunks(self.send_record, chunk_size=5)[0]
+        original_send = PooledSMTPConnection.send
+
+        def send(connection, email):
+            if email.to == ["member3@example.com"]:
+                raise OSError("mailbox unavailable")
+            return original_send(connection, email)
+
+        # act
+        with patch.object(PooledSMTPConnection, "send", autospec=True, side_effect=send):
+            result = send_email_chunk_task(chunk_id)
+
+        # assert
+        self.assertEqual(result, {"chunk": chunk_id, "messages": 5})
+        self.assertEqual(len(mail.outbox), 4)
+        chunk = EmailSendChunk.objects.get(id=chunk_id)
+        self.assertEqual((chunk.status, chunk.sent, chunk.failed),
+                         ("completed", 4, 1))
+        self.assertEqual(Outbox.objects.get(
+            email_address="member3@example.com").failed_reason, "mailbox unavailable")
+        progress = get_send_progress(self.send_record)
+        self.assertEqual((progress["total"], progress["sent"], progress["failed"]),
+                         (5, 4, 1))
+        self.assertTrue(progress["completed"])
+
+    def test_send_email_chunk_task_requeues_itself_when_throttled(self):
+        """
+        Test that a chunk out of its send rate records its progress and queues the rest again
+        """
+        # arrange
+        chunk_id = create_send_chunks(self.send_record, chunk_size=5)[0]
+
+        # act
+        with patch("mails.tasks.reserve_send_slot", side_effect=[0, 0, 30]), \
+                patch.object(send_email_chunk_task, "apply_async") as apply_async:
+            result = send_email_chunk_task(chunk_id)
+
+        # assert
+        self.assertEqual(result, {"throttled": 30})
+        apply_async.assert_called_once_with(args=[chunk_id], countdown=30)
+        chunk = EmailSendChunk.objects.get(id=chunk_id)
+        self.assertEqual((chunk.status, chunk.sent), ("running", 2))
+        self.assertEqual(chunk.chunk_outboxes.filter(
+            status="pending").count(), 3)
+
+        # the queued run carries on with the pending rows only
+        send_email_chunk_task(chunk_id)
+        chunk.refresh_from_db()
+        self.assertEqual((chunk.status, chunk.sent), ("completed", 5))
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_send_email_chunk_task_finishes_the_chunk_on_unexpected_errors(self):
+        """
+        Test that an error outside a single send fails the remaining rows instead of leaving them pending
+        """
+        # arrange
+        chunk_id = create_send_chunks(self.send_record, chunk_size=5)[0]
+
+        # act
+        with patch("mails.tasks.reserve_send_slot", side_effect=[0, 0, ConnectionError("redis down")]):
+            result = send_email_chunk_task(chunk_id)
+
+        # assert
+        self.assertEqual(result, {"error": "redis down"})
+        chunk = EmailSendChunk.objects.get(id=chunk_id)
+        self.assertEqual((chunk.status, chunk.sent, chunk.failed),
+                         ("completed", 2, 3))
+        self.assertFalse(chunk.chunk_outboxes.filter(
+            status="pending").exists())
+
+    def test_requeue_stale_chunks_returns_chunks_without_progress(self):
+        """
+        Test that only unfinished chunks idle for a whole lease are queued again, and only once
+        """
+        # arrange
+        stale, fresh, completed = create_send_chunks(
+            self.send_record, chunk_size=2)
+        long_ago = timezone.now() - timedelta(seconds=CHUNK_LEASE + 60)
+        EmailSendChunk.objects.filter(id=stale).update(
+            status="running", updated_at=long_ago)
+        EmailSendChunk.objects.filter(id=completed).update(
+            status="completed", updated_at=long_ago)
+
+        # act
+        chunk_ids = requeue_stale_chunks()
+
+        # assert
+        self.assertEqual(chunk_ids, [stale])
+        self.assertEqual(requeue_stale_chunks(), [])
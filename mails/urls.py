@@ -28,6 +28,8 @@ urlpatterns = [
          views.SingleEmailView.as_view(), name="individual_email_detail_view"),
     # Send Email Action (Bulk or Single)
     path("v1/emails/send/", views.EmailSendView.as_view(), name="email_send"),
+    path("v1/emails/send/<int:id>/progress/", views.EmailSendProgressView.as_view(),
+         name="email_send_progress"),
     path("v1/emails/retry/", views.EmailRetryView.as_view(),
          name="email_retry_send"),
     # Email Outbox
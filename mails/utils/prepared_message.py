@@ -0,0 +1,77 @@
+import copy
+import os
+from django.conf import settings
+from django.core.mail import EmailMessage, EmailMultiAlternatives
+from django.core.mail.message import DNS_NAME
+from django.template import Context, Template
+from email.utils import formatdate, make_msgid
+import logging
+logger = logging.getLogger("myapp")
+
+# headers every recipient gets a fresh copy of
+RECIPIENT_HEADERS = ("To", "Date", "Message-ID")
+
+
+def load_attachments(email_compose):
+    """Read the attachment files of a compose once, as (file name, content) pairs."""
+    attachments = []
+    for attachment in email_compose.email_compose_attachments.all():
+        file_path = attachment.file.path
+        if not os.path.exists(file_path):
+            logger.warning(f"Attachment file not found: {file_path}")
+            continue
+        with open(file_path, 'rb') as f:
+            attachments.append(
+                (os.path.basename(attachment.file.name), f.read()))
+    return attachments
+
+
+class PreparedMessage:
+    """
+    A message sent unchanged to many recipients. The body is rendered, the
+    attachments read and the MIME tree encoded once, every recipient gets a
+    shallow copy of it with its own To, Date and Message-ID headers.
+    """
+
+    def __init__(self, subject, html, from_email, attachments=()):
+        self.subject = subject
+        self.from_email = from_email
+        email = EmailMultiAlternatives(
+            subject=subject, body=html, from_email=from_email, to=[from_email])
+        email.attach_alternative(html, "text/html")
+        for file_name, content in attachments:
+            email.attach(file_name, content)
+        self.mime = email.message()
+
+    @classmethod
+    def from_compose(cls, email_compose, context=None):
+        rendered_html = Template(email_compose.body).render(
+            Context(context or {}))
+        return cls(email_compose.subject, rendered_html,
+                   email_compose.configurations.username, load_attachments(email_compose))
+
+    def message_for(self, to):
+        message = copy.copy(self.mime)
+        # deleting a header gives the copy its own header list, the parts
+        # and their encoded payloads stay shared
+        for header in RECIPIENT_HEADERS:
+            del message[header]
+        message["To"] = to
+        message["Date"] = formatdate(localtime=settings.EMAIL_USE_LOCALTIME)
+        message["Message-ID"] = make_msgid(domain=DNS_NAME)
+        return message
+
+    def email_for(self, to, connection=None):
+        return PreparedEmail(self, to, connection=connection)
+
+
+class PreparedEmail(EmailMessage):
+    """EmailMessage handing the prepared MIME tree to the mail backend."""
+
+    def __init__(self, prepared, to, connection=None):
+        super().__init__(subject=prepared.subject, from_email=prepared.from_email,
+                         to=[to], connection=connection)
+        self.prepared = prepared
+
+    def message(self):
+        return self.prepared.message_for(self.to[0])
@@ -0,0 +1,171 @@
+import smtplib
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from threading import Lock
+from django.core.mail import get_connection
+import logging
+logger = logging.getLogger("myapp")
+
+# host used when a configuration leaves it empty
+PROVIDER_HOSTS = {
+    "gmail": "smtp.gmail.com",
+}
+SMTP_TIMEOUT = 30
+# warm connections kept per configuration and process
+SMTP_POOL_MAX_IDLE = 2
+# servers drop idle sessions after a few minutes, older ones are not reused
+SMTP_POOL_IDLE_TIMEOUT = 60*2
+# connections idle longer than this get a NOOP before they are handed out
+SMTP_POOL_CHECK_AFTER = 10
+
+
+def connection_kwargs(configuration):
+    """get_connection arguments of an SMTPConfiguration, None for the EMAIL_* settings."""
+    if configuration is None:
+        return {"timeout": SMTP_TIMEOUT}
+    use_ssl = bool(configuration.use_ssl)
+    return {
+        "host": configuration.host or PROVIDER_HOSTS.get(configuration.provider),
+        "port": configuration.port or (465 if use_ssl else 587),
+        "username": configuration.username,
+        "password": configuration.password,
+        "use_tls": bool(configuration.use_tls) and not use_ssl,
+        "use_ssl": use_ssl,
+        "timeout": SMTP_TIMEOUT,
+    }
+
+
+def pool_key(configuration):
+    if configuration is None:
+        return None
+    # a changed configuration never reuses connections opened with the old one
+    return (configuration.id, configuration.updated_at)
+
+
+def is_reconnectable(error):
+    """Errors after which the message can be sent again on a new connection."""
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code == 421
+    return isinstance(error, (TimeoutError, ConnectionError))
+
+
+def is_alive(connection):
+    smtp = getattr(connection, "connection", None)
+    if smtp is None:
+        # not an smtp backend (tests, console), nothing to check
+        return True
+    try:
+        return smtp.noop()[0] == 250
+    except (smtplib.SMTPException, OSError):
+        return False
+
+
+def close_quietly(connection):
+    try:
+        connection.close()
+    except Exception as e:
+        logger.warning(f"Closing smtp connection failed: {e}")
+
+
+class PooledSMTPConnection:
+    """A connection borrowed from the pool, reopened once when the server dropped it."""
+
+    def __init__(self, pool, configuration):
+        self.pool = pool
+        self.configuration = configuration
+        self.connection = pool.acquire(configuration)
+
+    def send(self, email):
+        email.connection = self.connection
+        try:
+            return email.send()
+        except Exception as error:
+            if not is_reconnectable(error):
+                raise
+            logger.warning(f"Smtp connection lost ({error}), reconnecting")
+            close_quietly(self.connection)
+            self.connection = self.pool.open(self.configuration)
+            email.connection = self.connection
+            return email.send()
+
+    def release(self):
+        self.pool.release(self.configuration, self.connection)
+
+
+class SMTPPool:
+    """
+    Authenticated smtp connections kept open per SMTPConfiguration, so a
+    process pays the TLS handshake and AUTH once instead of per message.
+    """
+
+    def __init__(self, max_idle=SMTP_POOL_MAX_IDLE, idle_timeout=SMTP_POOL_IDLE_TIMEOUT):
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self._idle = defaultdict(list)
+        self._lock = Lock()
+
+    def open(self, configuration):
+        connection = get_connection(**connection_kwargs(configuration))
+        connection.open()
+        return connection
+
+    def _take_idle(self, key):
+        expired = []
+        taken = None
+        now = time.monotonic()
+        with self._lock:
+            for idle_key in list(self._idle):
+                fresh = []
+                for connection, released_at in self._idle[idle_key]:
+                    if now - released_at > self.idle_timeout:
+                        expired.append(connection)
+                    else:
+                        fresh.append((connection, released_at))
+                if fresh:
+                    self._idle[idle_key] = fresh
+                else:
+                    del self._idle[idle_key]
+            if self._idle.get(key):
+                taken = self._idle[key].pop()
+        for connection in expired:
+            close_quietly(connection)
+        return taken
+
+    def acquire(self, configuration):
+        taken = self._take_idle(pool_key(configuration))
+        if taken is not None:
+            connection, released_at = taken
+            if time.monotonic() - released_at < SMTP_POOL_CHECK_AFTER or is_alive(connection):
+                return connection
+            close_quietly(connection)
+        return self.open(configuration)
+
+    def release(self, configuration, connection):
+        key = pool_key(configuration)
+        with self._lock:
+            if len(self._idle[key]) < self.max_idle:
+                self._idle[key].append((connection, time.monotonic()))
+                return
+        close_quietly(connection)
+
+    def borrow(self, configuration=None):
+        """A connection for configuration, the EMAIL_* settings when None. Give it back with release()."""
+        return PooledSMTPConnection(self, configuration)
+
+    @contextmanager
+    def connection(self, configuration=None):
+        pooled = self.borrow(configuration)
+        try:
+            yield pooled
+        except BaseException:
+            # the session may be in any state, do not hand it out again
+            close_quietly(pooled.connection)
+            raise
+        else:
+            pooled.release()
+
+
+smtp_pool = SMTPPool()
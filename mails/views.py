@@ -1,14 +1,15 @@
 import pdb
-from .tasks import bulk_email_send_task, retry_failed_emails
+from .tasks import dispatch_email_send_task, retry_failed_emails
+from .services.email_dispatch_services import get_send_progress
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 
 from member.models import Email
 from . import serializers
-from .models import EmailGroup, SMTPConfiguration, EmailList, SingleEmail, EmailCompose, EmailAttachment, Outbox
+from .models import EmailGroup, SMTPConfiguration, EmailList, SingleEmail, EmailCompose, EmailAttachment, Outbox, EmailSendRecord
 from rest_framework.response import Response
 import logging
-from activity_log.tasks import log_activity_task
+from activity_log.utils.log_buffer import log_activity
 from activity_log.utils.functions import request_data_activity_log
 from rest_framework import status
 from django.shortcuts import get_object_or_404
@@ -44,7 +45,7 @@ class SetMailConfigurationAPIView(APIView):
                     }
                 }, status=201)
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Create",
                     severity_level="info",
@@ -58,7 +59,7 @@ class SetMailConfigurationAPIView(APIView):
                 }, status=400)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Create",
                 severity_level="info",
@@ -88,7 +89,7 @@ class SetMailConfigurationAPIView(APIView):
 
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="",
                 severity_level="info",
@@ -138,7 +139,7 @@ class SetMailConfigurationAPIView(APIView):
             }, status=404)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="",
                 severity_level="info",
@@ -176,7 +177,7 @@ class SetMailConfigurationAPIView(APIView):
             }, status=404)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Update",
                 severity_level="info",
@@ -218,7 +219,7 @@ class EmailComposeView(APIView):
                 }, status=400)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Creation",
                 severity_level="info",
@@ -251,7 +252,7 @@ class EmailComposeView(APIView):
 
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -305,7 +306,7 @@ class EmailComposeDetailView(APIView):
             }, status=404)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Update",
                 severity_level="info",
@@ -346,7 +347,7 @@ class EmailComposeDetailView(APIView):
             }, status=404)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Update",
                 severity_level="info",
@@ -381,7 +382,7 @@ class EmailComposeDetailView(APIView):
             }, status=404)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -525,7 +526,7 @@ class EmailGroupDetailView(APIView):
                 email_group, data=request.data, partial=True)
             if serializer.is_valid():
                 obj = serializer.update(email_group, serializer.validated_data)
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Update Email Group",
                     severity_level="info",
@@ -542,7 +543,7 @@ class EmailGroupDetailView(APIView):
                     }
                 }, status=status.HTTP_200_OK)
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Update Email Group",
                     severity_level="info",
@@ -555,7 +556,7 @@ class EmailGroupDetailView(APIView):
                     "errors": serializer.errors
                 }, status=status.HTTP_400_BAD_REQUEST)
         except EmailGroup.DoesNotExist:
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Update Email Group",
                 severity_level="errors",
@@ -571,7 +572,7 @@ class EmailGroupDetailView(APIView):
             }, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Update Email Group",
                 severity_level="errors",
@@ -1014,21 +1015,8 @@ class EmailSendView(APIView):
             serializer = serializers.EmailSendSerializer(data=request.data)
             if serializer.is_valid():
                 obj = serializer.save()
-                email_compose = serializer.validated_data['email_compose']
-                group = serializer.validated_data.get("group", None)
-                single_email = serializer.validated_data.get(
-                    "single_email", None)
-                if single_email is None and group is not None:
-                    bulk_email_send_task.delay_on_commit(
-                        email_compose_id=email_compose.id,
-                        email_addresses=list(group.group_email_lists.filter(is_subscribed=True)
-                                             .values_list('email', flat=True))
-                    )
-                elif group is None and single_email is not None:
-                    bulk_email_send_task.delay_on_commit(
-                        email_compose_id=email_compose.id,
-                        email_addresses=[single_email.email]
-                    )
+                # recipients are split in chunks and sent by the workers
+                dispatch_email_send_task.delay_on_commit(obj.id)
 
                 # activity log
                 log_request(request, "Create Email Send", "info",
@@ -1066,28 +1054,59 @@ class EmailSendView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+class EmailSendProgressView(APIView):
+    permission_classes = [IsAuthenticated, BulkEmailManagementPermission]
+
+    def get(self, request, id):
+        try:
+            send_record = EmailSendRecord.objects.get(id=id)
+            log_request(request, "Retrieve Email Send Progress", "info",
+                        "User fetched email send progress successfully")
+            return Response({
+                "code": 200,
+                "status": "success",
+                "message": "Email send progress retrieved successfully",
+                "data": get_send_progress(send_record)
+            }, status=status.HTTP_200_OK)
+        except EmailSendRecord.DoesNotExist:
+            log_request(request, "Retrieve Email Send Progress", "errors",
+                        f"User tried to fetch email send progress but it does not exist")
+            return Response({
+                "code": 404,
+                "status": "failed",
+                "message": "Email send not found",
+                "errors": {
+                    "id": ["Email send not found for the given id"]
+                }
+            }, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            logger.exception(str(e))
+            log_request(request, "Retrieve Email Send Progress", "errors",
+                        f"User tried to fetch email send progress but faced an error")
+            return Response({
+                "code": 500,
+                "status": "failed",
+                "message": "Something went wrong",
+                "errors": {
+                    "server_error": [str(e)]
+                }
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 class EmailRetryView(APIView):
     permission_classes = [IsAuthenticated, BulkEmailManagementPermission]
 
     def post(self, request):
         try:
-            is_one_process_running = cache.get("mails::retry")
-            if is_one_process_running:
-                return Response({
-                    "code": 400,
-                    "status": "failed",
-                    "message": "One process is already running",
-                    "errors": {
-                        "retry": ["One process is already running"]
-                    }
-                }, status=400)
-            else:
-                retry_failed_emails.delay()
-                return Response({
-                    "code": 200,
-                    "status": "success",
-                    "message": "Retry process started successfully"
-                }, status=200)
+            # overlapping retries are safe, every mail is claimed by one worker
+            retry_failed_emails.delay()
+            log_request(request, "Retry failed emails", "info",
+                        "User started retrying failed emails")
+            return Response({
+                "code": 200,
+                "status": "success",
+                "message": "Retry process started successfully"
+            }, status=200)
         except Exception as e:
             logger.exception(str(e))
             log_request(request, "Retry failed emails", "errors",
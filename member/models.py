@@ -1,6 +1,9 @@
 from django.db import models
 from core.models import Gender, BLOOD_GROUPS, COUNTRY_CHOICES, MembershipType, InstituteName, MembershipStatusChoice, MaritalStatusChoice, STATUS_CHOICES, ContactTypeChoice, EmailTypeChoice, EmploymentTypeChoice, DocumentTypeChoice, AddressTypeChoice, DescendantRelationChoice, SpouseStatusChoice
 from club.models import Club
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
 
 
 class Member(models.Model):
@@ -345,3 +348,38 @@ class MemberHistory(models.Model):
 
     def __str__(self):
         return self.stored_member_id
+
+
+class MemberReportJob(models.Model):
+    REPORT_TYPE_CHOICES = [
+        ('member_excel', 'member_excel'),
+        ('member_pdf', 'member_pdf'),
+        ('member_list_excel', 'member_list_excel'),
+        ('member_list_csv', 'member_list_csv'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'pending'),
+        ('processing', 'processing'),
+        ('completed', 'completed'),
+        ('failed', 'failed'),
+    ]
+    report_type = models.CharField(max_length=50, choices=REPORT_TYPE_CHOICES)
+    # member_ID for single member reports, list filters for list reports
+    parameters = models.JSONField(default=dict, blank=True)
+    # hash of the data the report is rendered from, equal hashes share one file
+    content_hash = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(
+        max_length=30, choices=STATUS_CHOICES, default="pending")
+    file = models.FileField(upload_to="member_reports/", max_length=255, blank=True, default="")
+    filename = models.CharField(max_length=255, blank=True, default="")
+    error = models.TextField(blank=True, default="")
+    finished_at = models.DateTimeField(null=True, blank=True, default=None)
+    # relation
+    created_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, related_name="member_report_jobs", blank=True, null=True)
+    # record keeping
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.report_type} report {self.id} ({self.status})"
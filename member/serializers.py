@@ -1,7 +1,7 @@
 from core.models import Gender
 from core.models import Gender, MembershipType, InstituteName, MembershipStatusChoice, MaritalStatusChoice, BLOOD_GROUPS, COUNTRY_CHOICES, ContactTypeChoice, EmailTypeChoice, AddressTypeChoice, SpouseStatusChoice, DescendantRelationChoice, DocumentTypeChoice
 from rest_framework import serializers
-from .models import Member, MembersFinancialBasics, ContactNumber, Email, Address, Spouse, Descendant, Profession, EmergencyContact, CompanionInformation, Documents, MemberHistory, SpecialDay, Certificate
+from .models import Member, MembersFinancialBasics, ContactNumber, Email, Address, Spouse, Descendant, Profession, EmergencyContact, CompanionInformation, Documents, MemberHistory, SpecialDay, Certificate, MemberReportJob
 from club.models import Club
 import pdb
 from .utils.utility_functions import generate_member_id
@@ -1316,3 +1316,27 @@ class MemberDocumentViewSerializer(serializers.ModelSerializer):
     class Meta:
         model = Documents
         fields = "__all__"
+
+
+class MemberReportRequestSerializer(serializers.Serializer):
+    report_type = serializers.ChoiceField(
+        choices=MemberReportJob.REPORT_TYPE_CHOICES)
+    member_ID = serializers.CharField(required=False)
+    # member list filters, the same ones the member list accepts
+    filters = serializers.DictField(
+        child=serializers.CharField(), required=False, default=dict)
+
+    def validate(self, attrs):
+        if attrs["report_type"] in ("member_excel", "member_pdf") and not attrs.get("member_ID"):
+            raise serializers.ValidationError({
+                "member_ID": ["member_ID is required for single member reports"]
+            })
+        return attrs
+
+
+class MemberReportJobSerializer(serializers.ModelSerializer):
+    created_by = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = MemberReportJob
+        exclude = ["file"]
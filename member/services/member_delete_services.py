@@ -1,7 +1,8 @@
 from django.db import transaction
 from django.utils import timezone
 from event.models import Event, EventFee, EventMedia
-from member.tasks import delete_members_cache, delete_member_model_dependencies
+from member.tasks import delete_member_model_dependencies
+from ..utils.cache import invalidate_member_cache_on_commit, invalidate_member_list_cache_on_commit
 from ..utils.utility_functions import log_request
 from django.db import transaction
 from member.models import (
@@ -14,6 +15,13 @@ from member_financial_management.models import (
 from event.models import EventTicket, Event
 from promo_code_app.models import AppliedPromoCode
 
+def invalidate_deleted_members_cache(member_IDs):
+    """Drop the detail and list entries of permanently deleted members once the delete is committed."""
+    for member_ID in member_IDs:
+        invalidate_member_cache_on_commit(member_ID)
+    invalidate_member_list_cache_on_commit()
+
+
 class MemberBulkDeleteActionService:
     def __init__(self, request, members):
         self.request = request
@@ -83,8 +91,11 @@ class MemberBulkDeleteActionService:
     def hard_delete(self):
         try:
             with transaction.atomic():
+                member_IDs = []
                 for member in self.members:
+                    member_IDs.append(member.member_ID)
                     self._delete_single_member(member)
+                invalidate_deleted_members_cache(member_IDs)
 
             return {
                 "code": 204,
@@ -172,6 +183,7 @@ class MemberSingleDeleteActionService:
                 self._delete_invoices()
 
                 # Finally, delete the member
+                member_ID = self.member.member_ID
                 self.member.delete()
 
                 log_request(
@@ -180,7 +192,7 @@ class MemberSingleDeleteActionService:
                     "info",
                     "This member is permanently deleted."
                 )
-                delete_members_cache.delay()
+                invalidate_deleted_members_cache([member_ID])
 
             return {
                 "code": 204,
@@ -0,0 +1,97 @@
+import csv
+import io
+import tempfile
+import xlsxwriter
+from django.http import FileResponse, StreamingHttpResponse
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# rows fetched from the database per round trip while exporting
+MEMBER_EXPORT_CHUNK_SIZE = 2000
+
+# (queryset field, column header) of the member list export
+MEMBER_EXPORT_COLUMNS = (
+    ("member_ID", "member_ID"),
+    ("first_name", "first_name"),
+    ("last_name", "last_name"),
+    ("gender__name", "gender"),
+    ("date_of_birth", "date_of_birth"),
+    ("batch_number", "batch_number"),
+    ("anniversary_date", "anniversary_date"),
+    ("profile_photo", "profile_photo"),
+    ("blood_group", "blood_group"),
+    ("nationality", "nationality"),
+    ("membership_type__name", "membership_type"),
+    ("institute_name__name", "institute_name"),
+    ("membership_status__name", "membership_status"),
+    ("marital_status__name", "marital_status"),
+)
+
+
+class _Echo:
+    """File like object that hands every written line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def iter_member_export_rows(queryset, chunk_size=MEMBER_EXPORT_CHUNK_SIZE):
+    """Yield the export columns of every member without loading the whole queryset."""
+    fields = [field for field, _ in MEMBER_EXPORT_COLUMNS]
+    return queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+
+
+def stream_members_csv(queryset, filename="members.csv"):
+    """Stream the member list as csv, one chunk of rows at a time."""
+    writer = csv.writer(_Echo())
+
+    def rows():
+        yield writer.writerow([header for _, header in MEMBER_EXPORT_COLUMNS])
+        for row in iter_member_export_rows(queryset):
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(rows(), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def write_members_csv(queryset, csv_file):
+    """Write the member list as csv into an open binary file."""
+    text_file = io.TextIOWrapper(csv_file, encoding="utf-8", newline="")
+    writer = csv.writer(text_file)
+    writer.writerow([header for _, header in MEMBER_EXPORT_COLUMNS])
+    writer.writerows(iter_member_export_rows(queryset))
+    text_file.flush()
+    # hand the binary file back to the caller open
+    text_file.detach()
+
+
+def write_members_xlsx(queryset, excel_file):
+    """
+    Write the member list into an open binary file with xlsxwriter in
+    constant memory mode, every row is flushed to disk as soon as it is
+    written so memory stays flat whatever the size of the export.
+    """
+    workbook = xlsxwriter.Workbook(excel_file, {
+        "constant_memory": True,
+        "default_date_format": "yyyy-mm-dd",
+        "remove_timezone": True,
+    })
+    worksheet = workbook.add_worksheet("Members")
+    worksheet.write_row(0, 0, [header for _, header in MEMBER_EXPORT_COLUMNS])
+    for row_number, row in enumerate(iter_member_export_rows(queryset), start=1):
+        worksheet.write_row(row_number, 0, row)
+    workbook.close()
+
+
+def export_members_xlsx(queryset, filename="members.xlsx"):
+    """Write the member list to a temporary file and stream it from disk."""
+    excel_file = tempfile.TemporaryFile()
+    write_members_xlsx(queryset, excel_file)
+    excel_file.seek(0)
+    return FileResponse(
+        excel_file,
+        as_attachment=True,
+        filename=filename,
+        content_type=XLSX_CONTENT_TYPE
+    )
@@ -0,0 +1,293 @@
+import hashlib
+import json
+import logging
+import tempfile
+from datetime import datetime, timedelta
+from io import StringIO
+import xlsxwriter
+from django.core.files import File
+from django.db.models import Count, Max
+from django.template.loader import render_to_string
+from django.utils import timezone
+from xhtml2pdf import pisa
+from core.db_router import analytics_reads
+from ..models import Member, MemberReportJob
+from ..utils.cache import MEMBER_LIST_NAMESPACE, get_namespace_version
+from ..utils.filters import MemberFilter
+from .member_export_services import XLSX_CONTENT_TYPE, write_members_csv, write_members_xlsx
+logger = logging.getLogger("myapp")
+
+# bump when the layout of a report changes so files rendered before are not reused
+MEMBER_REPORT_VERSION = 1
+# pending jobs older than this are considered lost and are not reused
+MEMBER_REPORT_STALE_AFTER = timedelta(minutes=30)
+
+SINGLE_MEMBER_REPORT_TYPES = ("member_excel", "member_pdf")
+MEMBER_LIST_REPORT_TYPES = ("member_list_excel", "member_list_csv")
+
+MEMBER_REPORT_CONTENT_TYPES = {
+    "member_excel": XLSX_CONTENT_TYPE,
+    "member_pdf": "application/pdf",
+    "member_list_excel": XLSX_CONTENT_TYPE,
+    "member_list_csv": "text/csv",
+}
+
+# (sheet name, related name) of the sheets of the single member excel
+MEMBER_REPORT_SECTIONS = (
+    ("contact numbers", "contact_numbers"),
+    ("email addresses", "emails"),
+    ("addresses", "addresses"),
+    ("descendants", "descendants"),
+    ("spouse", "spouse"),
+    ("emergency contact", "emergency_contacts"),
+    ("companion", "companions"),
+    ("certificate", "certificates"),
+    ("documents", "credentials"),
+    ("jobs", "professions"),
+    ("special days", "special_days"),
+)
+
+
+class MemberReportError(Exception):
+    """Raised when a report can not be built from the given parameters."""
+
+    def __init__(self, message, errors):
+        super().__init__(message)
+        self.message = message
+        self.errors = errors
+
+
+def get_member_for_report(member_ID):
+    try:
+        member = Member.objects.select_related(
+            'marital_status', 'membership_status', 'institute_name',
+            'membership_type', 'gender'
+        ).get(member_ID=member_ID)
+    except Member.DoesNotExist:
+        raise MemberReportError("Member not found", {
+            "member_ID": ["Member not found by this member_ID"]
+        })
+    if member.status == 2:
+        raise MemberReportError("Member is already deleted", {
+            "member_ID": [f"{member_ID} member has been deleted"]
+        })
+    return member
+
+
+def get_member_list_queryset(filters):
+    queryset = Member.objects.filter(
+        status=0, is_active=True).order_by("id")
+    if filters:
+        filterset = MemberFilter(filters, queryset=queryset)
+        if not filterset.is_valid():
+            raise MemberReportError("Invalid filters", filterset.errors)
+        queryset = filterset.qs
+    return queryset
+
+
+def collect_member_report_data(member):
+    """Return the member info and every related sheet of a member as plain rows."""
+    member_info = {
+        "id": member.id,
+        "member_ID": member.member_ID,
+        "first_name": member.first_name,
+        "last_name": member.last_name,
+        "date_of_birth": member.date_of_birth,
+        "batch_number": member.batch_number,
+        "anniversary_date": member.anniversary_date,
+        "profile_photo": member.profile_photo.url if member.profile_photo else "",
+        "blood_group": member.blood_group,
+        "nationality": member.nationality,
+        "status": member.status,
+        "is_active": member.is_active,
+        "created_at": member.created_at,
+        "updated_at": member.updated_at,
+        "gender": member.gender.name,
+        "membership_type": member.membership_type.name,
+        "institute_name": member.institute_name.name,
+        "membership_status": member.membership_status.name,
+        "marital_status": member.marital_status.name,
+    }
+    sheets = [("Member Info", [member_info])]
+    for sheet_name, related_name in MEMBER_REPORT_SECTIONS:
+        sheets.append(
+            (sheet_name, list(getattr(member, related_name).values())))
+    return sheets
+
+
+def member_list_fingerprint(queryset, filters):
+    """
+    Cheap stand in for the content of a list export: the filters, the
+    member list cache generation and one aggregate over the filtered rows.
+    """
+    return {
+        "filters": filters,
+        "list_version": get_namespace_version(MEMBER_LIST_NAMESPACE),
+        **queryset.aggregate(count=Count("id"), last_id=Max("id"), last_updated=Max("updated_at")),
+    }
+
+
+def member_report_hash(report_type, content):
+    raw = json.dumps({
+        "report_type": report_type,
+        "version": MEMBER_REPORT_VERSION,
+        "content": content,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def member_report_filename(report_type, parameters):
+    if report_type == "member_excel":
+        return f"member_{parameters['member_ID']}_details.xlsx"
+    if report_type == "member_pdf":
+        return f"member_{parameters['member_ID']}.pdf"
+    if report_type == "member_list_excel":
+        return "members.xlsx"
+    return "members.csv"
+
+
+def _write_sheet(workbook, sheet_name, rows, datetime_format):
+    worksheet = workbook.add_worksheet(sheet_name)
+    if not rows:
+        return
+    headers = list(rows[0].keys())
+    worksheet.write_row(0, 0, headers)
+    for row_number, row in enumerate(rows, start=1):
+        for column, header in enumerate(headers):
+            value = row[header]
+            if isinstance(value, datetime):
+                worksheet.write_datetime(
+                    row_number, column, value, datetime_format)
+            elif value is None or isinstance(value, (str, int, float, bool)) or hasattr(value, "isoformat"):
+                worksheet.write(row_number, column, value)
+            else:
+                worksheet.write_string(row_number, column, str(value))
+
+
+def render_member_excel(sheets, excel_file):
+    """Write the sheets returned by collect_member_report_data into an open binary file."""
+    workbook = xlsxwriter.Workbook(excel_file, {
+        "default_date_format": "yyyy-mm-dd",
+        "remove_timezone": True,
+    })
+    datetime_format = workbook.add_format(
+        {"num_format": "yyyy-mm-dd hh:mm:ss"})
+    for sheet_name, rows in sheets:
+        _write_sheet(workbook, sheet_name, rows, datetime_format)
+    workbook.close()
+
+
+def render_member_pdf(member, pdf_file):
+    """Render member_pdf.html and convert it into an open binary file."""
+    # TODO: add all context and update the html to pdf file.
+    context = {
+        "member": member,
+        "emails": member.emails.all(),
+        "contacts": member.contact_numbers.select_related("contact_type"),
+    }
+    html_string = render_to_string("member_pdf.html", context)
+    pisa.CreatePDF(StringIO(html_string), dest=pdf_file)
+
+
+def render_member_report(report_type, parameters, report_file):
+    """Render a report into an open binary file and return the hash of its content."""
+    if report_type in SINGLE_MEMBER_REPORT_TYPES:
+        member = get_member_for_report(parameters.get("member_ID"))
+        sheets = collect_member_report_data(member)
+        if report_type == "member_excel":
+            render_member_excel(sheets, report_file)
+        else:
+            render_member_pdf(member, report_file)
+        return member_report_hash(report_type, sheets)
+
+    filters = parameters.get("filters", {})
+    queryset = get_member_list_queryset(filters)
+    content_hash = member_report_hash(
+        report_type, member_list_fingerprint(queryset, filters))
+    if report_type == "member_list_excel":
+        write_members_xlsx(queryset, report_file)
+    else:
+        write_members_csv(queryset, report_file)
+    return content_hash
+
+
+def get_member_report_hash(report_type, parameters):
+    """Hash the content a report would be rendered from, without rendering it."""
+    if report_type in SINGLE_MEMBER_REPORT_TYPES:
+        member = get_member_for_report(parameters.get("member_ID"))
+        return member_report_hash(report_type, collect_member_report_data(member))
+    filters = parameters.get("filters", {})
+    queryset = get_member_list_queryset(filters)
+    return member_report_hash(report_type, member_list_fingerprint(queryset, filters))
+
+
+def is_report_file_available(job):
+    return bool(job.file) and job.file.storage.exists(job.file.name)
+
+
+def request_member_report(report_type, parameters, user):
+    """
+    Return a job for the report. A job rendered from the same content is
+    reused when it finished or is still running, otherwise a new job is
+    queued. The second value tells whether an existing job was reused.
+    """
+    from ..tasks import generate_member_report
+
+    content_hash = get_member_report_hash(report_type, parameters)
+    jobs = MemberReportJob.objects.filter(
+        report_type=report_type, content_hash=content_hash).order_by("-id")
+    for job in jobs.filter(status="completed")[:1]:
+        if is_report_file_available(job):
+            return job, True
+    running_job = jobs.filter(
+        status__in=["pending", "processing"],
+        created_at__gte=timezone.now() - MEMBER_REPORT_STALE_AFTER).first()
+    if running_job:
+        return running_job, True
+
+    job = MemberReportJob.objects.create(
+        report_type=report_type,
+        parameters=parameters,
+        content_hash=content_hash,
+        filename=member_report_filename(report_type, parameters),
+        created_by=user,
+    )
+    generate_member_report.delay_on_commit(job.id)
+    return job, False
+
+
+def _fail_job(job, error):
+    job.status = "failed"
+    job.error = error
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "error", "finished_at", "updated_at"])
+
+
+def run_member_report_job(job):
+    """Render the report of a job to media storage."""
+    job.status = "processing"
+    job.save(update_fields=["status", "updated_at"])
+    extension = job.filename.rsplit(".", 1)[-1]
+    try:
+        with tempfile.TemporaryFile() as report_file:
+            with analytics_reads():
+                content_hash = render_member_report(
+                    job.report_type, job.parameters, report_file)
+            report_file.seek(0)
+            # the content may have changed since the job was queued
+            job.content_hash = content_hash
+            job.file.save(f"{job.report_type}_{content_hash}.{extension}",
+                          File(report_file), save=False)
+    except MemberReportError as e:
+        _fail_job(job, e.message)
+        return job
+    except Exception as e:
+        logger.exception(str(e))
+        _fail_job(job, str(e))
+        return job
+
+    job.status = "completed"
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "content_hash",
+             "file", "finished_at", "updated_at"])
+    return job
@@ -1,8 +1,9 @@
 from celery import shared_task
-from .models import Member, MemberHistory, MembersFinancialBasics
+from .models import Member, MemberHistory, MembersFinancialBasics, MemberReportJob
 from django.db import transaction
 from .models import ContactNumber, Email, Address, Spouse, Descendant, Profession, EmergencyContact, CompanionInformation, Documents, Certificate, SpecialDay
-from django.core.cache import cache
+from .utils.cache import invalidate_all_member_cache, invalidate_member_cache
+from .services.member_report_services import run_member_report_job
 
 
 @shared_task
@@ -41,10 +42,7 @@ def delete_member_model_dependencies(id):
 @shared_task
 def delete_members_cache():
     try:
-        cache.delete_pattern("members_list::*")
-        cache.delete_pattern("specific_member::*")
-        cache.delete_pattern("all_member_history::*")
-        cache.delete_pattern("specific_member_history::*")
+        invalidate_all_member_cache()
         return "success"
     except Exception as e:
         return str(e)
@@ -53,7 +51,17 @@ def delete_members_cache():
 @shared_task
 def delete_members_specific_cache(member_id):
     try:
-        cache.delete_pattern(f"specific_member::{member_id}*")
+        invalidate_member_cache(member_id)
         return "success"
     except Exception as e:
         return str(e)
+
+
+@shared_task
+def generate_member_report(job_id):
+    try:
+        job = MemberReportJob.objects.get(id=job_id)
+    except MemberReportJob.DoesNotExist:
+        return {"error": f"Report job {job_id} does not exist"}
+    job = run_member_report_job(job)
+    return {"status": job.status}
@@ -7,6 +7,15 @@ import pdb
 from unittest.mock import patch
 import random
 from member.utils.permission_classes import MemberManagementPermission
+from member.utils.cache import (
+    MEMBER_LIST_NAMESPACE, build_cache_key, get_tagged_cache, set_tagged_cache,
+    invalidate_member_cache, invalidate_member_list_cache, invalidate_member_cache_on_commit
+)
+from django.db import transaction
+from django.core.cache import cache
+from django.test import override_settings
+import tempfile
+from member.services.member_report_services import run_member_report_job
 
 fake = Faker()
 
@@ -285,6 +294,35 @@ class TestMemberCreateAndUpdateEndpoints(APITestCase):
         self.assertIn("pagination", _response)
         self.assertEqual(len(_response["data"]), 100)
 
+    @patch.object(MemberManagementPermission, "has_permission", return_value=True)
+    def test_export_all_members(self, mock_permission):
+        """
+            Test view_all_members list api endpoint. with excel and csv export
+        """
+        # arrange
+        gender1 = GenderFactory()
+        gender2 = GenderFactory()
+        MemberFactory.create_batch(30, gender=gender1)
+        MemberFactory.create_batch(20, gender=gender2)
+        # act
+        _response = self.client.get(
+            f"/api/member/v1/members/list/?download_csv=true&gender={gender1.name}")
+        # assert
+        self.assertEqual(_response.status_code, 200)
+        self.assertTrue(_response.streaming)
+        rows = b"".join(_response.streaming_content).decode().splitlines()
+        self.assertEqual(rows[0].split(",")[0], "member_ID")
+        self.assertEqual(len(rows), 31)
+        # act
+        _response = self.client.get(
+            "/api/member/v1/members/list/?download_excel=true")
+        # assert
+        self.assertEqual(_response.status_code, 200)
+        self.assertTrue(_response.streaming)
+        self.assertIn('filename="members.xlsx"',
+                      _response["Content-Disposition"])
+        self.assertTrue(b"".join(_response.streaming_content).startswith(b"PK"))
+
 
 class SpouseApiEndpointTest(APITestCase):
     @classmethod
@@ -1945,3 +1983,166 @@ class TestMemberSpecialDayAddAndUpdate(APITestCase):
         self.assertEqual(len(_response['errors']['data']), 5)
         for error in _response['errors']['data']:
             self.assertListEqual(error['title'], ['This field is required.'])
+
+
+class TestMemberCacheInvalidation(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser(
+            username=fake.user_name(), password=fake.password(length=8))
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(user=self.user)
+
+    def test_member_tag_invalidates_only_tagged_entries(self):
+        """
+        Test that bumping a member tag only invalidates entries tagged with that member
+        """
+        # arrange
+        set_tagged_cache("test::page_1", {"page": 1}, ["M0001", "M0002"])
+        set_tagged_cache("test::page_2", {"page": 2}, ["M0003"])
+        # act
+        invalidate_member_cache("M0002")
+        # assert
+        self.assertIsNone(get_tagged_cache("test::page_1"))
+        self.assertEqual(get_tagged_cache("test::page_2"), {"page": 2})
+
+    def test_member_tag_is_bumped_once_the_transaction_commits(self):
+        """
+        Test that a member changed inside a transaction keeps its entries until the commit
+        """
+        # arrange
+        set_tagged_cache("test::page_1", {"page": 1}, ["M0001"])
+        # act
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                invalidate_member_cache_on_commit("M0001")
+                # a read before the commit still sees the old generation
+                _before_commit = get_tagged_cache("test::page_1")
+        # assert
+        self.assertEqual(_before_commit, {"page": 1})
+        self.assertIsNone(get_tagged_cache("test::page_1"))
+
+    def test_namespace_version_bump_changes_cache_key(self):
+        """
+        Test that invalidating the member list moves list keys to a new generation
+        """
+        # arrange
+        old_key = build_cache_key(MEMBER_LIST_NAMESPACE, "default")
+        # act
+        invalidate_member_list_cache()
+        # assert
+        self.assertNotEqual(
+            build_cache_key(MEMBER_LIST_NAMESPACE, "default"), old_key)
+
+    @patch.object(MemberManagementPermission, "has_permission", return_value=True)
+    def test_member_list_cache_is_refreshed_after_member_update(self, mock_permission):
+        """
+        Test that a cached member list page is rebuilt after one of its members changes
+        """
+        # arrange
+        members = MemberFactory.create_batch(3)
+        self.client.get("/api/member/v1/members/list/")
+        Member.objects.filter(pk=members[0].pk).update(first_name="Cached")
+        # act
+        _stale = self.client.get("/api/member/v1/members/list/").json()
+        invalidate_member_cache(members[0].member_ID)
+        _fresh = self.client.get("/api/member/v1/members/list/").json()
+        # assert
+        self.assertNotIn("Cached", [m["first_name"] for m in _stale["data"]])
+        self.assertIn("Cached", [m["first_name"] for m in _fresh["data"]])
+
+    @patch.object(MemberManagementPermission, "has_permission", return_value=True)
+    def test_member_hard_delete_invalidates_member_entries(self, mock_permission):
+        """
+        Test that permanently deleting members drops the cached entries tagged with them
+        """
+        # arrange
+        members = MemberFactory.create_batch(3)
+        Member.objects.filter(pk__in=[m.pk for m in members]).update(
+            status=2, is_active=False)
+        for member in members:
+            set_tagged_cache(f"test::{member.member_ID}", {
+                             "member": member.member_ID}, [member.member_ID])
+        # act
+        with self.captureOnCommitCallbacks(execute=True):
+            _single = self.client.delete(
+                f"/api/member/v1/members/hard_delete/{members[0].pk}/")
+        self.assertIsNotNone(get_tagged_cache(f"test::{members[1].member_ID}"))
+        with self.captureOnCommitCallbacks(execute=True):
+            _bulk = self.client.delete("/api/member/v1/members/bulk_delete/all/")
+        # assert
+        self.assertEqual(_single.status_code, 204)
+        self.assertEqual(_bulk.status_code, 204)
+        for member in members:
+            self.assertIsNone(get_tagged_cache(f"test::{member.member_ID}"))
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class TestMemberReportEndpoints(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser(
+            username=fake.user_name(), password=fake.password(length=8))
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(user=self.user)
+
+    @patch("member.tasks.generate_member_report.delay_on_commit")
+    @patch.object(MemberManagementPermission, "has_permission", return_value=True)
+    def test_member_report_is_generated_and_reused(self, mock_permission, mock_delay):
+        """
+        Test that a member report is queued, downloadable once rendered and reused while the member is unchanged
+        """
+        # arrange
+        member = MemberFactory()
+        request_body = {"report_type": "member_excel",
+                        "member_ID": member.member_ID}
+        # act
+        _response = self.client.post(
+            "/api/member/v1/members/reports/", request_body, format="json")
+        # assert
+        self.assertEqual(_response.status_code, 202)
+        job_id = _response.data["data"]["id"]
+        mock_delay.assert_called_once_with(job_id)
+        # act: render the report the way the worker does
+        job = run_member_report_job(MemberReportJob.objects.get(id=job_id))
+        _response = self.client.get(
+            f"/api/member/v1/members/reports/{job_id}/download/")
+        # assert
+        self.assertEqual(job.status, "completed")
+        self.assertEqual(_response.status_code, 200)
+        self.assertTrue(b"".join(_response.streaming_content).startswith(b"PK"))
+        etag = _response["ETag"]
+        _response = self.client.get(
+            f"/api/member/v1/members/reports/{job_id}/download/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(_response.status_code, 304)
+        # act: the same member is requested again
+        _response = self.client.post(
+            "/api/member/v1/members/reports/", request_body, format="json")
+        # assert
+        self.assertEqual(_response.status_code, 200)
+        self.assertEqual(_response.data["data"]["id"], job_id)
+        self.assertTrue(_response.data["data"]["reused"])
+        # act: the member changes
+        member.first_name = "changed"
+        member.save()
+        _response = self.client.post(
+            "/api/member/v1/members/reports/", request_body, format="json")
+        # assert
+        self.assertEqual(_response.status_code, 202)
+        self.assertNotEqual(_response.data["data"]["id"], job_id)
+
+    @patch.object(MemberManagementPermission, "has_permission", return_value=True)
+    def test_member_report_with_invalid_data(self, mock_permission):
+        """
+        Test that a report for an unknown member is rejected
+        """
+        # act
+        _response = self.client.post("/api/member/v1/members/reports/", {
+            "report_type": "member_pdf", "member_ID": "unknown"}, format="json")
+        # assert
+        self.assertEqual(_response.status_code, 400)
+        self.assertIn("member_ID", _response.data["errors"])
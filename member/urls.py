@@ -58,6 +58,12 @@ urlpatterns = [
          name="certificate_delete"),
     path('v1/members/history/<str:member_ID>/', views.MemberSingleHistoryView.as_view(),
          name="member_history_single_view"),
+    path('v1/members/reports/', views.MemberReportView.as_view(),
+         name="member_report_view"),
+    path('v1/members/reports/<int:id>/', views.MemberReportSpecificView.as_view(),
+         name="member_report_specific_view"),
+    path('v1/members/reports/<int:id>/download/', views.MemberReportDownloadView.as_view(),
+         name="member_report_download_view"),
     path('v1/members/<str:member_id>/', views.MemberView.as_view(),
          name="member_update_and_delete_view"),
     path('v1/members/list/ids/', views.MemberIDListView.as_view(),
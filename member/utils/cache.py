@@ -0,0 +1,137 @@
+from django.core.cache import cache
+from django.db import transaction
+
+# namespaces cached by the member app
+MEMBER_LIST_NAMESPACE = "members_list"
+MEMBER_DETAIL_NAMESPACE = "specific_member"
+MEMBER_HISTORY_NAMESPACE = "all_member_history"
+MEMBER_SINGLE_HISTORY_NAMESPACE = "specific_member_history"
+MEMBER_NAMESPACES = (
+    MEMBER_LIST_NAMESPACE,
+    MEMBER_DETAIL_NAMESPACE,
+    MEMBER_HISTORY_NAMESPACE,
+    MEMBER_SINGLE_HISTORY_NAMESPACE,
+)
+
+# cached entries live for 30 minutes, tags must outlive them
+MEMBER_CACHE_TIMEOUT = 60*30
+MEMBER_TAG_TIMEOUT = 60*60*24
+
+# member fields the member list can be filtered on (see MemberFilter)
+MEMBER_LIST_FILTER_FIELDS = (
+    "member_ID", "first_name", "last_name", "date_of_birth", "blood_group",
+    "nationality", "gender_id", "membership_type_id", "institute_name_id",
+    "membership_status_id", "marital_status_id",
+)
+
+
+def _namespace_version_key(namespace):
+    return f"{namespace}::version"
+
+
+def _member_tag_key(member_ID):
+    return f"member_tag::{member_ID}"
+
+
+def get_namespace_version(namespace):
+    """Return the current generation of a cache namespace."""
+    version = cache.get(_namespace_version_key(namespace))
+    return version if version is not None else 1
+
+
+def bump_namespace_version(namespace):
+    """
+    Invalidate every entry of a namespace with a single INCR. Old entries
+    are never read again and simply expire.
+    """
+    key = _namespace_version_key(namespace)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # the counter does not exist yet, readers treat it as generation 1
+        cache.add(key, 2, timeout=None)
+        return 2
+
+
+def bump_member_tag(member_ID):
+    """Invalidate every cached entry tagged with this member."""
+    if not member_ID:
+        return
+    key = _member_tag_key(member_ID)
+    try:
+        cache.incr(key)
+        cache.touch(key, MEMBER_TAG_TIMEOUT)
+    except ValueError:
+        cache.add(key, 1, timeout=MEMBER_TAG_TIMEOUT)
+
+
+def build_cache_key(namespace, suffix):
+    return f"{namespace}::v{get_namespace_version(namespace)}::{suffix}"
+
+
+def get_tagged_cache(cache_key):
+    """
+    Return the cached data for the key if none of the members it was
+    tagged with changed after it was stored, otherwise None.
+    """
+    entry = cache.get(cache_key)
+    if not entry:
+        return None
+    tags = entry.get("tags", {})
+    if tags:
+        current = cache.get_many([_member_tag_key(tag) for tag in tags])
+        for tag, version in tags.items():
+            if current.get(_member_tag_key(tag), 0) != version:
+                return None
+    return entry.get("data")
+
+
+def set_tagged_cache(cache_key, data, member_IDs, timeout=MEMBER_CACHE_TIMEOUT):
+    """Store data together with the current tag versions of the given members."""
+    member_IDs = [member_ID for member_ID in member_IDs if member_ID]
+    current = cache.get_many([_member_tag_key(member_ID)
+                             for member_ID in member_IDs])
+    tags = {
+        member_ID: current.get(_member_tag_key(member_ID), 0)
+        for member_ID in member_IDs
+    }
+    cache.set(cache_key, {"tags": tags, "data": data}, timeout)
+
+
+def member_list_signature(member):
+    """Values of a member that decide which filtered list pages contain it."""
+    return tuple(getattr(member, field) for field in MEMBER_LIST_FILTER_FIELDS)
+
+
+def invalidate_member_cache(member_ID):
+    """
+    Invalidate the detail entry of a member and the cached list pages that
+    contain it. Used when a member changes without affecting which list
+    pages it belongs to.
+    """
+    bump_member_tag(member_ID)
+
+
+def invalidate_member_list_cache():
+    """Invalidate list and history pages, used when list membership may change."""
+    bump_namespace_version(MEMBER_LIST_NAMESPACE)
+    bump_namespace_version(MEMBER_HISTORY_NAMESPACE)
+    bump_namespace_version(MEMBER_SINGLE_HISTORY_NAMESPACE)
+
+
+def invalidate_member_cache_on_commit(member_ID):
+    """
+    Invalidate the member once the running transaction commits, right away
+    outside of one. Bumping earlier lets a concurrent read cache the old row
+    under the new version.
+    """
+    transaction.on_commit(lambda: invalidate_member_cache(member_ID))
+
+
+def invalidate_member_list_cache_on_commit():
+    transaction.on_commit(invalidate_member_list_cache)
+
+
+def invalidate_all_member_cache():
+    for namespace in MEMBER_NAMESPACES:
+        bump_namespace_version(namespace)
@@ -2,7 +2,7 @@ from django.db.models import Max
 from member.models import Member
 import pdb
 import re
-from activity_log.tasks import log_activity_task
+from activity_log.utils.log_buffer import log_activity
 from activity_log.utils.functions import request_data_activity_log
 
 # def generate_member_id(membership_type):
@@ -121,7 +121,7 @@ def generate_member_id(membership_type,institute_code):
 
 
 def log_request(request, verb, level, description):
-    log_activity_task.delay_on_commit(
+    log_activity(
         request_data_activity_log(request),
         verb=verb,
         severity_level=level,
@@ -7,19 +7,17 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.db import transaction
 from django.shortcuts import get_object_or_404
-from .models import Member, Email, MembersFinancialBasics, InstituteName, Certificate, MemberHistory, CompanionInformation, Documents
+from .models import Member, Email, MembersFinancialBasics, InstituteName, Certificate, MemberHistory, CompanionInformation, Documents, MemberReportJob
 from .utils.permission_classes import MemberManagementPermission
 import logging
-from activity_log.tasks import log_activity_task
+from activity_log.utils.log_buffer import log_activity
 from activity_log.utils.functions import request_data_activity_log
 from core.models import MembershipType
 from datetime import datetime
 from django.utils import timezone
 from core.utils.pagination import CustomPageNumberPagination
-import pandas as pd
-from django.http import HttpResponse
-from io import BytesIO, StringIO
-from xhtml2pdf import pisa
+from django.http import HttpResponse, FileResponse, HttpResponseNotModified
+from io import BytesIO
 from django.shortcuts import render
 from .utils.filters import MemberFilter
 from .import models
@@ -30,10 +28,19 @@ from .models import Spouse, Profession
 from .tasks import delete_member_model_dependencies
 from django.core.cache import cache
 from django.utils.http import urlencode
-from .tasks import delete_members_cache, delete_members_specific_cache
+from .utils.cache import (
+    MEMBER_LIST_NAMESPACE, MEMBER_DETAIL_NAMESPACE, MEMBER_HISTORY_NAMESPACE, MEMBER_SINGLE_HISTORY_NAMESPACE,
+    build_cache_key, get_tagged_cache, set_tagged_cache, member_list_signature,
+    invalidate_member_cache_on_commit, invalidate_member_list_cache_on_commit
+)
 from django.http import Http404
 logger = logging.getLogger("myapp")
 from .services.member_delete_services import MemberBulkDeleteActionService,MemberSingleDeleteActionService
+from .services.member_export_services import XLSX_CONTENT_TYPE, export_members_xlsx, stream_members_csv
+from .services.member_report_services import (
+    MEMBER_REPORT_CONTENT_TYPES, MemberReportError, collect_member_report_data, is_report_file_available,
+    render_member_excel, render_member_pdf, request_member_report
+)
 
 
 class MemberView(APIView):
@@ -66,7 +73,7 @@ class MemberView(APIView):
                     MemberHistory.objects.create(start_date=timezone.now(
                     ), stored_member_id=member.member_ID, member=member)
                     # cache delete
-                    delete_members_cache.delay()
+                    invalidate_member_list_cache_on_commit()
                     return Response({
                         'code': 201,
                         'status': 'success',
@@ -109,13 +116,18 @@ class MemberView(APIView):
             member_serializer = serializers.MemberSerializer(member, data=data)
             is_member_serializer_valid = member_serializer.is_valid()
             if is_member_serializer_valid:
+                old_member_ID = member.member_ID
+                old_signature = member_list_signature(member)
                 with transaction.atomic():
                     member = member_serializer.save()
                     # activity log
                     log_request(request, "Member update success",
                                 "info", "user updated a member successfully")
-                    # cache delete
-                    delete_members_cache.delay()
+                    # cache delete, list pages only need a full purge when
+                    # the member may have moved between filtered pages
+                    invalidate_member_cache_on_commit(old_member_ID)
+                    if member_list_signature(member) != old_signature:
+                        invalidate_member_list_cache_on_commit()
 
                     return Response({
                         'code': 200,
@@ -198,7 +210,8 @@ class MemberView(APIView):
                 log_request(request, "Member delete success", "info",
                             "user tried to delete a member and succeeded")
                 # cache delete
-                delete_members_cache.delay()
+                invalidate_member_cache_on_commit(member_ID)
+                invalidate_member_list_cache_on_commit()
                 return Response({
                     "code": 204,
                     'message': "member deleted",
@@ -238,8 +251,8 @@ class MemberView(APIView):
    
     def get(self, request, member_id):
         try:
-            cache_key = f"specific_member::{member_id}"
-            cached_response = cache.get(cache_key)
+            cache_key = build_cache_key(MEMBER_DETAIL_NAMESPACE, member_id)
+            cached_response = get_tagged_cache(cache_key)
             if cached_response:
                 return Response(cached_response, status=200)
 
@@ -279,9 +292,9 @@ class MemberView(APIView):
             special_days = member.special_days
 
             if request.GET.get("download_excel"):
-                return self.download_excel_file_for_single_member(member, contact_numbers, emails, addresses, spouse, descendant, emergency, companion, certificate, documents, jobs, special_days)
+                return self.download_excel_file_for_single_member(member)
             if request.GET.get("download_pdf"):
-                return self.download_pdf_file_for_single_member(member, contact_numbers, emails, addresses, spouse, descendant, emergency, companion, certificate, documents, jobs, special_days)
+                return self.download_pdf_file_for_single_member(member)
             # pass the data to the serializers
             member_serializer = serializers.MemberSerializerForViewSingleMember(
                 member)
@@ -332,7 +345,7 @@ class MemberView(APIView):
                 'data': data
             }, status=status.HTTP_200_OK)
             # cache response
-            cache.set(cache_key, final_response.data, 60*30)
+            set_tagged_cache(cache_key, final_response.data, [member_id])
             return final_response
 
         except Member.DoesNotExist:
@@ -361,98 +374,19 @@ class MemberView(APIView):
                 }
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    def remove_time_conflicts_from_data(self, df):
-        return df.apply(
-            lambda col: col.dt.tz_localize(None) if pd.api.types.is_datetime64_any_dtype(
-                col) and getattr(col.dtype, 'tz', None) else col
-        )
-
-    def write_to_excel_file(self, data, writer, sheet_name):
-        df = pd.DataFrame(data)
-        df = self.remove_time_conflicts_from_data(df)
-        df.to_excel(writer, index=False, sheet_name=sheet_name)
-
-    def download_excel_file_for_single_member(self, member, contact_numbers, emails, addresses, spouse, descendant, emergency, companion, certificate, documents, jobs, special_days):
-        member_dict = {
-            "id": member.id,
-            "member_ID": member.member_ID,
-            "first_name": member.first_name,
-            "last_name": member.last_name,
-            "date_of_birth": member.date_of_birth,
-            "batch_number": member.batch_number,
-            "anniversary_date": member.anniversary_date,
-            "profile_photo": member.profile_photo.url if member.profile_photo else "",
-            "blood_group": member.blood_group,
-            "nationality": member.nationality,
-            "status": member.status,
-            "is_active": member.is_active,
-            "created_at": member.created_at,
-            "updated_at": member.updated_at,
-            "gender": member.gender.name,
-            "membership_type": member.membership_type.name,
-            "institute_name": member.institute_name.name,
-            "membership_status": member.membership_status.name,
-            "marital_status": member.marital_status.name,
-        }
-        contact_data = list(contact_numbers.values(
-        ).all())
-        email_data = list(emails.values().all())
-        address_data = list(addresses.values().all())
-        spouse_data = list(spouse.values().all())
-        descendants_data = list(descendant.values().all())
-        emergency_data = list(emergency.values().all())
-        companion_data = list(companion.values().all())
-        certificate_data = list(certificate.values().all())
-        documents_data = list(documents.values().all())
-        jobs_data = list(jobs.values().all())
-        special_days_data = list(special_days.values().all())
-
-        # Create Excel file in memory
+    def download_excel_file_for_single_member(self, member):
         excel_buffer = BytesIO()
-        writer = pd.ExcelWriter(excel_buffer, engine="xlsxwriter")
-
-        # Create "Member Info" sheet (one row DataFrame)
-        df_member = pd.DataFrame([member_dict])
-        df_member = self.remove_time_conflicts_from_data(df_member)
-        df_member.to_excel(writer, index=False, sheet_name="Member Info")
-
-        self.write_to_excel_file(contact_data, writer, "contact numbers")
-        self.write_to_excel_file(email_data, writer, "email addresses")
-        self.write_to_excel_file(address_data, writer, "addresses")
-        self.write_to_excel_file(descendants_data, writer, "descendants")
-        self.write_to_excel_file(spouse_data, writer, "spouse")
-        self.write_to_excel_file(emergency_data, writer, "emergency contact")
-        self.write_to_excel_file(companion_data, writer, "companion")
-        self.write_to_excel_file(certificate_data, writer, "certificate")
-        self.write_to_excel_file(documents_data, writer, "documents")
-        self.write_to_excel_file(jobs_data, writer, "jobs")
-        self.write_to_excel_file(special_days_data, writer, "special days")
-
-        writer.close()
-
-        # Create HTTP response with Excel file
+        render_member_excel(collect_member_report_data(member), excel_buffer)
         response = HttpResponse(
             excel_buffer.getvalue(),
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            content_type=XLSX_CONTENT_TYPE
         )
         response["Content-Disposition"] = f'attachment; filename="member_{member.member_ID}_details.xlsx"'
         return response
 
-    def download_pdf_file_for_single_member(self, member, contact_numbers, emails, addresses, spouse, descendant, emergency, companion, certificate, documents, jobs, special_days):
-        # TODO: add all context and update the html to pdf file.
-        context = {
-            "member": member,
-            "emails": emails.all(),
-            "contacts": contact_numbers.all(),
-        }
-        # Render HTML template with context
-        html_string = render(self.request, "member_pdf.html",
-                             context).content.decode("utf-8")
-        # Convert HTML to PDF
+    def download_pdf_file_for_single_member(self, member):
         pdf_buffer = BytesIO()
-        pisa.CreatePDF(StringIO(html_string), dest=pdf_buffer)
-
-        # Return PDF as response
+        render_member_pdf(member, pdf_buffer)
         response = HttpResponse(pdf_buffer.getvalue(),
                                 content_type="application/pdf")
         response["Content-Disposition"] = f"attachment; filename=member_{member.member_ID}.pdf"
@@ -466,8 +400,8 @@ class MemberListView(APIView):
         try:
             query_items = sorted(request.query_params.items())
             query_string = urlencode(query_items) if query_items else "default"
-            cache_key = f"members_list::{query_string}"
-            cached_response = cache.get(cache_key)
+            cache_key = build_cache_key(MEMBER_LIST_NAMESPACE, query_string)
+            cached_response = get_tagged_cache(cache_key)
             if cached_response:
                 return Response(cached_response, status=200)
 
@@ -492,6 +426,8 @@ class MemberListView(APIView):
                 # Check if "download_excel" is in query params
             if request.GET.get("download_excel"):
                 return self.export_to_excel(queryset)
+            if request.GET.get("download_csv"):
+                return self.export_to_csv(queryset)
 
             paginator = CustomPageNumberPagination()
             paginated_queryset = paginator.paginate_queryset(
@@ -511,7 +447,8 @@ class MemberListView(APIView):
                 "message": "View all members",
                 "data": serializer.data
             }, 200)
-            cache.set(cache_key, final_response.data, 60*30)
+            set_tagged_cache(cache_key, final_response.data, [
+                             member["member_ID"] for member in serializer.data])
             return final_response
 
         except Exception as server_error:
@@ -529,38 +466,12 @@ class MemberListView(APIView):
             })
 
     def export_to_excel(self, queryset):
-        """Generate Excel file and return as response"""
-        # Convert queryset to list of dicts
-        data = list(queryset.values(
-            "member_ID", "first_name", "last_name", "gender__name",
-            "date_of_birth", "batch_number", "anniversary_date",
-            "profile_photo", "blood_group", "nationality",
-            "membership_type__name", "institute_name__name",
-            "membership_status__name", "marital_status__name"
-        ))
-
-        # Rename keys to match expected headers
-        df = pd.DataFrame(data)
-        df.rename(columns={
-            "gender__name": "gender",
-            "membership_type__name": "membership_type",
-            "institute_name__name": "institute_name",
-            "membership_status__name": "membership_status",
-            "marital_status__name": "marital_status"
-        }, inplace=True)
-        # Create Excel file in memory
-        excel_buffer = BytesIO()
-        writer = pd.ExcelWriter(excel_buffer, engine="xlsxwriter")
-        df.to_excel(writer, index=False, sheet_name="Members")
-        writer.close()
+        """Stream the filtered member list as an Excel file"""
+        return export_members_xlsx(queryset)
 
-        # Return as downloadable response
-        response = HttpResponse(
-            excel_buffer.getvalue(),
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-        response["Content-Disposition"] = 'attachment; filename="members.xlsx"'
-        return response
+    def export_to_csv(self, queryset):
+        """Stream the filtered member list as a CSV file"""
+        return stream_members_csv(queryset)
 
 
 class MemberIdView(APIView):
@@ -632,7 +543,7 @@ class MemberContactNumberView(APIView):
                 log_request(request, "Member contact number added successfully",
                             "info", "user tried to add member contact number and succeeded")
 
-                delete_members_specific_cache.delay(member_ID)
+                invalidate_member_cache_on_commit(member_ID)
                 return Response({
                     "code": 201,
                     "message": "Member contact number has been created successfully",
@@ -674,7 +585,7 @@ class MemberContactNumberView(APIView):
                 # activity log
                 log_request(request, "Member contact number updated successfully",
                             "info", "user tried to update member contact number and succeeded")
-                delete_members_specific_cache.delay(member_ID)
+                invalidate_member_cache_on_commit(member_ID)
                 return Response({
                     "code": 200,
                     "message": "Member contact number has been updated successfully",
@@ -731,7 +642,7 @@ class MemberContactNumberView(APIView):
                 # activity log
                 log_request(request, "Member contact number deleted successfully",
                             "info", "user tried to delete member contact number and succeeded")
-                delete_members_specific_cache.delay(member_ID)
+                invalidate_member_cache_on_commit(member_ID)
                 return Response({
                     "code": 200,
                     "message": "Member contact number has been deleted successfully",
@@ -798,7 +709,7 @@ class MemberEmailAddressView(APIView):
                 # activity log
                 log_request(request, "Member email address added successfully",
                             "info", "user tried to add member email address and succeeded")
-                delete_members_specific_cache.delay(member_ID)
+                invalidate_member_cache_on_commit(member_ID)
                 return Response({
                     "code": 201,
                     "message": "Member Email address has been created successfully",
@@ -847,7 +758,7 @@ class MemberEmailAddressView(APIView):
                 # activity log
                 log_request(request, "Member email address updated successfully",
                             "info", "user tried to update member email address and succeeded")
-                delete_members_specific_cache.delay(member_ID)
+                invalidate_member_cache_on_commit(member_ID)
                 return Response({
                     "code": 200,
                     "message": "Member Email address has been updated successfully",
@@ -905,7 +816,7 @@ class MemberEmailAddressView(APIView):
                 # activity log
                 log_request(request, "Member email address deleted successfully",
                             "info", "user tried to delete member email address and succeeded")
-                delete_members_specific_cache.delay(member_ID)
+                invalidate_member_cache_on_commit(member_ID)
                 return Response({
                     "code": 200,
                     "message": "Member Email address has been deleted successfully",
@@ -971,7 +882,7 @@ class MemberAddressView(APIView):
                 log_request(request, "Member address added successfully",
                             "info", "user tried to add member address and succeeded")
 
-                delete_members_specific_cache.delay(member_ID)
+                invalidate_member_cache_on_commit(member_ID)
                 return Response({
                     "code": 201,
                     "message": "Member address has been created successfully",
@@ -1013,7 +924,7 @@ class MemberAddressView(APIView):
                 # activity log
                 log_request(request, "Member address updated successfully",
                             "info", "user tried to update member address and succeeded")
-                delete_members_specific_cache.delay(member_ID)
+                invalidate_member_cache_on_commit(member_ID)
                 return Response({
                     "code": 200,
                     "message": "Member address has been updated successfully",
@@ -1071,7 +982,7 @@ class MemberAddressView(APIView):
                 # activity log
                 log_request(request, "Member address deleted successfully",
                             "info", "user tried to delete member address and succeeded")
-                delete_members_specific_cache.delay(member_ID)
+                invalidate_member_cache_on_commit(member_ID)
                 return Response({
                     "code": 200,
                     "message": "Member address has been deleted successfully",
@@ -1138,7 +1049,7 @@ class MemberSpouseView(APIView):
                 # activity log
                 log_request(request, "Member spouse added successfully",
                             "info", "user tried to add member spouse and succeeded")
-                delete_members_specific_cache.delay(member_ID)
+                invalidate_member_cache_on_commit(member_ID)
                 return Response({
                     "code": 201,
                     "message": "Member address has been created successfully",
@@ -1208,7 +1119,7 @@ class MemberSpouseView(APIView):
                         # activity log
                         log_request(request, "Member spouse updated successfully",
                                     "info", "user tried to update member spouse and succeeded")
-                        delete_members_specific_cache.delay(member_ID)
+                        invalidate_member_cache_on_commit(member_ID)
                         return Response({
                             "code": 200,
                             "message": "Member Spouse has been updated successfully",
@@ -1225,7 +1136,7 @@ class MemberSpouseView(APIView):
                         log_request(request, "Member spouse updated successfully",
                                     "info", "user tried to update member spouse and succeeded")
 
-                        delete_members_specific_cache.delay(member_ID)
+                        invalidate_member_cache_on_commit(member_ID)
                         return Response({
                             "code": 201,
                             "message": "Member spouse has been created successfully",
@@ -1287,7 +1198,7 @@ class MemberSpouseDeleteView(APIView):
             # activity log
             log_request(request, "Member spouse deleted successfully",
                         "info", "user tried to delete member spouse and succeeded")
-            delete_members_specific_cache.delay(member_ID)
+            invalidate_member_cache_on_commit(member_ID)
             return Response({
                 "code": 200,
                 "status": "success",
@@ -1331,7 +1242,7 @@ class MemberDescendsView(APIView):
                 # activity log
                 log_request(request, "Member descendants added successfully",
                             "info", "user tried to add member descendants and succeeded")
-                delete_members_specific_cache.delay(member_ID)
+                invalidate_member_cache_on_commit(member_ID)
                 return Response({
                     "code": 201,
                     "message": "Member Descendant has been created successfully",
@@ -1404,7 +1315,7 @@ class MemberDescendsView(APIView):
                         # activity log
                         log_request(request, "Member descendants updated successfully",
                                     "info", "user tried to update member descendants and succeeded")
-                        delete_members_specific_cache.delay(member_ID)
+                        invalidate_member_cache_on_commit(member_ID)
                         return Response({
                             "code": 200,
                             "message": "Member Descendant has been updated successfully",
@@ -1419,7 +1330,7 @@ class MemberDescendsView(APIView):
                         # activity log
                         log_request(request, "Member descendants created successfully",
                                     "info", "user tried to create member descendants and succeeded")
-                        delete_members_specific_cache.delay(member_ID)
+                        invalidate_member_cache_on_commit(member_ID)
                         return Response({
                             "code": 201,
                             "message": "Member Descendant has been created successfully",
@@ -1482,7 +1393,7 @@ class MemberDescendantsDeleteView(APIView):
             # activity log
             log_request(request, "Member descendant deleted successfully",
                         "info", "user tried to delete member descendant and succeeded")
-            delete_members_specific_cache.delay(member_ID)
+            invalidate_member_cache_on_commit(member_ID)
             return Response({
                 "code": 200,
                 "status": "success",
@@ -1527,7 +1438,7 @@ class MemberJobView(APIView):
                             "info", "user tried to create member job and succeeded")
 
                 # delete cache for specific view member details
-                delete_members_specific_cache.delay(member_ID)
+                invalidate_member_cache_on_commit(member_ID)
                 return Response({
                     "code": 201,
                     "message": "Member job has been created successfully",
@@ -1572,7 +1483,7 @@ class MemberJobView(APIView):
                 log_request(request, "Member job updated successfully",
                             "info", "user tried to update member job and succeeded")
                 # delete cache for specific view member details
-                delete_members_specific_cache.delay(member_ID)
+                invalidate_member_cache_on_commit(member_ID)
                 return Response({
                     "code": 200,
                     "message": "Member job has been updated successfully",
@@ -1630,7 +1541,7 @@ class MemberJobView(APIView):
                 log_request(request, "Member job deleted successfully",
                             "info", "user tried to delete member job and succeeded")
                 # delete cache for specific view member details
-                delete_members_specific_cache.delay(member_ID)
+                invalidate_member_cache_on_commit(member_ID)
                 return Response({
                     "code": 200,
                     "message": "Member job has been deleted successfully",
@@ -1699,7 +1610,7 @@ class MemberEmergencyContactView(APIView):
                 log_request(request, "Member emergency contact created successfully",
                             "info", "user tried to create member emergency contact and succeeded")
                 # delete cache for specific view member details
-                delete_members_specific_cache.delay(member_ID)
+                invalidate_member_cache_on_commit(member_ID)
                 return Response({
                     "code": 201,
                     "message": "Member Emergency contact has been created successfully",
@@ -1745,7 +1656,7 @@ class MemberEmergencyContactView(APIView):
                 log_request(request, "Member emergency contact updated successfully",
                             "info", "user tried to update an emergency contact and succeeded")
                 # delete cache for specific view member details
-                delete_members_specific_cache.delay(member_ID)
+                invalidate_member_cache_on_commit(member_ID)
                 return Response({
                     "code": 200,
                     "message": "Member Emergency contact has been updated successfully",
@@ -1805,7 +1716,7 @@ class MemberEmergencyContactView(APIView):
                 log_request(request, "Member emergency contact deleted successfully",
                             "info", "user tried to delete an emergency contact and succeeded")
                 # delete cache for specific view member details
-                delete_members_specific_cache.delay(member_ID)
+                invalidate_member_cache_on_commit(member_ID)
                 return Response({
                     "code": 200,
                     "message": "Member Emergency contact has been deleted successfully",
@@ -1878,7 +1789,7 @@ class MemberCompanionView(APIView):
                 log_request(request, "Member companion created successfully",
                             "info", "user tried to create member companion and succeeded")
                 # delete cache for specific view member details
-                delete_members_specific_cache.delay(member_ID)
+                invalidate_member_cache_on_commit(member_ID)
                 return Response({
                     "code": 201,
                     "message": "Member Companion has been created successfully",
@@ -1936,7 +1847,7 @@ class MemberCompanionView(APIView):
                         log_request(request, "Member companion updated successfully",
                                     "info", "user tried to update member companion and succeeded")
                         # delete cache for specific view member details
-                        delete_members_specific_cache.delay(member_ID)
+                        invalidate_member_cache_on_commit(member_ID)
                         return Response({
                             "code": 200,
                             "message": "Member companion has been updated successfully",
@@ -1951,7 +1862,7 @@ class MemberCompanionView(APIView):
                         # activity log
                         log_request(request, "Member companion created successfully",
                                     "info", "user tried to create member companion and succeeded")
-                        delete_members_specific_cache.delay(member_ID)
+                        invalidate_member_cache_on_commit(member_ID)
                         return Response({
                             "code": 201,
                             "message": "Member companion has been created successfully",
@@ -2011,7 +1922,7 @@ class MemberCompanionDeleteView(APIView):
             # activity log
             log_request(request, "Member companion deleted successfully",
                         "info", "A user deleted a member companion successfully.")
-            delete_members_specific_cache.delay(member_ID)
+            invalidate_member_cache_on_commit(member_ID)
             return Response({
                 "code": 200,
                 "status": "success",
@@ -2053,7 +1964,7 @@ class MemberDocumentView(APIView):
                     instance = serializer.save()
 
                 # delete cache for specific view member details
-                delete_members_specific_cache.delay(member_ID)
+                invalidate_member_cache_on_commit(member_ID)
                 # activity log
                 log_request(request, "Member documents created successfully",
                             "info", "user tried to create member documents and succeeded")
@@ -2144,7 +2055,7 @@ class MemberDocumentView(APIView):
                         member_ID = serializer.validated_data.get("member_ID")
                         instance = serializer.save(instance=instance)
                         # delete cache for specific view member details
-                        delete_members_specific_cache.delay(member_ID)
+                        invalidate_member_cache_on_commit(member_ID)
                         # activity log
                         log_request(request, "Member documents updated successfully",
                                     "info", "user tried to update member documents and succeeded")
@@ -2162,7 +2073,7 @@ class MemberDocumentView(APIView):
                         # activity log
                         log_request(request, "Member documents created successfully",
                                     "info", "user tried to create member documents and succeeded")
-                        delete_members_specific_cache.delay(member_ID)
+                        invalidate_member_cache_on_commit(member_ID)
                         return Response({
                             "code": 201,
                             "message": "Member Documents has been created successfully",
@@ -2222,7 +2133,7 @@ class MemberDocumentDeleteView(APIView):
             log_request(request, "Member document deleted", "info",
                             "A user has successfully deleted a member document.")
             # delete cache for specific view member details
-            delete_members_specific_cache.delay(member_ID)
+            invalidate_member_cache_on_commit(member_ID)
             return Response({
                 "code": 200,
                 "status": "success",
@@ -2304,7 +2215,8 @@ class MemberHistoryView(APIView):
             query_string = urlencode(query_items) if query_items else "default"
             # convert dictionary for get query params
             query_dict = dict(query_items)
-            cache_key = f"all_member_history::{query_string}"
+            cache_key = build_cache_key(
+                MEMBER_HISTORY_NAMESPACE, query_string)
             cached_response = cache.get(cache_key)
             if cached_response:
                 return Response(cached_response, status=200)
@@ -2371,7 +2283,8 @@ class MemberSingleHistoryView(APIView):
 
     def get(self, request, member_ID):
         try:
-            cache_key = f"specific_member_history::{member_ID}"
+            cache_key = build_cache_key(
+                MEMBER_SINGLE_HISTORY_NAMESPACE, member_ID)
             cached_response = cache.get(cache_key)
             if cached_response:
                 return Response(cached_response, status=200)
@@ -2446,7 +2359,7 @@ class MemberSpecialDayView(APIView):
                 log_request(request, "Creating new member special days", "info",
                             "A user has successfully created new member special days.")
                 # delete cache for specific view member details
-                delete_members_specific_cache.delay(member_ID)
+                invalidate_member_cache_on_commit(member_ID)
                 return Response({
                     "code": 201,
                     "status": "success",
@@ -2495,7 +2408,7 @@ class MemberSpecialDayView(APIView):
                 log_request(request, "Updating member special days", "info",
                             "A user has successfully updated member special days.")
                 # delete cache for specific view member details
-                delete_members_specific_cache.delay(member_ID)
+                invalidate_member_cache_on_commit(member_ID)
                 return Response({
                     "code": 200,
                     "message": "Member special day has been updated successfully",
@@ -2507,7 +2420,7 @@ class MemberSpecialDayView(APIView):
                 log_request(request, "Updating member special days failed", "error",
                             "A user tried to update member special days but made an invalid request")
                 # delete cache for specific view member details
-                delete_members_specific_cache.delay(member.member_ID)
+                invalidate_member_cache_on_commit(member.member_ID)
                 return Response({
                     "code": 400,
                     "status": "failed",
@@ -2555,7 +2468,7 @@ class MemberSpecialDayView(APIView):
                 log_request(request, "deleted member special days", "info",
                             "A user has successfully deleted member special days.")
                 # delete cache for specific view member details
-                delete_members_specific_cache.delay(member_ID)
+                invalidate_member_cache_on_commit(member_ID)
                 return Response({
                     "code": 200,
                     "message": "Member special day has been deleted successfully",
@@ -2566,7 +2479,7 @@ class MemberSpecialDayView(APIView):
                 log_request(request, "Deleting member special days failed", "error",
                             "A user tried to delete member special days but made an invalid request")
                 # delete cache for specific view member details
-                delete_members_specific_cache.delay(member.member_ID)
+                invalidate_member_cache_on_commit(member.member_ID)
                 return Response({
                     "code": 400,
                     "status": "failed",
@@ -2624,7 +2537,7 @@ class MemberCertificateView(APIView):
                 log_request(request, "Creating new member certificates", "info",
                             "A user has successfully created new member certificates.")
                 # delete cache for specific  member details
-                delete_members_specific_cache.delay(member_ID)
+                invalidate_member_cache_on_commit(member_ID)
                 return Response({
                     "code": 201,
                     "status": "success",
@@ -2680,7 +2593,7 @@ class MemberCertificateView(APIView):
                         # activity log
                         log_request(request, "Updating member certificates", "info",
                                     "A user has successfully updated member certificates.")
-                        delete_members_specific_cache.delay(member_ID)
+                        invalidate_member_cache_on_commit(member_ID)
                         return Response({
                             "code": 200,
                             "message": "Member Certificate has been updated successfully",
@@ -2695,7 +2608,7 @@ class MemberCertificateView(APIView):
                         # activity log
                         log_request(request, "Creating new member certificates", "info",
                                     "A user has successfully created new member certificates.")
-                        delete_members_specific_cache.delay(member_ID)
+                        invalidate_member_cache_on_commit(member_ID)
                         return Response({
                             "code": 201,
                             "message": "Member Certificate has been created successfully",
@@ -2756,7 +2669,7 @@ class MemberCertificateDeleteView(APIView):
             log_request(request, "Member certificate deleted", "info",
                         "A user has successfully deleted a member certificate.")
             # delete cache for specific view member details
-            delete_members_specific_cache.delay(member_ID)
+            invalidate_member_cache_on_commit(member_ID)
             return Response({
                 "code": 200,
                 "status": "success",
@@ -3005,3 +2918,153 @@ class MemberHardSingleDeleteView(APIView):
                 "message": "Something went wrong",
                 "errors": {"server_error": [str(e)]}
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class MemberReportView(APIView):
+    permission_classes = [IsAuthenticated, MemberManagementPermission]
+
+    def post(self, request):
+        try:
+            serializer = serializers.MemberReportRequestSerializer(
+                data=request.data)
+            if not serializer.is_valid():
+                log_request(request, "Member report request failed", "error",
+                            "user tried to request a member report but made an invalid request")
+                return Response({
+                    "code": 400,
+                    "status": "failed",
+                    "message": "Invalid request",
+                    "errors": serializer.errors
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            report_type = serializer.validated_data["report_type"]
+            if report_type in ("member_excel", "member_pdf"):
+                parameters = {
+                    "member_ID": serializer.validated_data["member_ID"]}
+            else:
+                parameters = {
+                    "filters": serializer.validated_data["filters"]}
+            try:
+                job, reused = request_member_report(
+                    report_type, parameters, request.user)
+            except MemberReportError as e:
+                log_request(request, "Member report request failed", "error",
+                            "user tried to request a member report but made an invalid request")
+                return Response({
+                    "code": 400,
+                    "status": "failed",
+                    "message": e.message,
+                    "errors": e.errors
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            log_request(request, "Member report requested", "info",
+                        "user requested a member report")
+            response_code = 200 if job.status == "completed" else 202
+            return Response({
+                "code": response_code,
+                "status": "success",
+                "message": "Report is ready" if job.status == "completed" else "Report queued for generation",
+                "data": {
+                    **serializers.MemberReportJobSerializer(job).data,
+                    "reused": reused,
+                }
+            }, status=response_code)
+        except Exception as server_error:
+            logger.exception(str(server_error))
+            log_request(request, "Member report request failed", "error",
+                        "user tried to request a member report but made an invalid request")
+            return Response({
+                "code": 500,
+                "status": "failed",
+                "message": "Something went wrong",
+                "errors": {
+                    "server_error": [str(server_error)]
+                }
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class MemberReportSpecificView(APIView):
+    permission_classes = [IsAuthenticated, MemberManagementPermission]
+
+    def get(self, request, id):
+        try:
+            job = get_object_or_404(MemberReportJob, id=id)
+            serializer = serializers.MemberReportJobSerializer(job)
+            return Response({
+                "code": 200,
+                "status": "success",
+                "message": f"View member report {id}",
+                "data": serializer.data
+            }, status=status.HTTP_200_OK)
+        except Http404:
+            return Response({
+                "code": 404,
+                "status": "failed",
+                "message": "Report not found",
+                "errors": {
+                    "id": ["Report not found by this id"]
+                }
+            }, status=status.HTTP_404_NOT_FOUND)
+        except Exception as server_error:
+            logger.exception(str(server_error))
+            return Response({
+                "code": 500,
+                "status": "failed",
+                "message": "Something went wrong",
+                "errors": {
+                    "server_error": [str(server_error)]
+                }
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class MemberReportDownloadView(APIView):
+    permission_classes = [IsAuthenticated, MemberManagementPermission]
+
+    def get(self, request, id):
+        try:
+            job = get_object_or_404(MemberReportJob, id=id)
+            if job.status != "completed" or not is_report_file_available(job):
+                return Response({
+                    "code": 409,
+                    "status": "failed",
+                    "message": "Report is not ready",
+                    "errors": {
+                        "status": [f"Report is {job.status}"]
+                    }
+                }, status=status.HTTP_409_CONFLICT)
+
+            # the file never changes for a hash, clients may keep their copy
+            etag = f'"{job.content_hash}"'
+            if request.headers.get("If-None-Match") == etag:
+                response = HttpResponseNotModified()
+            else:
+                log_request(request, "Member report downloaded", "info",
+                            "user downloaded a member report")
+                response = FileResponse(
+                    job.file.open("rb"),
+                    as_attachment=True,
+                    filename=job.filename,
+                    content_type=MEMBER_REPORT_CONTENT_TYPES[job.report_type]
+                )
+            response["ETag"] = etag
+            response["Cache-Control"] = "private, max-age=3600"
+            return response
+        except Http404:
+            return Response({
+                "code": 404,
+                "status": "failed",
+                "message": "Report not found",
+                "errors": {
+                    "id": ["Report not found by this id"]
+                }
+            }, status=status.HTTP_404_NOT_FOUND)
+        except Exception as server_error:
+            logger.exception(str(server_error))
+            return Response({
+                "code": 500,
+                "status": "failed",
+                "message": "Something went wrong",
+                "errors": {
+                    "server_error": [str(server_error)]
+                }
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
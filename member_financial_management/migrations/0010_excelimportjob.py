@@ -0,0 +1,45 @@
+# Generated by Django 5.1.5 on 2026-10-18 08:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('member_financial_management', '0009_alter_invoiceitem_restaurant_items'),
+        ('restaurant', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExcelImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('import_type', models.CharField(choices=[('lounge', 'lounge'), ('others', 'others'), ('restaurant', 'restaurant')], max_length=50)),
+                ('excel_file', models.FileField(upload_to='excel_imports/')),
+                ('status', models.CharField(choices=[('pending', 'pending'), ('processing', 'processing'), ('completed', 'completed'), ('failed', 'failed')], default='pending', max_length=30)),
+                ('confirm_reupload', models.BooleanField(default=False)),
+                ('total_rows', models.PositiveIntegerField(default=0)),
+                ('processed_rows', models.PositiveIntegerField(default=0)),
+                ('failed_rows', models.PositiveIntegerField(default=0)),
+                ('failures', models.JSONField(blank=True, default=list)),
+                ('summary', models.JSONField(blank=True, default=dict)),
+                ('errors', models.JSONField(blank=True, default=dict)),
+                ('started_at', models.DateTimeField(blank=True, default=None, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, default=None, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='excel_import_job_created_by', to=settings.AUTH_USER_MODEL)),
+                ('income_particular', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='excel_import_job_particular', to='member_financial_management.incomeparticular')),
+                ('received_from', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='excel_import_job_received_from', to='member_financial_management.incomereceivingoption')),
+                ('restaurant', models.ForeignKey(blank=True, default=None, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='excel_import_job_restaurant', to='restaurant.restaurant')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
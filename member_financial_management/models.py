@@ -334,6 +334,51 @@ class MemberDue(FinancialBaseModel):
         return f"{self.member.member_ID}"
 
 
+class ExcelImportJob(FinancialBaseModel):
+    IMPORT_TYPE_CHOICES = [
+        ('lounge', 'lounge'),
+        ('others', 'others'),
+        ('restaurant', 'restaurant'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'pending'),
+        ('processing', 'processing'),
+        ('completed', 'completed'),
+        ('failed', 'failed'),
+    ]
+    import_type = models.CharField(max_length=50, choices=IMPORT_TYPE_CHOICES)
+    excel_file = models.FileField(upload_to="excel_imports/")
+    status = models.CharField(
+        max_length=30, choices=STATUS_CHOICES, default="pending")
+    confirm_reupload = models.BooleanField(default=False)
+    total_rows = models.PositiveIntegerField(default=0)
+    processed_rows = models.PositiveIntegerField(default=0)
+    failed_rows = models.PositiveIntegerField(default=0)
+    # failed rows in the same shape the upload views return them
+    failures = models.JSONField(default=list, blank=True)
+    summary = models.JSONField(default=dict, blank=True)
+    errors = models.JSONField(default=dict, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True, default=None)
+    finished_at = models.DateTimeField(null=True, blank=True, default=None)
+
+    # relations
+    income_particular = models.ForeignKey(
+        IncomeParticular, on_delete=models.PROTECT, related_name="excel_import_job_particular")
+    received_from = models.ForeignKey(
+        IncomeReceivingOption, on_delete=models.PROTECT, related_name="excel_import_job_received_from")
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.PROTECT,
+                                   related_name="excel_import_job_restaurant", blank=True, null=True, default=None)
+    created_by = models.ForeignKey(
+        User, on_delete=models.PROTECT, related_name="excel_import_job_created_by", blank=True, null=True)
+
+    # managers
+    objects = models.Manager()
+    active_objects = ActiveManager()
+
+    def __str__(self):
+        return f"{self.import_type} import {self.id} ({self.status})"
+
+
 @receiver(post_save, sender=Member)
 def member_account_creation_signal(sender, instance, created, **kwargs):
     if created:
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Invoice, PaymentMethod, IncomeParticular, IncomeReceivingOption, InvoiceItem, Income, Sale, Transaction, Payment, Due, MemberDue, MemberAccount
+from .models import Invoice, PaymentMethod, IncomeParticular, IncomeReceivingOption, InvoiceItem, Income, Sale, Transaction, Payment, Due, MemberDue, MemberAccount, ExcelImportJob
 from restaurant.models import Restaurant
 from event.models import Event, EventTicket
 from product.models import Product
@@ -422,6 +422,7 @@ class LoungeUploadExcelSerializer(serializers.Serializer):
     received_from = serializers.PrimaryKeyRelatedField(
         queryset=IncomeReceivingOption.active_objects.all())
     confirm_reupload = serializers.BooleanField()
+    run_in_background = serializers.BooleanField(required=False, default=False)
 
     def validate_excel_file(self, value):
         valid_extensions = ['.xls', '.xlsx']
@@ -439,6 +440,7 @@ class OthersUploadExcelSerializer(serializers.Serializer):
     received_from = serializers.PrimaryKeyRelatedField(
         queryset=IncomeReceivingOption.active_objects.all())
     confirm_reupload = serializers.BooleanField()
+    run_in_background = serializers.BooleanField(required=False, default=False)
 
     def validate_excel_file(self, value):
         valid_extensions = ['.xls', '.xlsx']
@@ -463,3 +465,14 @@ class InvoiceUpdateSerializer(serializers.Serializer):
     paid_amount = serializers.DecimalField(max_digits=12, decimal_places=2)
     payment_method = serializers.PrimaryKeyRelatedField(
         queryset=PaymentMethod.active_objects.all())
+
+
+class ExcelImportJobSerializer(DynamicFieldsModelSerializer):
+    income_particular = serializers.CharField()
+    received_from = serializers.CharField()
+    restaurant = serializers.CharField()
+    created_by = serializers.CharField()
+
+    class Meta:
+        model = ExcelImportJob
+        fields = "__all__"
@@ -0,0 +1,240 @@
+# member_financial_management/services/excel_imports/bulk_import.py
+
+from datetime import datetime
+from django.db import transaction
+from member.models import Member
+from ...models import (
+    Invoice, InvoiceType, Transaction, Payment, PaymentMethod, Sale, SaleType,
+    Income, IncomeReceivingType, Due, MemberDue
+)
+from ...utils.functions import generate_unique_invoice_numbers, generate_unique_sale_numbers
+
+BULK_CREATE_BATCH_SIZE = 500
+
+
+class ExcelSalesImportService:
+    """
+    Import cleaned excel sale records (lounge, others and restaurant sheets).
+
+    Every record is a dict with member_ID, cash_amount, card_amount,
+    due_amount, total and an optional sales_code. Members, existing sale
+    codes and new invoice/sale numbers are resolved with one query each and
+    all rows are written with bulk_create in dependency order inside one
+    transaction.
+    """
+
+    def __init__(self, user, invoice_type_name, sale_type_name, income_particular,
+                 received_from, start_date, restaurant=None, excel_upload_date=None,
+                 use_sales_code=False):
+        self.user = user
+        self.invoice_type_name = invoice_type_name
+        self.sale_type_name = sale_type_name
+        self.income_particular = income_particular
+        self.received_from = received_from
+        self.start_date = start_date
+        self.restaurant = restaurant
+        self.excel_upload_date = excel_upload_date
+        # restaurant sheets carry their own sale number in sales_code
+        self.use_sales_code = use_sales_code
+
+    def _get_lookups(self):
+        self.invoice_type, _ = InvoiceType.objects.get_or_create(
+            name=self.invoice_type_name)
+        self.cash_payment_method, _ = PaymentMethod.objects.get_or_create(
+            name="cash")
+        self.card_payment_method, _ = PaymentMethod.objects.get_or_create(
+            name="card")
+        self.both_payment_method, _ = PaymentMethod.objects.get_or_create(
+            name="both")
+        self.sale_type, _ = SaleType.objects.get_or_create(
+            name=self.sale_type_name)
+        self.full_income_receiving_type, _ = IncomeReceivingType.objects.get_or_create(
+            name="full")
+        self.partial_income_receiving_type, _ = IncomeReceivingType.objects.get_or_create(
+            name="partial")
+
+    def _get_payment_method(self, record):
+        if record["card_amount"] == 0 and record["cash_amount"] == 0:
+            return self.both_payment_method
+        elif record["card_amount"] != 0:
+            return self.card_payment_method
+        return self.cash_payment_method
+
+    def _failed_result(self, record, reason):
+        result = {"member": record["member_ID"]}
+        if self.use_sales_code:
+            result["sales_code"] = record["sales_code"]
+        result["status"] = "failed"
+        result["reason"] = reason
+        return result
+
+    def _success_result(self, record, member):
+        result = {"member_ID": member.member_ID}
+        if self.use_sales_code:
+            result["sales_code"] = record["sales_code"]
+        result["status"] = "success"
+        result["reason"] = "Successfully uploaded"
+        return result
+
+    def _resolve_rows(self, records):
+        """Split records into importable rows and per record results."""
+        member_IDs = {record["member_ID"]
+                      for record in records if isinstance(record["member_ID"], str)}
+        members = Member.objects.in_bulk(member_IDs, field_name="member_ID")
+
+        existing_sales_codes = set()
+        if self.use_sales_code:
+            sales_codes = {record["sales_code"] for record in records}
+            existing_sales_codes = set(Sale.objects.filter(
+                sale_number__in=sales_codes).values_list("sale_number", flat=True))
+
+        rows = []
+        results = []
+        for record in records:
+            member = members.get(record["member_ID"])
+            if member is None:
+                results.append(self._failed_result(
+                    record, "Member doesn't exist"))
+                continue
+            if self.use_sales_code:
+                if record["sales_code"] in existing_sales_codes:
+                    results.append(self._failed_result(
+                        record, "Sales code already exist"))
+                    continue
+                existing_sales_codes.add(record["sales_code"])
+            rows.append((record, member))
+            results.append(self._success_result(record, member))
+        return rows, results
+
+    def import_records(self, records):
+        with transaction.atomic():
+            self._get_lookups()
+            rows, results = self._resolve_rows(records)
+            if rows:
+                self._create_rows(rows)
+        return results
+
+    def _create_rows(self, rows):
+        invoice_numbers = generate_unique_invoice_numbers(len(rows))
+        sale_numbers = [] if self.use_sales_code else generate_unique_sale_numbers(
+            len(rows))
+        today = datetime.today()
+
+        invoices = []
+        for index, (record, member) in enumerate(rows):
+            paid_amount = record["cash_amount"] + record["card_amount"]
+            total_amount = record["total"]
+            invoices.append(Invoice(
+                invoice_number=invoice_numbers[index],
+                balance_due=record["due_amount"],
+                paid_amount=paid_amount,
+                due_date=self.start_date,
+                issue_date=today,
+                total_amount=total_amount,
+                is_full_paid=paid_amount == total_amount,
+                status="paid" if total_amount == paid_amount else "partial_paid",
+                excel_upload_date=self.excel_upload_date,
+                invoice_type=self.invoice_type,
+                generated_by=self.user,
+                member=member,
+                restaurant=self.restaurant))
+        Invoice.objects.bulk_create(
+            invoices, batch_size=BULK_CREATE_BATCH_SIZE)
+
+        payment_methods = [self._get_payment_method(record)
+                           for record, _ in rows]
+        transactions = [
+            Transaction(
+                amount=invoice.paid_amount,
+                member=member,
+                invoice=invoice,
+                payment_method=payment_method,
+                notes="This transaction was recorded from excel file."
+            )
+            for (_, member), invoice, payment_method in zip(rows, invoices, payment_methods)
+        ]
+        Transaction.objects.bulk_create(
+            transactions, batch_size=BULK_CREATE_BATCH_SIZE)
+
+        payments = [
+            Payment(
+                payment_amount=invoice.paid_amount,
+                payment_status=invoice.status,
+                notes="This payment was recorded from excel file.",
+                transaction=transaction_obj,
+                invoice=invoice,
+                member=member,
+                payment_method=payment_method,
+                processed_by=self.user
+            )
+            for (_, member), invoice, transaction_obj, payment_method
+            in zip(rows, invoices, transactions, payment_methods)
+        ]
+        Payment.objects.bulk_create(
+            payments, batch_size=BULK_CREATE_BATCH_SIZE)
+
+        sales = []
+        for index, ((record, member), invoice, payment_method) in enumerate(zip(rows, invoices, payment_methods)):
+            sales.append(Sale(
+                sale_number=record["sales_code"] if self.use_sales_code else sale_numbers[index],
+                sub_total=invoice.total_amount,
+                total_amount=invoice.total_amount,
+                payment_status=invoice.status,
+                due_date=self.start_date if record["due_amount"] == 0 else None,
+                notes="Sale created from excel file.",
+                sale_source_type=self.sale_type,
+                customer=member,
+                payment_method=payment_method,
+                invoice=invoice
+            ))
+        Sale.objects.bulk_create(sales, batch_size=BULK_CREATE_BATCH_SIZE)
+
+        incomes = [
+            Income(
+                receivable_amount=invoice.total_amount,
+                final_receivable=invoice.total_amount,
+                actual_received=invoice.paid_amount,
+                reaming_due=invoice.balance_due,
+                particular=self.income_particular,
+                received_from_type=self.received_from,
+                member=member,
+                received_by=payment_method,
+                sale=sale_obj,
+                receiving_type=self.full_income_receiving_type
+                if invoice.paid_amount == invoice.total_amount
+                else self.partial_income_receiving_type)
+            for (_, member), invoice, sale_obj, payment_method
+            in zip(rows, invoices, sales, payment_methods)
+        ]
+        Income.objects.bulk_create(incomes, batch_size=BULK_CREATE_BATCH_SIZE)
+
+        dues = []
+        for (record, member), invoice, transaction_obj, payment_obj in zip(rows, invoices, transactions, payments):
+            if record["due_amount"] > 0:  # it has due
+                dues.append(Due(
+                    original_amount=invoice.total_amount,
+                    due_amount=invoice.balance_due,
+                    paid_amount=invoice.paid_amount,
+                    due_date=self.start_date,
+                    payment_status=invoice.status,
+                    member=member,
+                    invoice=invoice,
+                    payment=payment_obj,
+                    transaction=transaction_obj,
+                ))
+        Due.objects.bulk_create(dues, batch_size=BULK_CREATE_BATCH_SIZE)
+
+        member_dues = [
+            MemberDue(
+                amount_due=due_obj.due_amount,
+                due_date=self.start_date,
+                amount_paid=due_obj.paid_amount,
+                payment_date=today,
+                notes="This due has been recorded from excel file",
+                member=due_obj.member,
+                due_reference=due_obj
+            )
+            for due_obj in dues
+        ]
+        MemberDue.objects.bulk_create(
+            member_dues, batch_size=BULK_CREATE_BATCH_SIZE)
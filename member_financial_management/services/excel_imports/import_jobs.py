@@ -0,0 +1,213 @@
+# member_financial_management/services/excel_imports/import_jobs.py
+
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from ...models import ExcelImportJob
+from .bulk_import import ExcelSalesImportService
+from .parsers import (
+    ExcelImportError, parse_member_sales_excel, parse_restaurant_sales_excel, is_previously_uploaded
+)
+import logging
+logger = logging.getLogger("myapp")
+
+EXCEL_IMPORT_CHUNK_SIZE = 500
+# an unfinished job without progress for this long lost its worker and is resumed
+EXCEL_IMPORT_JOB_LEASE = 60*30
+# unfinished jobs queued longer ago than this are given up
+EXCEL_IMPORT_JOB_EXPIRY = 60*60*6
+# a running job touches updated_at this often, also while a parse or chunk takes long
+EXCEL_IMPORT_JOB_HEARTBEAT = 60
+
+EXCEL_IMPORT_PARSERS = {
+    "lounge": parse_member_sales_excel,
+    "others": parse_member_sales_excel,
+    "restaurant": parse_restaurant_sales_excel,
+}
+
+
+def build_import_service(import_type, user, income_particular, received_from, sales_date, restaurant=None):
+    """Build the import service configured the way each upload view imports its sheet."""
+    if import_type == "restaurant":
+        return ExcelSalesImportService(
+            user=user,
+            invoice_type_name="restaurant",
+            sale_type_name="restaurant",
+            income_particular=income_particular,
+            received_from=received_from,
+            start_date=sales_date,
+            restaurant=restaurant,
+            use_sales_code=True)
+    return ExcelSalesImportService(
+        user=user,
+        invoice_type_name=import_type,
+        sale_type_name=import_type,
+        income_particular=income_particular,
+        received_from=received_from,
+        start_date=sales_date,
+        excel_upload_date=sales_date)
+
+
+def _fail_job(job, message, errors):
+    job.status = "failed"
+    job.summary = {"message": message}
+    job.errors = errors
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "summary",
+             "errors", "finished_at", "updated_at"])
+
+
+def claim_excel_import_job(job, now=None):
+    """
+    Take the job for the calling run, when it is pending or its last run
+    stopped beating for a whole lease. Returns False when the job finished
+    or another run holds it, so a job queued twice is never imported twice.
+    """
+    now = now or timezone.now()
+    claimable = Q(status="pending") | Q(
+        status="processing", updated_at__lt=now - timedelta(seconds=EXCEL_IMPORT_JOB_LEASE))
+    with transaction.atomic():
+        if not ExcelImportJob.objects.select_for_update(skip_locked=True).filter(
+                claimable, id=job.id).exists():
+            return False
+        claimed = ExcelImportJob.objects.filter(claimable, id=job.id).update(
+            status="processing", started_at=Coalesce("started_at", now), updated_at=now)
+    if claimed:
+        # the progress of an earlier run, the job may have been loaded before it
+        job.refresh_from_db()
+    return bool(claimed)
+
+
+@contextmanager
+def job_heartbeat(job_id, interval=EXCEL_IMPORT_JOB_HEARTBEAT):
+    """Touch updated_at of the job from a side thread while the block runs."""
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(interval):
+                ExcelImportJob.objects.filter(id=job_id, status="processing").update(
+                    updated_at=timezone.now())
+        except Exception as e:
+            logger.warning(f"Excel import job {job_id} heartbeat stopped: {e}")
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=beat, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_excel_import_job(job, chunk_size=EXCEL_IMPORT_CHUNK_SIZE):
+    """
+    Parse the stored sheet of an import job and import it chunk by chunk.
+    Every chunk is committed together with the job progress so clients can
+    poll it, and a job run again carries on after the rows it already stored.
+    Only the run that claimed the job imports it.
+    """
+    if not claim_excel_import_job(job):
+        return job
+    with job_heartbeat(job.id):
+        return _import_claimed_job(job, chunk_size)
+
+
+def _import_claimed_job(job, chunk_size):
+    resumed_from = job.processed_rows
+    try:
+        with job.excel_file.open("rb") as excel_file:
+            parsed = EXCEL_IMPORT_PARSERS[job.import_type](excel_file)
+    except ExcelImportError as e:
+        _fail_job(job, e.message, e.errors)
+        return job
+
+    records = parsed["records"]
+    sales_date = parsed["sales_date"]
+    # a resumed job finds its own rows, the check ran before its first chunk
+    if job.import_type != "restaurant" and not job.confirm_reupload and not resumed_from:
+        if is_previously_uploaded(records, sales_date, job.import_type):
+            _fail_job(job, "This file was previously uploaded with same data.", {
+                "excel_file": ["This file was uploaded previously with same data. If you want to reupload it make sure you have confirm_reupload  attribute set to true."]
+            })
+            return job
+
+    job.total_rows = len(records)
+    job.save(update_fields=["total_rows", "updated_at"])
+
+    importer = build_import_service(
+        job.import_type, job.created_by, job.income_particular, job.received_from,
+        sales_date, restaurant=job.restaurant)
+    results = []
+    try:
+        for start in range(resumed_from, len(records), chunk_size):
+            chunk = records[start:start + chunk_size]
+            with transaction.atomic():
+                chunk_results = importer.import_records(chunk)
+                job.processed_rows = start + len(chunk)
+                job.failures.extend(
+                    result for result in chunk_results if result["status"] == "failed")
+                job.failed_rows = len(job.failures)
+                job.save(update_fields=[
+                         "processed_rows", "failed_rows", "failures", "updated_at"])
+            results.extend(chunk_results)
+    except Exception as e:
+        logger.exception(str(e))
+        _fail_job(job, "Something went wrong", {"server_error": [str(e)]})
+        return job
+
+    job.status = "completed"
+    job.summary = {
+        "message": "Data uploaded successfully",
+        "totals": parsed["totals"],
+        "succeeded_rows": job.processed_rows - job.failed_rows,
+        "failed_rows": job.failed_rows,
+        # rows stored before a resume are counted above but not listed
+        "resumed_from_row": resumed_from,
+        "data": results,
+    }
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "summary", "finished_at", "updated_at"])
+    return job
+
+
+def sweep_stale_excel_import_jobs(now=None):
+    """
+    Fail the unfinished jobs queued before the expiry and return the ids of
+    the ones whose run stopped beating for a whole lease, their worker is gone
+    and they are to be resumed. Queuing one twice is harmless, only the first
+    run claims it.
+    """
+    now = now or timezone.now()
+    unfinished = ExcelImportJob.objects.filter(
+        status__in=("pending", "processing"))
+    unfinished.filter(
+        created_at__lt=now - timedelta(seconds=EXCEL_IMPORT_JOB_EXPIRY)).update(
+        status="failed", summary={"message": "The import did not finish in time"},
+        errors={"server_error": ["The import was interrupted and expired"]},
+        finished_at=now, updated_at=now)
+    return list(unfinished.filter(
+        updated_at__lt=now - timedelta(seconds=EXCEL_IMPORT_JOB_LEASE)).values_list("id", flat=True))
+
+
+def queue_excel_import_job(import_type, validated_data, user):
+    """Store the uploaded sheet and hand it to the celery worker."""
+    from ...tasks import process_excel_import_job
+
+    job = ExcelImportJob.objects.create(
+        import_type=import_type,
+        excel_file=validated_data["excel_file"],
+        confirm_reupload=validated_data.get("confirm_reupload", False),
+        income_particular=validated_data["income_particular"],
+        received_from=validated_data["received_from"],
+        restaurant=validated_data.get("restaurant"),
+        created_by=user,
+    )
+    process_excel_import_job.delay_on_commit(job.id)
+    return job
@@ -0,0 +1,159 @@
+# member_financial_management/services/excel_imports/parsers.py
+
+from datetime import datetime
+import pandas as pd
+from ...models import Invoice
+
+
+class ExcelImportError(Exception):
+    """Raised when an uploaded sales sheet can not be read."""
+
+    def __init__(self, message, errors):
+        super().__init__(message)
+        self.message = message
+        self.errors = errors
+
+
+def clean_text(value):
+    """Empty cells come back from pandas as NaN, which is not valid JSON."""
+    return value if isinstance(value, str) else None
+
+
+def read_excel_file(uploaded_file):
+    name = uploaded_file.name
+    if name.endswith('.xlsx'):
+        return pd.read_excel(uploaded_file, engine='openpyxl', dtype=str)
+    elif name.endswith('.xls'):
+        return pd.read_excel(uploaded_file, engine='xlrd', dtype=str)
+    return None
+
+
+def parse_member_sales_excel(uploaded_file):
+    """
+    Parse a lounge or others sales sheet. Returns the sales date, the
+    records (member_ID, cash_amount, card_amount, due_amount, total) and
+    the column totals.
+    """
+    try:
+        file_data_cl = read_excel_file(uploaded_file)
+        # Extract and format the date range
+        pick_date = file_data_cl.iat[1, 0]
+        if not isinstance(pick_date, str):
+            raise ExcelImportError("Invalid date format", {
+                "pick_date": [f"Error: Expected a string, but got {type(pick_date)}. Value: {pick_date}"]
+            })
+        date_data = pick_date.strip().split(": ")[1]
+        sales_date = datetime.strptime(date_data, "%d.%m.%y").date()
+
+        file_data_cl = file_data_cl.dropna(how='all')
+
+        # Select relevant columns and rename them
+        file_data_cl = file_data_cl[['Unnamed: 1', 'Unnamed: 2', 'Unnamed: 3',
+                                     'Unnamed: 4', 'Unnamed: 5']]  # total 5 columns
+        file_data_cl.columns = [
+            'member_ID', 'cash_amount', 'card_amount', 'due_amount', 'total']
+        file_data_cl = file_data_cl.iloc[3:-1].reset_index(drop=True)
+
+        # Convert numeric columns
+        numeric_columns = ['cash_amount',
+                           'card_amount', 'due_amount', 'total']
+        file_data_cl[numeric_columns] = file_data_cl[numeric_columns].apply(
+            pd.to_numeric, errors='coerce').fillna(0)
+
+        # Calculate totals
+        totals = {col: int(file_data_cl[col].sum())
+                  for col in numeric_columns}
+    except ExcelImportError:
+        raise
+    except Exception:
+        raise ExcelImportError("Invalid excel file", {
+            "excel_file": ["There was an error while reading excel file. Please check if you have uploaded the correct file."]
+        })
+
+    records = file_data_cl.to_dict(orient='records')
+    for record in records:
+        record["member_ID"] = clean_text(record["member_ID"])
+    return {
+        "sales_date": sales_date,
+        "records": records,
+        "totals": totals,
+    }
+
+
+def parse_restaurant_sales_excel(uploaded_file):
+    """
+    Parse a restaurant sales sheet. Records are returned in the same shape
+    as parse_member_sales_excel plus the sales_code of every row, total
+    being the grand total including service charge.
+    """
+    try:
+        file_data_cl = read_excel_file(uploaded_file)
+        file_data_cl = file_data_cl.dropna(how='all')
+
+        # Extract and format the date range
+        cell_data = file_data_cl.iat[2, 5]
+        date_range_payment = cell_data.strip()
+        p_start_date, p_end_date = date_range_payment.split(" to ")
+        p_start_date = datetime.strptime(p_start_date, "%d/%m/%Y").date()
+        p_end_date = datetime.strptime(p_end_date, "%d/%m/%Y").date()
+        if p_start_date != p_end_date:
+            raise ExcelImportError("Invalid date range", {
+                "date_range": ["Invalid date range"]
+            })
+
+        # Select relevant columns and rename them
+        file_data_cl = file_data_cl[['Unnamed: 0', 'Unnamed: 1', 'Unnamed: 2', 'Unnamed: 4',
+                                     'Unnamed: 5', 'Unnamed: 6', 'Unnamed: 8', 'Unnamed: 9', 'Unnamed: 10']]
+        file_data_cl = file_data_cl.dropna(subset=[file_data_cl.columns[1]])
+        file_data_cl = file_data_cl[~(file_data_cl['Unnamed: 0'] == 'SL')]
+        file_data_cl.columns = [
+            'serial_number', 'sales_code', 'member_account', 'cash_amount', 'card_amount',
+            'due_amount', 'total', 'srv_charge', 'grand_total'
+        ]
+
+        # Convert numeric columns to appropriate types for summation
+        numeric_columns = ['cash_amount', 'card_amount',
+                           'due_amount', 'total', 'srv_charge', 'grand_total']
+        file_data_cl[numeric_columns] = file_data_cl[numeric_columns].apply(
+            pd.to_numeric, errors='coerce').fillna(0)
+        totals = {col: int(file_data_cl[col].sum())
+                  for col in numeric_columns}
+    except ExcelImportError:
+        raise
+    except Exception:
+        raise ExcelImportError("Something went wrong", {
+            "excel_file": ["There was an error while reading the file. Please check correct file has been uploaded."]
+        })
+
+    records = [
+        {
+            "member_ID": clean_text(record["member_account"]),
+            "sales_code": clean_text(record["sales_code"]),
+            "cash_amount": record["cash_amount"],
+            "card_amount": record["card_amount"],
+            "due_amount": record["due_amount"],
+            "total": record["grand_total"],
+        }
+        for record in file_data_cl.to_dict(orient='records')
+    ]
+    return {
+        "sales_date": p_start_date,
+        "records": records,
+        "totals": totals,
+    }
+
+
+def is_previously_uploaded(records, sales_date, invoice_type_name):
+    """Check if the first record of a sheet was already imported for the same day."""
+    if not records:
+        return False
+    single_record = records[0]
+    return Invoice.objects.filter(
+        member__member_ID=single_record["member_ID"],
+        balance_due=single_record["due_amount"],
+        paid_amount=single_record["card_amount"] +
+        single_record["cash_amount"],
+        total_amount=single_record["total"],
+        excel_upload_date=sales_date,
+        invoice_type__name=invoice_type_name
+    ).exists()
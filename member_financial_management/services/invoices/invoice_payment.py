@@ -6,7 +6,7 @@ from ...models import (
     Transaction, Payment, Sale, Due, MemberDue, Income, IncomeReceivingType, MemberAccount, SaleType
 )
 from ...utils.functions import generate_unique_sale_number
-from activity_log.tasks import log_activity_task
+from activity_log.utils.log_buffer import log_activity
 from activity_log.utils.functions import request_data_activity_log
 from datetime import date
 from django.db import transaction
@@ -15,7 +15,7 @@ from ...models import (
     IncomeReceivingType, MemberAccount, SaleType
 )
 from ...utils.functions import generate_unique_sale_number
-from activity_log.tasks import log_activity_task
+from activity_log.utils.log_buffer import log_activity
 from activity_log.utils.functions import request_data_activity_log
 
 
@@ -181,7 +181,7 @@ def process_invoice_payment(invoice, payment_method, amount, income_particular,
             create_dues_if_needed(invoice, payment_amount, payment_obj, transaction_obj)
 
             # Step 6: Log success
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Creation",
                 severity_level="info",
@@ -191,7 +191,7 @@ def process_invoice_payment(invoice, payment_method, amount, income_particular,
             return {"status": "success", "invoice_id": invoice.id}
 
     except Exception as e:
-        log_activity_task.delay_on_commit(
+        log_activity(
             request_data_activity_log(request),
             verb="Creation",
             severity_level="error",
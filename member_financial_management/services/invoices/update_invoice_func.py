@@ -2,7 +2,7 @@ from django.db import transaction
 from datetime import datetime
 from ...models import Invoice, Transaction, Payment, Sale, Income, Due, MemberDue,IncomeReceivingType
 from member_financial_management.utils.functions import generate_unique_sale_number
-from activity_log.tasks import log_activity_task
+from activity_log.utils.log_buffer import log_activity
 from activity_log.utils.functions import request_data_activity_log
 
 
@@ -157,7 +157,7 @@ def update_invoice(invoice_id, validated_data, user, request):
             update_sale_and_income(invoice, paid_amount, payment_method)
             update_dues(invoice, paid_amount, transaction_obj, payment_obj)
 
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Update",
                 severity_level="info",
@@ -167,7 +167,7 @@ def update_invoice(invoice_id, validated_data, user, request):
             return {"status": "success", "invoice": invoice}
 
     except Exception as e:
-        log_activity_task.delay_on_commit(
+        log_activity(
             request_data_activity_log(request),
             verb="Update",
             severity_level="error",
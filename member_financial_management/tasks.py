@@ -1,8 +1,26 @@
 from celery import shared_task
-from django.core.cache import cache
-
-
+from .models import ExcelImportJob
+from .services.excel_imports.import_jobs import run_excel_import_job, sweep_stale_excel_import_jobs
+import logging
+logger = logging.getLogger("myapp")
 
 
+@shared_task
+def process_excel_import_job(job_id):
+    try:
+        job = ExcelImportJob.objects.select_related(
+            "income_particular", "received_from", "restaurant", "created_by").get(id=job_id)
+    except ExcelImportJob.DoesNotExist:
+        return {"status": "failed", "error": f"Excel import job {job_id} does not exist"}
+    job = run_excel_import_job(job)
+    return {"status": job.status, "processed_rows": job.processed_rows, "failed_rows": job.failed_rows}
 
 
+@shared_task
+def resume_stale_excel_import_jobs():
+    """Queue the import jobs whose worker died again, they carry on after their stored rows. Run by beat."""
+    job_ids = sweep_stale_excel_import_jobs()
+    for job_id in job_ids:
+        logger.warning(f"Excel import job {job_id} made no progress, queued again")
+        process_excel_import_job.delay(job_id)
+    return {"jobs": len(job_ids)}
@@ -0,0 +1,170 @@
+import tempfile
+from datetime import date, timedelta
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.utils import timezone
+from faker import Faker
+from rest_framework.test import APITestCase
+from ..models import ExcelImportJob, IncomeParticular, IncomeReceivingOption
+from ..services.excel_imports import import_jobs
+from ..services.excel_imports.import_jobs import (
+    EXCEL_IMPORT_JOB_EXPIRY, EXCEL_IMPORT_JOB_LEASE, claim_excel_import_job, run_excel_import_job,
+    sweep_stale_excel_import_jobs)
+from ..utils.permission_classes import MemberFinancialManagementPermission
+
+
+def build_record(member_ID):
+    return {"member_ID": member_ID, "cash_amount": 10, "card_amount": 0,
+            "due_amount": 0, "total": 10}
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class TestExcelImportJobs(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        faker = Faker()
+        cls.user = get_user_model().objects.create_superuser(
+            username=faker.user_name(), password=faker.password(length=8))
+        cls.income_particular = IncomeParticular.objects.create(
+            name=faker.word())
+        cls.received_from = IncomeReceivingOption.objects.create(
+            name=faker.word())
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+
+    def create_job(self, **kwargs):
+        return ExcelImportJob.objects.create(
+            import_type="lounge",
+            excel_file=SimpleUploadedFile("sales.xlsx", b"sheet"),
+            income_particular=self.income_particular,
+            received_from=self.received_from,
+            created_by=self.user,
+            **kwargs)
+
+    @patch.object(MemberFinancialManagementPermission, "has_permission", return_value=True)
+    @patch("member_financial_management.tasks.process_excel_import_job.delay_on_commit")
+    def test_upload_in_background_returns_the_queued_job(self, mock_delay, mock_permission):
+        """
+        Test that a background upload stores a pending job, queues it and answers with 202
+        """
+        # act
+        _response = self.client.post("/api/member_financial/v1/lounge/upload/excel/", data={
+            "excel_file": SimpleUploadedFile("sales.xlsx", b"sheet"),
+            "income_particular": self.income_particular.id,
+            "received_from": self.received_from.id,
+            "confirm_reupload": False,
+            "run_in_background": True,
+        }, format="multipart")
+
+        # assert
+        self.assertEqual(_response.status_code, 202)
+        job = ExcelImportJob.objects.get(id=_response.json()["data"]["job_id"])
+        self.assertEqual((job.import_type, job.status), ("lounge", "pending"))
+        mock_delay.assert_called_once_with(job.id)
+
+    @patch.object(MemberFinancialManagementPermission, "has_permission", return_value=True)
+    def test_import_jobs_can_be_polled(self, mock_permission):
+        """
+        Test that jobs are listed without their failures, filtered by status and shown in detail
+        """
+        # arrange
+        failures = [{"member": "M0001", "status": "failed",
+                     "reason": "Member doesn't exist"}]
+        job = self.create_job(status="completed", total_rows=1, processed_rows=1,
+                              failed_rows=1, failures=failures)
+        self.create_job(status="processing")
+
+        # act
+        _list = self.client.get(
+            "/api/member_financial/v1/excel_import_jobs/", {"status": "completed"})
+        _detail = self.client.get(
+            f"/api/member_financial/v1/excel_import_jobs/{job.id}/")
+        _missing = self.client.get(
+            f"/api/member_financial/v1/excel_import_jobs/{job.id + 100}/")
+
+        # assert
+        self.assertEqual(_list.status_code, 200)
+        listed = _list.json()["data"]
+        self.assertEqual([row["id"] for row in listed], [job.id])
+        self.assertNotIn("failures", listed[0])
+        self.assertEqual(_detail.status_code, 200)
+        self.assertEqual(_detail.json()["data"]["failures"], failures)
+        self.assertEqual(_detail.json()["data"]["processed_rows"], 1)
+        self.assertEqual(_missing.status_code, 404)
+
+    def test_run_excel_import_job_resumes_after_the_stored_rows(self):
+        """
+        Test that a job run again imports only the rows after its processed_rows
+        """
+        # arrange
+        records = [build_record(f"MISSING{number}") for number in range(5)]
+        parsed = {"records": records, "sales_date": date.today(), "totals": {}}
+        earlier_failures = [{"member": "MISSING0", "status": "failed",
+                             "reason": "Member doesn't exist"}]
+        job = self.create_job(status="processing", processed_rows=2,
+                              failed_rows=1, failures=earlier_failures,
+                              started_at=timezone.now())
+        # its worker died, the job stopped beating for a whole lease
+        ExcelImportJob.objects.filter(id=job.id).update(
+            updated_at=timezone.now() - timedelta(seconds=EXCEL_IMPORT_JOB_LEASE + 60))
+
+        # act
+        with patch.dict(import_jobs.EXCEL_IMPORT_PARSERS, {"lounge": lambda excel_file: parsed}), \
+                patch.object(import_jobs, "is_previously_uploaded") as mock_previously_uploaded:
+            job = run_excel_import_job(job, chunk_size=2)
+
+        # assert
+        mock_previously_uploaded.assert_not_called()
+        self.assertEqual(job.status, "completed")
+        self.assertEqual((job.total_rows, job.processed_rows, job.failed_rows), (5, 5, 4))
+        self.assertEqual([result["member"] for result in job.summary["data"]],
+                         ["MISSING2", "MISSING3", "MISSING4"])
+        self.assertEqual(job.summary["resumed_from_row"], 2)
+
+    def test_run_excel_import_job_needs_the_claim(self):
+        """
+        Test that a job queued twice is imported by the first run only
+        """
+        # arrange
+        job = self.create_job()
+        duplicate = ExcelImportJob.objects.get(id=job.id)
+
+        # act
+        self.assertTrue(claim_excel_import_job(job))
+        # a second run while the first one is still beating
+        with patch.object(import_jobs, "_import_claimed_job") as mock_import:
+            run_excel_import_job(duplicate)
+
+        # assert
+        mock_import.assert_not_called()
+        self.assertFalse(claim_excel_import_job(duplicate))
+        job.refresh_from_db()
+        self.assertEqual(job.status, "processing")
+
+    def test_sweep_resumes_idle_jobs_and_expires_old_ones(self):
+        """
+        Test that idle unfinished jobs are handed back and jobs past the expiry are failed
+        """
+        # arrange
+        now = timezone.now()
+        idle = self.create_job(status="processing")
+        busy = self.create_job(status="processing")
+        expired = self.create_job(status="pending")
+        done = self.create_job(status="completed")
+        ExcelImportJob.objects.filter(id__in=[idle.id, done.id]).update(
+            updated_at=now - timedelta(seconds=EXCEL_IMPORT_JOB_LEASE + 60))
+        ExcelImportJob.objects.filter(id=expired.id).update(
+            created_at=now - timedelta(seconds=EXCEL_IMPORT_JOB_EXPIRY + 60))
+
+        # act
+        job_ids = sweep_stale_excel_import_jobs()
+
+        # assert
+        self.assertEqual(job_ids, [idle.id])
+        expired.refresh_from_db()
+        self.assertEqual(expired.status, "failed")
+        busy.refresh_from_db()
+        self.assertEqual(busy.status, "processing")
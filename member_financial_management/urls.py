@@ -50,6 +50,10 @@ urlpatterns = [
          name="lounge_excel_upload_view"),
     path("v1/others/upload/excel/", views.OthersUploadExcelView.as_view(),
          name="others_excel_upload_view"),
+    path("v1/excel_import_jobs/", views.ExcelImportJobView.as_view(),
+         name="excel_import_job_view"),
+    path("v1/excel_import_jobs/<int:id>/", views.ExcelImportJobSpecificView.as_view(),
+         name="excel_import_job_specific_view"),
 
 
 
@@ -14,3 +14,25 @@ def generate_unique_sale_number():
         unique_id = f"SAL-{uuid.uuid4().hex[:8].upper()}"  # e.g., SAL-1A2B3C4D
         if not Sale.objects.filter(sale_number=unique_id).exists():
             return unique_id
+
+
+def _generate_unique_numbers(prefix, count, model, field_name):
+    """Generate count unique numbers checking collisions with one query per round."""
+    numbers = set()
+    while len(numbers) < count:
+        candidates = {
+            f"{prefix}-{uuid.uuid4().hex[:8].upper()}" for _ in range(count - len(numbers))
+        }
+        candidates -= numbers
+        taken = set(model.objects.filter(
+            **{f"{field_name}__in": candidates}).values_list(field_name, flat=True))
+        numbers |= candidates - taken
+    return list(numbers)
+
+
+def generate_unique_invoice_numbers(count):
+    return _generate_unique_numbers("INV", count, Invoice, "invoice_number")
+
+
+def generate_unique_sale_numbers(count):
+    return _generate_unique_numbers("SAL", count, Sale, "sale_number")
@@ -6,7 +6,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 import logging
-from activity_log.tasks import log_activity_task
+from activity_log.utils.log_buffer import log_activity
 from activity_log.utils.functions import request_data_activity_log
 from django.db import transaction
 from datetime import date
@@ -14,11 +14,13 @@ from django.db.models import Prefetch
 import pdb
 from core.utils.pagination import CustomPageNumberPagination
 from django.shortcuts import get_object_or_404
-from .models import PaymentMethod, Transaction, Payment, Sale, SaleType, IncomeParticular, IncomeReceivingOption, Income, IncomeReceivingType, MemberAccount, Due, MemberDue, Invoice, InvoiceType, InvoiceItem
+from .models import PaymentMethod, Transaction, Payment, Sale, SaleType, IncomeParticular, IncomeReceivingOption, Income, IncomeReceivingType, MemberAccount, Due, MemberDue, Invoice, InvoiceType, InvoiceItem, ExcelImportJob
 from django.utils.http import urlencode
 from . import serializers
 from .utils.functions import generate_unique_sale_number
 from .utils.functions import generate_unique_invoice_number, generate_unique_sale_number
+from .services.excel_imports.parsers import ExcelImportError, parse_member_sales_excel, is_previously_uploaded
+from .services.excel_imports.import_jobs import build_import_service, queue_excel_import_job
 from datetime import datetime
 from member.models import Member
 import pandas as pd
@@ -40,7 +42,7 @@ class PaymentMethodView(APIView):
                 payment_methods, many=True, fields=fields)
             data = serializer.data
 
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -56,7 +58,7 @@ class PaymentMethodView(APIView):
 
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="error",
@@ -75,7 +77,7 @@ class PaymentMethodView(APIView):
             if serializer.is_valid():
                 serializer.save()
                 # Invalidate cache delete
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Creation",
                     severity_level="info",
@@ -89,7 +91,7 @@ class PaymentMethodView(APIView):
                     "data": serializer.data
                 }, status=status.HTTP_201_CREATED)
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Creation",
                     severity_level="warning",
@@ -105,7 +107,7 @@ class PaymentMethodView(APIView):
 
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Creation",
                 severity_level="error",
@@ -299,7 +301,7 @@ class PaymentMethodView(APIView):
 #                             member=invoice.member,
 #                             due_reference=due_obj
 #                         )
-#                         log_activity_task.delay_on_commit(
+#                         log_activity(
 #                             request_data_activity_log(request),
 #                             verb="Creation",
 #                             severity_level="info",
@@ -412,7 +414,7 @@ class PaymentMethodView(APIView):
 #                             member=invoice.member,
 #                             due_reference=due_obj
 #                         )
-#                         log_activity_task.delay_on_commit(
+#                         log_activity(
 #                             request_data_activity_log(request),
 #                             verb="Creation",
 #                             severity_level="info",
@@ -430,7 +432,7 @@ class PaymentMethodView(APIView):
 #                         )
 
 #             else:
-#                 log_activity_task.delay_on_commit(
+#                 log_activity(
 #                     request_data_activity_log(request),
 #                     verb="Creation",
 #                     severity_level="info",
@@ -444,7 +446,7 @@ class PaymentMethodView(APIView):
 #                 }, status=status.HTTP_400_BAD_REQUEST)
 #         except Exception as e:
 #             logger.exception(str(e))
-#             log_activity_task.delay_on_commit(
+#             log_activity(
 #                 request_data_activity_log(request),
 #                 verb="Creation",
 #                 severity_level="info",
@@ -525,7 +527,7 @@ class IncomeParticularView(APIView):
             if serializer.is_valid():
                 cache.delete("active_income_particulars")  # Invalidate cache
                 serializer.save()
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Creation",
                     severity_level="info",
@@ -538,7 +540,7 @@ class IncomeParticularView(APIView):
                     "data": serializer.data
                 }, status=status.HTTP_201_CREATED)
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Creation",
                     severity_level="info",
@@ -552,7 +554,7 @@ class IncomeParticularView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Creation",
                 severity_level="info",
@@ -578,7 +580,7 @@ class IncomeParticularView(APIView):
                 income_particular, many=True, fields=fields)
             data = serializer.data
 
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -592,7 +594,7 @@ class IncomeParticularView(APIView):
             }, status=status.HTTP_200_OK)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -619,7 +621,7 @@ class IncomeReceivedFromView(APIView):
                 # Invalidate cache
                 cache.delete("active_income_receiving_options")
                 serializer.save()
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Creation",
                     severity_level="info",
@@ -632,7 +634,7 @@ class IncomeReceivedFromView(APIView):
                     "data": serializer.data
                 }, status=status.HTTP_201_CREATED)
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Creation",
                     severity_level="info",
@@ -646,7 +648,7 @@ class IncomeReceivedFromView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Creation",
                 severity_level="info",
@@ -672,7 +674,7 @@ class IncomeReceivedFromView(APIView):
                 data, many=True, fields=fields)
             data = serializer.data
 
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -686,7 +688,7 @@ class IncomeReceivedFromView(APIView):
             }, status=status.HTTP_200_OK)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -745,7 +747,7 @@ class InvoiceShowView(APIView):
                 queryset, request, view=self)
             serializer = serializers.InvoiceForViewSerializer(
                 paginated_queryset, many=True, fields=fields)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -760,7 +762,7 @@ class InvoiceShowView(APIView):
             return final_response
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -803,7 +805,7 @@ class InvoiceShowView(APIView):
                         for sale in invoice.sale_invoice.all():
                             Income.objects.filter(
                                 sale=sale).update(is_active=False)
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="delete",
                     severity_level="info",
@@ -824,7 +826,7 @@ class InvoiceShowView(APIView):
                 }, status=400)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="delete",
                 severity_level="info",
@@ -855,7 +857,7 @@ class InvoiceSpecificView(APIView):
             ), pk=id)
             serializer = serializers.InvoiceForViewSerializer(
                 queryset)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -869,7 +871,7 @@ class InvoiceSpecificView(APIView):
             }, status=status.HTTP_200_OK)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -910,7 +912,7 @@ class InvoiceSpecificView(APIView):
                 for sale in invoice.sale_invoice.all():
                     Income.objects.filter(sale=sale).update(is_active=False)
 
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="delete",
                     severity_level="info",
@@ -937,7 +939,7 @@ class InvoiceSpecificView(APIView):
 
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="delete",
                 severity_level="error",
@@ -976,7 +978,7 @@ class InvoiceSpecificView(APIView):
     #                     invoice.paid_amount = paid_amount
     #                     invoice.save(update_fields=[
     #                                  "balance_due", "total_amount", "paid_amount"])
-    #                     log_activity_task.delay_on_commit(
+    #                     log_activity(
     #                         request_data_activity_log(request),
     #                         verb="Update",
     #                         severity_level="info",
@@ -1090,7 +1092,7 @@ class InvoiceSpecificView(APIView):
     #                         member=invoice.member,
     #                         due_reference=due_obj
     #                     )
-    #                 log_activity_task.delay_on_commit(
+    #                 log_activity(
     #                     request_data_activity_log(request),
     #                     verb="Update",
     #                     severity_level="info",
@@ -1112,7 +1114,7 @@ class InvoiceSpecificView(APIView):
 
     #     except Exception as e:
     #         logger.exception(str(e))
-    #         log_activity_task.delay_on_commit(
+    #         log_activity(
     #             request_data_activity_log(request),
     #             verb="Update",
     #             severity_level="info",
@@ -1226,7 +1228,7 @@ class InvoiceCustomDeleteView(APIView):
                 }, status=400)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Delete",
                 severity_level="info",
@@ -1266,7 +1268,7 @@ class IncomeView(APIView):
             return final_response
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -1304,7 +1306,7 @@ class IncomeSpecificView(APIView):
             return final_response
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -1334,7 +1336,7 @@ class SalesView(APIView):
                 data, request=request, view=self)
             serializer = serializers.SaleSerializer(
                 paginated_queryset, many=True)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -1351,7 +1353,7 @@ class SalesView(APIView):
             return final_response
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -1377,7 +1379,7 @@ class SalesSpecificView(APIView):
                 "sale_source_type", "customer", "payment_method"), pk=id)
             serializer = serializers.SaleSpecificSerializer(
                 data)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -1394,7 +1396,7 @@ class SalesSpecificView(APIView):
             return final_response
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -1423,7 +1425,7 @@ class TransactionView(APIView):
                 data, request=request, view=self)
             serializer = serializers.TransactionSerializer(
                 paginated_queryset, many=True)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -1440,7 +1442,7 @@ class TransactionView(APIView):
             return final_response
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -1466,7 +1468,7 @@ class TransactionSpecificView(APIView):
                 "member", "invoice", "payment_method", "invoice__invoice_type", "invoice__generated_by", "invoice__member", "invoice__restaurant", "invoice__event"), pk=id)
             serializer = serializers.TransactionSpecificSerializer(
                 data)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -1483,7 +1485,7 @@ class TransactionSpecificView(APIView):
             return final_response
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -1513,7 +1515,7 @@ class PaymentView(APIView):
                 data, request=request, view=self)
             serializer = serializers.PaymentSerializer(
                 paginated_queryset, many=True)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -1530,7 +1532,7 @@ class PaymentView(APIView):
             return final_response
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -1564,7 +1566,7 @@ class PaymentSpecificView(APIView):
             ), pk=id)
             serializer = serializers.PaymentSpecificSerializer(
                 data)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -1581,7 +1583,7 @@ class PaymentSpecificView(APIView):
             return final_response
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -1610,7 +1612,7 @@ class DueView(APIView):
                 data, request=request, view=self)
             serializer = serializers.DuesSerializer(
                 paginated_queryset, many=True)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -1627,7 +1629,7 @@ class DueView(APIView):
             return final_response
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -1666,7 +1668,7 @@ class DueSpecificView(APIView):
             ), pk=id)
             serializer = serializers.DuesSpecificSerializer(
                 data)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -1683,7 +1685,7 @@ class DueSpecificView(APIView):
             return final_response
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -1712,7 +1714,7 @@ class MemberDueView(APIView):
                 data, request=request, view=self)
             serializer = serializers.MemberDueSerializer(
                 paginated_queryset, many=True)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -1729,7 +1731,7 @@ class MemberDueView(APIView):
             return final_response
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -1968,7 +1970,7 @@ class MemberDueView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -1995,7 +1997,7 @@ class MemberDueSpecificView(APIView):
                 "due_reference__member", "due_reference__payment", "due_reference__transaction", "due_reference__transaction"), pk=id)
             serializer = serializers.MemberDueSpecificSerializer(
                 data)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -2012,7 +2014,7 @@ class MemberDueSpecificView(APIView):
             return final_response
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -2041,7 +2043,7 @@ class MemberAccountView(APIView):
                 data, request=request, view=self)
             serializer = serializers.MemberAccountSerializer(
                 paginated_queryset, many=True)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -2058,7 +2060,7 @@ class MemberAccountView(APIView):
             return final_response
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -2084,7 +2086,7 @@ class MemberAccountSpecificSpecificView(APIView):
                 "member"), member__member_ID=id)
             serializer = serializers.MemberAccountSerializer(
                 data)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -2101,7 +2103,7 @@ class MemberAccountSpecificSpecificView(APIView):
             return final_response
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -2144,7 +2146,7 @@ class MemberAccountRechargeView(APIView):
                         }
                     }, status=status.HTTP_200_OK)
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="View",
                     severity_level="info",
@@ -2158,7 +2160,7 @@ class MemberAccountRechargeView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -2182,226 +2184,57 @@ class LoungeUploadExcelView(APIView):
             serializer = serializers.LoungeUploadExcelSerializer(
                 data=request.data)
             if serializer.is_valid():
-                excel_file = serializer.validated_data["excel_file"]
-                uploaded_file = excel_file
-                file_data_cl = None
+                if serializer.validated_data["run_in_background"]:
+                    job = queue_excel_import_job(
+                        "lounge", serializer.validated_data, request.user)
+                    log_activity(
+                        request_data_activity_log(request),
+                        verb="View",
+                        severity_level="info",
+                        description="User queued an excel file upload",
+                    )
+                    return Response({
+                        "code": 202,
+                        "status": "success",
+                        "message": "Excel file queued for import",
+                        "data": {
+                            "job_id": job.id,
+                            "status": job.status,
+                        }
+                    }, status=status.HTTP_202_ACCEPTED)
                 try:
-
-                    if uploaded_file.name.endswith('.xlsx'):
-                        file_data_cl = pd.read_excel(
-                            uploaded_file, engine='openpyxl', dtype=str)
-                    elif uploaded_file.name.endswith('.xls'):
-                        file_data_cl = pd.read_excel(
-                            uploaded_file, engine='xlrd', dtype=str)
-                    # Extract and format the date range
-                    pick_date = file_data_cl.iat[1, 0]
-                    if isinstance(pick_date, str):
-                        date_data = pick_date.strip().split(": ")[1]
-                        lng_date = datetime.strptime(
-                            date_data, "%d.%m.%y").strftime("%Y-%m-%d")
-
-                        sales_date = datetime.strptime(
-                            date_data, "%d.%m.%y").date()
-                    else:
-                        return Response({
-                            "code": 400,
-                            "status": "failed",
-                            "message": "Invalid date format",
-                            "errors": {
-                                "pick_date": [f"Error: Expected a string, but got {type(pick_date)}. Value: {pick_date}"]
-                            }
-                        }, status=400)
-
-                    if file_data_cl is not None:
-                        file_data_cl = file_data_cl.dropna(how='all')
-
-                        # Select relevant columns and rename them
-                        file_data_cl = file_data_cl[['Unnamed: 1', 'Unnamed: 2', 'Unnamed: 3',
-                                                    'Unnamed: 4', 'Unnamed: 5']]  # total 5 columns
-
-                        file_data_cl.columns = [
-                            'member_ID', 'cash_amount', 'card_amount', 'due_amount', 'total']
-
-                        file_data_cl = file_data_cl.iloc[3:-
-                                                         1].reset_index(drop=True)
-
-                        # Convert numeric columns
-                        numeric_columns = ['cash_amount',
-                                           'card_amount', 'due_amount', 'total']
-                        file_data_cl[numeric_columns] = file_data_cl[numeric_columns].apply(
-                            pd.to_numeric, errors='coerce').fillna(0)
-
-                        # Calculate totals
-                        totals = {col: int(file_data_cl[col].sum())
-                                  for col in numeric_columns}
-
-                        totals['cash_amount'] = int(totals['cash_amount'])
-                        totals['card_amount'] = int(totals['card_amount'])
-                        totals['due_amount'] = int(totals['due_amount'])
-                        totals['total'] = int(totals['total'])
-                except Exception as e:
+                    parsed = parse_member_sales_excel(
+                        serializer.validated_data["excel_file"])
+                except ExcelImportError as e:
                     return Response({
                         "code": 400,
                         "status": "failed",
-                        "message": "Invalid excel file",
-                        "errors": {
-                            "excel_file": ["There was an error while reading excel file. Please check if you have uploaded the correct file."]
-                        }
+                        "message": e.message,
+                        "errors": e.errors
                     }, status=400)
 
-                data = file_data_cl.to_dict(orient='records')
+                data = parsed["records"]
+                sales_date = parsed["sales_date"]
                 income_particular = serializer.validated_data["income_particular"]
                 received_from = serializer.validated_data["received_from"]
                 confirm_reupload = serializer.validated_data["confirm_reupload"]
                 if not confirm_reupload:
-                    if len(data) >= 1:
-                        single_record = data[0]
-                        single_member_ID = single_record["member_ID"]
-                        single_cash_amount = single_record["cash_amount"]
-                        single_card_amount = single_record["card_amount"]
-                        single_due_amount = single_record["due_amount"]
-                        single_total = single_record["total"]
-                        is_same_invoice_exist = Invoice.objects.filter(
-                            member__member_ID=single_member_ID,
-                            balance_due=single_due_amount,
-                            paid_amount=single_card_amount+single_cash_amount,
-                            total_amount=single_total,
-                            excel_upload_date=lng_date,
-                            invoice_type__name="lounge"
-                        ).exists()
-                        if is_same_invoice_exist:
-                            return Response({
-                                "code": 400,
-                                "status": "failed",
-                                "message": "This file was previously uploaded with same data.",
-                                "errors": {
-                                    "excel_file": ["This file was uploaded previously with same data. If you want to reupload it make sure you have confirm_reupload  attribute set to true."]
-                                }
-                            }, status=400)
+                    is_same_invoice_exist = is_previously_uploaded(
+                        data, sales_date, "lounge")
+                    if is_same_invoice_exist:
+                        return Response({
+                            "code": 400,
+                            "status": "failed",
+                            "message": "This file was previously uploaded with same data.",
+                            "errors": {
+                                "excel_file": ["This file was uploaded previously with same data. If you want to reupload it make sure you have confirm_reupload  attribute set to true."]
+                            }
+                        }, status=400)
                 with transaction.atomic():
-                    invoice_type, _ = InvoiceType.objects.get_or_create(
-                        name="lounge")
-                    cash_payment_method, _ = PaymentMethod.objects.get_or_create(
-                        name="cash")
-                    card_payment_method, _ = PaymentMethod.objects.get_or_create(
-                        name="card")
-                    both_payment_method, _ = PaymentMethod.objects.get_or_create(
-                        name="both")
-                    sale_type, _ = SaleType.objects.get_or_create(
-                        name="lounge")
-                    full_income_receiving_type, _ = IncomeReceivingType.objects.get_or_create(
-                        name="full")
-                    partial_income_receiving_type, _ = IncomeReceivingType.objects.get_or_create(
-                        name="partial")
-                    uploaded_member_data = []
-                    for record in data:
-                        paid_amount = record["cash_amount"] + \
-                            record["card_amount"]
-                        total_amount = record["total"]
-                        due_amount = record["due_amount"]
-                        payment_method = None
-                        start_date = lng_date
-                        if record["card_amount"] == 0 and record["cash_amount"] == 0:
-                            payment_method = both_payment_method
-                        elif record["card_amount"] != 0:
-                            payment_method = card_payment_method
-                        else:
-                            payment_method = cash_payment_method
-                        if paid_amount == total_amount:
-                            income_receiving_type = full_income_receiving_type
-                        else:
-                            income_receiving_type = partial_income_receiving_type
-                        try:
-                            member = Member.objects.get(
-                                member_ID=record["member_ID"])
-                        except Member.DoesNotExist:
-                            uploaded_member_data.append({
-                                "member": record["member_ID"],
-                                "status": "failed",
-                                "reason": "Member doesn't exist",
-                            })
-                            continue
-                        invoice = Invoice.objects.create(
-                            invoice_number=generate_unique_invoice_number(),
-                            balance_due=record["due_amount"],
-                            paid_amount=paid_amount,
-                            due_date=start_date,
-                            issue_date=datetime.today(),
-                            total_amount=total_amount,
-                            is_full_paid=paid_amount == total_amount,
-                            status="paid" if total_amount == paid_amount else "partial_paid",
-                            invoice_type=invoice_type,
-                            generated_by=request.user,
-                            member=member,
-                            excel_upload_date=lng_date
-                        )
-                        transaction_obj = Transaction.objects.create(
-                            amount=paid_amount,
-                            member=member,
-                            invoice=invoice,
-                            payment_method=payment_method,
-                            notes="This transaction was recorded from excel file."
-                        )
-                        payment_obj = Payment.objects.create(
-                            payment_amount=paid_amount,
-                            payment_status=invoice.status,
-                            notes="This payment was recorded from excel file.",
-                            transaction=transaction_obj,
-                            invoice=invoice,
-                            member=member,
-                            payment_method=payment_method,
-                            processed_by=request.user
-                        )
-                        due_date = start_date if record["due_amount"] == 0 else None
-                        sale_obj = Sale.objects.create(sale_number=generate_unique_sale_number(),
-                                                       sub_total=invoice.total_amount,
-                                                       total_amount=invoice.total_amount,
-                                                       payment_status=invoice.status,
-                                                       due_date=due_date,
-                                                       notes="Sale created from excel file.",
-                                                       sale_source_type=sale_type,
-                                                       customer=member,
-                                                       payment_method=payment_method,
-                                                       invoice=invoice
-                                                       )
-                        Income.objects.create(
-                            receivable_amount=invoice.total_amount,
-                            final_receivable=invoice.total_amount,
-                            actual_received=invoice.paid_amount,
-                            reaming_due=invoice.balance_due,
-                            particular=income_particular,
-                            received_from_type=received_from,
-                            member=member,
-                            received_by=payment_method,
-                            sale=sale_obj,
-                            receiving_type=income_receiving_type)
-                        if due_amount > 0:  # it has due
-                            due_obj = Due.objects.create(
-                                original_amount=invoice.total_amount,
-                                due_amount=invoice.balance_due,
-                                paid_amount=invoice.paid_amount,
-                                due_date=start_date,
-                                payment_status=invoice.status,
-                                member=member,
-                                invoice=invoice,
-                                payment=payment_obj,
-                                transaction=transaction_obj,
-                            )
-                            MemberDue.objects.create(
-                                amount_due=due_obj.due_amount,
-                                due_date=start_date,
-                                amount_paid=invoice.paid_amount,
-                                payment_date=datetime.today(),
-                                notes="This due has been recorded from excel file",
-                                member=member,
-                                due_reference=due_obj
-                            )
-                        uploaded_member_data.append({
-                            "member_ID": member.member_ID,
-                            "status": "success",
-                            "reason": "Successfully uploaded"
-                        })
-                    log_activity_task.delay_on_commit(
+                    importer = build_import_service(
+                        "lounge", request.user, income_particular, received_from, sales_date)
+                    uploaded_member_data = importer.import_records(data)
+                    log_activity(
                         request_data_activity_log(request),
                         verb="View",
                         severity_level="info",
@@ -2413,15 +2246,9 @@ class LoungeUploadExcelView(APIView):
                         "message": "Data uploaded successfully",
                         "data": uploaded_member_data
                     }, status=status.HTTP_201_CREATED)
-                return Response({
-                    "code": 200,
-                    "status": "success",
-                    "message": "Excel file uploaded successfully",
-                    "totals": totals
-                }, status=status.HTTP_200_OK)
             else:
                 # activity log
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="View",
                     severity_level="info",
@@ -2436,7 +2263,7 @@ class LoungeUploadExcelView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -2460,218 +2287,57 @@ class OthersUploadExcelView(APIView):
             serializer = serializers.OthersUploadExcelSerializer(
                 data=request.data)
             if serializer.is_valid():
-                excel_file = serializer.validated_data["excel_file"]
-                uploaded_file = excel_file
+                if serializer.validated_data["run_in_background"]:
+                    job = queue_excel_import_job(
+                        "others", serializer.validated_data, request.user)
+                    log_activity(
+                        request_data_activity_log(request),
+                        verb="View",
+                        severity_level="info",
+                        description="User queued an excel file upload",
+                    )
+                    return Response({
+                        "code": 202,
+                        "status": "success",
+                        "message": "Excel file queued for import",
+                        "data": {
+                            "job_id": job.id,
+                            "status": job.status,
+                        }
+                    }, status=status.HTTP_202_ACCEPTED)
                 try:
-                    file_data_cl = None
-                    if uploaded_file.name.endswith('.xlsx'):
-                        file_data_cl = pd.read_excel(
-                            uploaded_file, engine='openpyxl', dtype=str)
-                    elif uploaded_file.name.endswith('.xls'):
-                        file_data_cl = pd.read_excel(
-                            uploaded_file, engine='xlrd', dtype=str)
-                        # Extract and format the date range
-                    pick_date = file_data_cl.iat[1, 0]
-                    if isinstance(pick_date, str):
-                        date_data = pick_date.strip().split(": ")[1]
-                        lng_date = datetime.strptime(
-                            date_data, "%d.%m.%y").strftime("%Y-%m-%d")
-
-                        sales_date = datetime.strptime(
-                            date_data, "%d.%m.%y").date()
-                    else:
-                        return Response({
-                            "code": 400,
-                            "status": "failed",
-                            "message": "Invalid date format",
-                            "errors": {
-                                "pick_date": [f"Error: Expected a string, but got {type(pick_date)}. Value: {pick_date}"]
-                            }
-                        })
-                    if file_data_cl is not None:
-                        file_data_cl = file_data_cl.dropna(how='all')
-
-                        # Select relevant columns and rename them
-                        file_data_cl = file_data_cl[['Unnamed: 1', 'Unnamed: 2', 'Unnamed: 3',
-                                                    'Unnamed: 4', 'Unnamed: 5']]
-                        file_data_cl.columns = [
-                            'member_ID', 'cash_amount', 'card_amount', 'due_amount', 'total']
-                        file_data_cl = file_data_cl.iloc[3:-
-                                                         1].reset_index(drop=True)
-                        # Convert numeric columns
-                        numeric_columns = ['cash_amount',
-                                           'card_amount', 'due_amount', 'total']
-                        file_data_cl[numeric_columns] = file_data_cl[numeric_columns].apply(
-                            pd.to_numeric, errors='coerce').fillna(0)
-                        # Calculate totals
-                        totals = {col: int(file_data_cl[col].sum())
-                                  for col in numeric_columns}
-                        totals['cash_amount'] = int(totals['cash_amount'])
-                        totals['card_amount'] = int(totals['card_amount'])
-                        totals['due_amount'] = int(totals['due_amount'])
-                        totals['total'] = int(totals['total'])
-                except Exception as e:
+                    parsed = parse_member_sales_excel(
+                        serializer.validated_data["excel_file"])
+                except ExcelImportError as e:
                     return Response({
                         "code": 400,
                         "status": "failed",
-                        "message": "Invalid excel file",
-                        "errors": {
-                            "excel_file": ["There was an error while reading the excel. Please check if you have uploaded the correct file."]
-                        }
+                        "message": e.message,
+                        "errors": e.errors
                     }, status=400)
-                # Process the data as needed
-                data = file_data_cl.to_dict(orient='records')
+
+                data = parsed["records"]
+                sales_date = parsed["sales_date"]
                 income_particular = serializer.validated_data["income_particular"]
                 received_from = serializer.validated_data["received_from"]
                 confirm_reupload = serializer.validated_data["confirm_reupload"]
                 if not confirm_reupload:
-                    if len(data) >= 1:
-                        single_record = data[0]
-                        single_member_ID = single_record["member_ID"]
-                        single_cash_amount = single_record["cash_amount"]
-                        single_card_amount = single_record["card_amount"]
-                        single_due_amount = single_record["due_amount"]
-                        single_total = single_record["total"]
-                        is_same_invoice_exist = Invoice.objects.filter(
-                            member__member_ID=single_member_ID,
-                            balance_due=single_due_amount,
-                            paid_amount=single_card_amount+single_cash_amount,
-                            total_amount=single_total,
-                            excel_upload_date=lng_date,
-                            invoice_type__name="others"
-                        ).exists()
-                        if is_same_invoice_exist:
-                            return Response({
-                                "code": 400,
-                                "status": "failed",
-                                "message": "This file was previously uploaded with same data.",
-                                "errors": {
-                                    "excel_file": ["This file was uploaded previously with same data. If you want to reupload it make sure you have confirm_reupload  attribute set to true."]
-                                }
-                            }, status=400)
+                    is_same_invoice_exist = is_previously_uploaded(
+                        data, sales_date, "others")
+                    if is_same_invoice_exist:
+                        return Response({
+                            "code": 400,
+                            "status": "failed",
+                            "message": "This file was previously uploaded with same data.",
+                            "errors": {
+                                "excel_file": ["This file was uploaded previously with same data. If you want to reupload it make sure you have confirm_reupload  attribute set to true."]
+                            }
+                        }, status=400)
                 with transaction.atomic():
-                    invoice_type, _ = InvoiceType.objects.get_or_create(
-                        name="others")
-                    cash_payment_method, _ = PaymentMethod.objects.get_or_create(
-                        name="cash")
-                    card_payment_method, _ = PaymentMethod.objects.get_or_create(
-                        name="card")
-                    both_payment_method, _ = PaymentMethod.objects.get_or_create(
-                        name="both")
-                    sale_type, _ = SaleType.objects.get_or_create(
-                        name="others")
-                    full_income_receiving_type, _ = IncomeReceivingType.objects.get_or_create(
-                        name="full")
-                    partial_income_receiving_type, _ = IncomeReceivingType.objects.get_or_create(
-                        name="partial")
-                    uploaded_member_data = []
-                    for record in data:
-                        paid_amount = record["cash_amount"] + \
-                            record["card_amount"]
-                        total_amount = record["total"]
-                        due_amount = record["due_amount"]
-                        payment_method = None
-                        start_date = lng_date
-                        if record["card_amount"] == 0 and record["cash_amount"] == 0:
-                            payment_method = both_payment_method
-                        elif record["card_amount"] != 0:
-                            payment_method = card_payment_method
-                        else:
-                            payment_method = cash_payment_method
-                        if paid_amount == total_amount:
-                            income_receiving_type = full_income_receiving_type
-                        else:
-                            income_receiving_type = partial_income_receiving_type
-                        try:
-                            member = Member.objects.get(
-                                member_ID=record["member_ID"])
-                        except Member.DoesNotExist:
-                            uploaded_member_data.append({
-                                "member": record["member_ID"],
-                                "status": "failed",
-                                "reason": "Member doesn't exist",
-                            })
-                            continue
-                        invoice = Invoice.objects.create(
-                            invoice_number=generate_unique_invoice_number(),
-                            balance_due=record["due_amount"],
-                            paid_amount=paid_amount,
-                            due_date=start_date,
-                            issue_date=datetime.today(),
-                            total_amount=total_amount,
-                            is_full_paid=paid_amount == total_amount,
-                            status="paid" if total_amount == paid_amount else "partial_paid",
-                            excel_upload_date=lng_date,
-                            invoice_type=invoice_type,
-                            generated_by=request.user,
-                            member=member)
-                        transaction_obj = Transaction.objects.create(
-                            amount=paid_amount,
-                            member=member,
-                            invoice=invoice,
-                            payment_method=payment_method,
-                            notes="This transaction was recorded from excel file."
-                        )
-                        payment_obj = Payment.objects.create(
-                            payment_amount=paid_amount,
-                            payment_status=invoice.status,
-                            notes="This payment was recorded from excel file.",
-                            transaction=transaction_obj,
-                            invoice=invoice,
-                            member=member,
-                            payment_method=payment_method,
-                            processed_by=request.user
-                        )
-                        due_date = start_date if record["due_amount"] == 0 else None
-                        sale_obj = Sale.objects.create(sale_number=generate_unique_sale_number(),
-                                                       sub_total=invoice.total_amount,
-                                                       total_amount=invoice.total_amount,
-                                                       payment_status=invoice.status,
-                                                       due_date=due_date,
-                                                       notes="Sale created from excel file.",
-                                                       sale_source_type=sale_type,
-                                                       customer=member,
-                                                       payment_method=payment_method,
-                                                       invoice=invoice
-                                                       )
-                        Income.objects.create(
-                            receivable_amount=invoice.total_amount,
-                            final_receivable=invoice.total_amount,
-                            actual_received=invoice.paid_amount,
-                            reaming_due=invoice.balance_due,
-                            particular=income_particular,
-                            received_from_type=received_from,
-                            member=member,
-                            received_by=payment_method,
-                            sale=sale_obj,
-                            receiving_type=income_receiving_type)
-                        if due_amount > 0:  # it has due
-                            due_obj = Due.objects.create(
-                                original_amount=invoice.total_amount,
-                                due_amount=invoice.balance_due,
-                                paid_amount=invoice.paid_amount,
-                                due_date=start_date,
-                                payment_status=invoice.status,
-                                member=member,
-                                invoice=invoice,
-                                payment=payment_obj,
-                                transaction=transaction_obj,
-                            )
-                            MemberDue.objects.create(
-                                amount_due=due_obj.due_amount,
-                                due_date=start_date,
-                                amount_paid=invoice.paid_amount,
-                                payment_date=datetime.today(),
-                                notes="This due has been recorded from excel file",
-                                member=member,
-                                due_reference=due_obj
-                            )
-                        uploaded_member_data.append({
-                            "member_ID": member.member_ID,
-                            "status": "success",
-                            "reason": "Successfully uploaded"
-                        })
-                    log_activity_task.delay_on_commit(
+                    importer = build_import_service(
+                        "others", request.user, income_particular, received_from, sales_date)
+                    uploaded_member_data = importer.import_records(data)
+                    log_activity(
                         request_data_activity_log(request),
                         verb="View",
                         severity_level="info",
@@ -2683,20 +2349,15 @@ class OthersUploadExcelView(APIView):
                         "message": "Data uploaded successfully",
                         "data": uploaded_member_data
                     }, status=status.HTTP_201_CREATED)
-                return Response({
-                    "code": 200,
-                    "status": "success",
-                    "message": "Excel file uploaded successfully",
-                    "totals": totals
-                }, status=status.HTTP_200_OK)
             else:
                 # activity log
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="View",
                     severity_level="info",
                     description="User tried to upload an excel file and faced error",
                 )
+                # return error response
                 return Response({
                     "code": 400,
                     "status": "failed",
@@ -2705,7 +2366,7 @@ class OthersUploadExcelView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="info",
@@ -2719,3 +2380,82 @@ class OthersUploadExcelView(APIView):
                     "server_error": [str(e)]
                 }
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class ExcelImportJobView(APIView):
+    permission_classes = [IsAuthenticated, MemberFinancialManagementPermission]
+
+    def get(self, request):
+        try:
+            queryset = ExcelImportJob.active_objects.select_related(
+                "income_particular", "received_from", "restaurant", "created_by"
+            ).defer("failures", "summary").order_by("-id")
+            import_type = request.query_params.get("import_type")
+            job_status = request.query_params.get("status")
+            if import_type is not None:
+                queryset = queryset.filter(import_type=import_type)
+            if job_status is not None:
+                queryset = queryset.filter(status=job_status)
+
+            paginator = CustomPageNumberPagination()
+            paginated_queryset = paginator.paginate_queryset(
+                queryset, request, view=self)
+            # per row failures and the summary are only shown on the detail view
+            serializer = serializers.ExcelImportJobSerializer(
+                paginated_queryset, many=True, fields=[
+                    "id", "import_type", "excel_file", "status", "confirm_reupload", "total_rows",
+                    "processed_rows", "failed_rows", "errors", "started_at", "finished_at",
+                    "income_particular", "received_from", "restaurant", "created_by",
+                    "created_at", "updated_at", "is_active"
+                ])
+            return paginator.get_paginated_response({
+                "code": 200,
+                "status": "success",
+                "message": "List of all excel import jobs",
+                "data": serializer.data
+            }, status=200)
+        except Exception as e:
+            logger.exception(str(e))
+            return Response({
+                "code": 500,
+                "status": "failed",
+                "message": "Something went wrong",
+                "errors": {
+                    "server_error": [str(e)]
+                }
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class ExcelImportJobSpecificView(APIView):
+    permission_classes = [IsAuthenticated, MemberFinancialManagementPermission]
+
+    def get(self, request, id):
+        try:
+            job = get_object_or_404(ExcelImportJob.active_objects.select_related(
+                "income_particular", "received_from", "restaurant", "created_by"), id=id)
+            serializer = serializers.ExcelImportJobSerializer(job)
+            return Response({
+                "code": 200,
+                "status": "success",
+                "message": f"Excel import job {id}",
+                "data": serializer.data
+            }, status=status.HTTP_200_OK)
+        except Http404:
+            return Response({
+                "code": 404,
+                "status": "failed",
+                "message": "Excel import job not found",
+                "errors": {
+                    "id": ["Excel import job not found by this id"]
+                }
+            }, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            logger.exception(str(e))
+            return Response({
+                "code": 500,
+                "status": "failed",
+                "message": "Something went wrong",
+                "errors": {
+                    "server_error": [str(e)]
+                }
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
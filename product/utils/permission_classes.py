@@ -3,3 +3,8 @@ from account.permissions import HasCustomPermission
 
 class ProductManagementPermission(HasCustomPermission):
     required_permission = "product_management"
+
+
+class ProductBuyPermission(HasCustomPermission):
+    # buying bills the member, both permissions are tested with one mask check
+    required_permissions = ("member_financial_management", "product_management")
@@ -1,4 +1,4 @@
-from .utils.permission_classes import ProductManagementPermission
+from .utils.permission_classes import ProductManagementPermission, ProductBuyPermission
 from django.utils.http import urlencode
 from django.core.cache import cache
 import pdb
@@ -9,7 +9,7 @@ from product import serializers
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
-from activity_log.tasks import log_activity_task
+from activity_log.utils.log_buffer import log_activity
 from activity_log.utils.functions import request_data_activity_log
 import logging
 from member.models import Member
@@ -20,7 +20,6 @@ from datetime import date
 from member_financial_management.serializers import InvoiceSerializer
 from promo_code_app.models import AppliedPromoCode
 from core.utils.pagination import CustomPageNumberPagination
-from member_financial_management.utils.permission_classes import MemberFinancialManagementPermission
 logger = logging.getLogger("myapp")
 from .tasks import delete_products_cache
 from .utils.filters import ProductFilter
@@ -48,7 +47,7 @@ class BrandView(APIView):
             if serializer.is_valid():
                 brand_instance = serializer.save()
                 brand_name = serializer.validated_data["name"]
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Brand created successfully",
                     severity_level="info",
@@ -64,7 +63,7 @@ class BrandView(APIView):
                     }
                 })
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Brand creation failed",
                     severity_level="error",
@@ -77,7 +76,7 @@ class BrandView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Brand creation failed",
                 severity_level="error",
@@ -101,7 +100,7 @@ class BrandView(APIView):
 
             brands = Brand.objects.all().order_by("id")
             serializer = serializers.BrandViewSerializer(brands, many=True)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Brand retrieval successful",
                 severity_level="info",
@@ -114,7 +113,7 @@ class BrandView(APIView):
             })
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Brand retrieval failed",
                 severity_level="error",
@@ -141,7 +140,7 @@ class ProductBrandDetailView(APIView):
             serializer = serializers.BrandSerializer(brand, data=request.data, partial=True)
             if serializer.is_valid():
                 obj = serializer.save()
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Brand updated successfully",
                     severity_level="info",
@@ -157,7 +156,7 @@ class ProductBrandDetailView(APIView):
                     }
                 }, status=status.HTTP_200_OK)
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Brand update failed",
                     severity_level="error",
@@ -170,7 +169,7 @@ class ProductBrandDetailView(APIView):
                     "errors": serializer.errors
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Brand.DoesNotExist:
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Brand update failed",
                 severity_level="error",
@@ -186,7 +185,7 @@ class ProductBrandDetailView(APIView):
             }, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Brand update failed",
                 severity_level="error",
@@ -206,7 +205,7 @@ class ProductBrandDetailView(APIView):
             brand = Brand.objects.get(pk=pk)
             brand.delete()
 
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Brand deleted successfully",
                 severity_level="info",
@@ -218,7 +217,7 @@ class ProductBrandDetailView(APIView):
                 "status": "success"
             }, status=status.HTTP_204_NO_CONTENT)
         except Brand.DoesNotExist:
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Brand delete failed",
                 severity_level="error",
@@ -234,7 +233,7 @@ class ProductBrandDetailView(APIView):
             }, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Brand delete failed",
                 severity_level="error",
@@ -270,7 +269,7 @@ class ProductCategoryView(APIView):
             if serializer.is_valid():
                 product_category_instance = serializer.save()
                 product_category_name = serializer.validated_data["name"]
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Product category created successfully",
                     severity_level="info",
@@ -286,7 +285,7 @@ class ProductCategoryView(APIView):
                     }
                 })
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Product category creation failed",
                     severity_level="error",
@@ -299,7 +298,7 @@ class ProductCategoryView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Product category creation failed",
                 severity_level="error",
@@ -323,7 +322,7 @@ class ProductCategoryView(APIView):
             product_categories = ProductCategory.objects.all().order_by('id') 
             serializer = serializers.ProductCategoryViewSerializer(
                 product_categories, many=True)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Product category retrieval successful",
                 severity_level="info",
@@ -336,7 +335,7 @@ class ProductCategoryView(APIView):
             })
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Product category retrieval failed",
                 severity_level="error",
@@ -364,7 +363,7 @@ class ProductCategoryDetailView(APIView):
                 product_category, data=request.data, partial=True)
             if serializer.is_valid():
                 obj = serializer.save()
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Product category updated successfully",
                     severity_level="info",
@@ -379,7 +378,7 @@ class ProductCategoryDetailView(APIView):
                     }
                 },status=status.HTTP_200_OK)
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Category update failed",
                     severity_level="error",
@@ -391,7 +390,7 @@ class ProductCategoryDetailView(APIView):
                     "errors": serializer.errors,
                 }, status=status.HTTP_400_BAD_REQUEST)
         except ProductCategory.DoesNotExist:
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Product category update failed",
                 severity_level="error",
@@ -406,7 +405,7 @@ class ProductCategoryDetailView(APIView):
             }, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Product category update failed",
                 severity_level="error",
@@ -425,7 +424,7 @@ class ProductCategoryDetailView(APIView):
             product_category = ProductCategory.objects.get(pk=pk)
             product_category.delete()
             
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Product category deleted successfully",
                 severity_level="info",
@@ -440,7 +439,7 @@ class ProductCategoryDetailView(APIView):
             }, status=status.HTTP_204_NO_CONTENT)
         
         except ProductCategory.DoesNotExist:
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Product category delete failed",
                 severity_level="error",
@@ -457,7 +456,7 @@ class ProductCategoryDetailView(APIView):
         
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Product category delete failed",
                 severity_level="error",
@@ -498,7 +497,7 @@ class ProductView(APIView):
                 delete_products_cache.delay()
 
                 product_name = serializer.validated_data["name"]
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Product created successfully",
                     severity_level="info",
@@ -515,7 +514,7 @@ class ProductView(APIView):
 
                 }, status=status.HTTP_201_CREATED)
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Product creation failed",
                     severity_level="error",
@@ -528,7 +527,7 @@ class ProductView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Product creation failed",
                 severity_level="error",
@@ -565,7 +564,7 @@ class ProductView(APIView):
             serializer = serializers.ProductViewSerializer(
                 paginated_products, many=True)
             # activity log
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Products retrieval successful",
                 severity_level="info",
@@ -582,7 +581,7 @@ class ProductView(APIView):
             return final_response
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Product retrieval failed",
                 severity_level="error",
@@ -616,7 +615,7 @@ class ProductMediaView(APIView):
             serializer = serializers.ProductMediaSerializer(data=data)
             if serializer.is_valid():
                 media_instance = serializer.save()
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Product media created successfully",
                     severity_level="info",
@@ -633,7 +632,7 @@ class ProductMediaView(APIView):
                     }
                 }, status=status.HTTP_201_CREATED)
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Product media creation failed",
                     severity_level="error",
@@ -646,7 +645,7 @@ class ProductMediaView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Product media creation failed",
                 severity_level="error",
@@ -673,7 +672,7 @@ class ProductMediaView(APIView):
             paginated_media = paginator.paginate_queryset(product_media, request, view=self)
             serializer = serializers.ProductMediaViewSerializer(paginated_media, many=True)
             # activity log
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Product media retrieval successful",
                 severity_level="info",
@@ -688,7 +687,7 @@ class ProductMediaView(APIView):
             return final_response
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Product media retrieval failed",
                 severity_level="error",
@@ -726,7 +725,7 @@ class ProductPriceView(APIView):
                 # cache_delete
                 delete_products_cache.delay()
                 product_price = serializer.validated_data["price"]
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Product price created successfully",
                     severity_level="info",
@@ -743,7 +742,7 @@ class ProductPriceView(APIView):
 
                 }, status=status.HTTP_201_CREATED)
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Product price creation failed",
                     severity_level="error",
@@ -756,7 +755,7 @@ class ProductPriceView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Product price creation failed",
                 severity_level="error",
@@ -787,7 +786,7 @@ class ProductPriceView(APIView):
             serializer = serializers.ProductPriceViewSerializer(
                 paginated_price, many=True)
             # activity log
-            log_activity_task.delay_on_commit(
+            log_activity(
 
                 request_data_activity_log(request),
                 verb="Product price retrieval successful",
@@ -805,7 +804,7 @@ class ProductPriceView(APIView):
             return final_response
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Product price retrieval failed",
                 severity_level="error",
@@ -845,7 +844,7 @@ class ProductDetailView(APIView):
             product = Product.objects.select_related(
                 'category', 'brand').prefetch_related('product_media').get(id=product_id)
             serializer = serializers.SpecificProductViewSerializer(product)
-            log_activity_task.delay_on_commit(
+            log_activity(
 
                 request_data_activity_log(request),
                 verb="Product details retrieved successfully",
@@ -865,7 +864,7 @@ class ProductDetailView(APIView):
                       timeout=60 * 30)  # Cache for 30 minutes
             return final_response
         except Product.DoesNotExist:
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Product details retrieval failed",
                 severity_level="error",
@@ -880,7 +879,7 @@ class ProductDetailView(APIView):
             }, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Product details retrieval failed",
                 severity_level="error",
@@ -897,7 +896,7 @@ class ProductDetailView(APIView):
 
 
 class ProductBuyView(APIView):
-    permission_classes = [IsAuthenticated, MemberFinancialManagementPermission, ProductManagementPermission]
+    permission_classes = [IsAuthenticated, ProductBuyPermission]
 
     def post(self, request):
         serializer = serializers.ProductBuySerializer(data=request.data)
@@ -943,7 +942,7 @@ class ProductBuyView(APIView):
             }, status=500)
 
     def _log_activity(self, request, message, level):
-        log_activity_task.delay_on_commit(
+        log_activity(
             request_data_activity_log(request),
             verb=message,
             severity_level=level,
@@ -10,9 +10,9 @@ from promo_code_app import serializers
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
-from activity_log.tasks import log_activity_task
+from activity_log.utils.log_buffer import log_activity
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
-from activity_log.tasks import log_activity_task
+from activity_log.utils.log_buffer import log_activity
 from activity_log.utils.functions import request_data_activity_log
 import logging
 from .utils.permission_classes import PromoCodeManagementPermission
@@ -40,7 +40,7 @@ class PromoCodeCategoryView(APIView):
             if serializer.is_valid():
                 promo_code_instance = serializer.save()
                 promo_code_name = serializer.validated_data["name"]
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Promo code created successfully",
                     severity_level="info",
@@ -56,7 +56,7 @@ class PromoCodeCategoryView(APIView):
                     }
                 })
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Promo code creation failed",
                     severity_level="error",
@@ -69,7 +69,7 @@ class PromoCodeCategoryView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Promo code creation failed",
                 severity_level="error",
@@ -93,7 +93,7 @@ class PromoCodeCategoryView(APIView):
             promo_code_categories = PromoCodeCategory.objects.all()
             serializer = serializers.PromoCodeCategoryViewSerializer(
                 promo_code_categories, many=True)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Promo code category retrieval successful",
                 severity_level="info",
@@ -106,7 +106,7 @@ class PromoCodeCategoryView(APIView):
             })
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Promo code category retrieval failed",
                 severity_level="error",
@@ -142,7 +142,7 @@ class PromoCodeView(APIView):
             if serializer.is_valid():
                 promo_code_instance = serializer.save()
                 promo_code = serializer.validated_data["promo_code"]
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Promo code created successfully",
                     severity_level="info",
@@ -158,7 +158,7 @@ class PromoCodeView(APIView):
                     }
                 })
             else:
-                log_activity_task.delay_on_commit(
+                log_activity(
                     request_data_activity_log(request),
                     verb="Promo code creation failed",
                     severity_level="error",
@@ -171,7 +171,7 @@ class PromoCodeView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Promo code creation failed",
                 severity_level="error",
@@ -195,7 +195,7 @@ class PromoCodeView(APIView):
             promo_codes = PromoCode.objects.filter(is_active=True)
             serializer = serializers.PromoCodeDetailViewSerializer(
                 promo_codes, many=True)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Promo code retrieval successful",
                 severity_level="info",
@@ -208,7 +208,7 @@ class PromoCodeView(APIView):
             })
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Promo code retrieval failed",
                 severity_level="error",
@@ -235,7 +235,7 @@ class AppliedPromoCodeView(APIView):
             data = AppliedPromoCode.objects.filter(is_active=True)
             serializer = serializers.AppliedPromoCodeSerializer(
                 data, many=True)
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="View",
                 severity_level="error",
@@ -248,7 +248,7 @@ class AppliedPromoCodeView(APIView):
             }, status=status.HTTP_200_OK)
         except Exception as e:
             logger.exception(str(e))
-            log_activity_task.delay_on_commit(
+            log_activity(
                 request_data_activity_log(request),
                 verb="Promo code category retrieval failed",
                 severity_level="error",
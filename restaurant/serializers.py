@@ -168,6 +168,7 @@ class RestaurantExcelUpload(serializers.Serializer):
         queryset=IncomeParticular.active_objects.all())
     received_from = serializers.PrimaryKeyRelatedField(
         queryset=IncomeReceivingOption.active_objects.all())
+    run_in_background = serializers.BooleanField(required=False, default=False)
 
     def validate_excel_file(self, value):
         # Check file extension